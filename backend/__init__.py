@@ -0,0 +1,6 @@
+"""
+Devil Town Backend Package (backend/)
+역할: main.py에서 사용하는 성능/인프라 계층 모듈 모음 (LLM 실행, 캐시, 리밋 등)
+호출 관계: main.py -> backend.* (각 모듈은 FastAPI에 직접 의존하지 않음)
+수정 시 주의사항: 환경변수 파싱은 main.py에서 수행하고, 모듈에는 값만 주입합니다.
+"""
@@ -0,0 +1,186 @@
+"""
+Admission Control (backend/admission.py)
+역할: 전역 동시 처리 한도(지연 기반 AIMD)와 라우트 우선순위로 과부하 시 비싼 요청부터 즉시 거절(load shedding)
+호출 관계: backend.request_middleware.RequestContextMiddleware -> AdmissionController.admit() / release()
+          main.py (/metrics) -> AdmissionController.inflight / limit (게이지 콜백)
+수정 시 주의사항: 이벤트 루프 스레드에서만 접근합니다 (락 없음). 워커 프로세스마다 한도가 따로 계산됩니다.
+  HIGH(정적 페이지/메타/지표)는 한도에 포함하지 않고 항상 통과합니다. 한도는 NORMAL + LOW 동시 처리 수에만 적용.
+  지연 신호는 라우트별 기준 지연(무부하 근사) 대비 비율이고 EWMA도 라우트별이라, /chat(수 초)과 /calendar/events(수 ms)가
+  섞여도 서로의 표본이 상대 라우트의 비율을 희석하거나 부풀리지 않습니다.
+  표본은 2xx이면서 핸들러가 scope["state"][SKIP_SAMPLE_STATE_KEY]를 표시하지 않은 응답만 씁니다. 업스트림을 거치지 않은
+  빠른 응답(채팅 캐시 hit, 주사위 풀, 폴백 문구)이 기준 지연을 수 ms로 끌어내리면 정상 Gemini 호출이 모두 과부하로 읽힙니다.
+  기준 지연은 최근 1~2개 시간 창(BASELINE_WINDOW_SECONDS)의 최소 지연이라, 과부하 중 늘어난 지연이 곧바로 "정상"으로
+  학습되지 않습니다 (표본 수 기반 평균은 초당 수백 건이면 몇 초 만에 따라 올라감).
+"""
+
+import time
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+
+# 이보다 짧은 지연은 모두 같은 값으로 봄 (캐시 히트 1ms -> 3ms 같은 잡음으로 한도가 줄지 않도록).
+MIN_BASELINE_SECONDS = 0.05
+# 라우트별 기준 지연 = 현재 창과 직전 창의 최소 지연 (창이 두 번 지나면 과거 최소값은 잊음).
+BASELINE_WINDOW_SECONDS = 30.0
+# 핸들러가 request.state에 True로 두면 이 응답은 지연 표본에서 빠짐 (업스트림을 거치지 않은 응답).
+SKIP_SAMPLE_STATE_KEY = "admission_skip_sample"
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Purpose: 완료된 요청의 지연으로 동시 처리 한도를 조절하는 AIMD.
+             라우트별 지연 비율(지연 / 라우트 기준 지연 - 최근 창의 최소 지연) EWMA가 tolerance 이하면 +1/limit
+             (한도만큼 완료될 때 +1), 넘으면 limit * backoff (감소 후 limit개 표본 동안은 추가 감소 없음 - 한 "왕복"에 1회).
+    Input: initial/min_limit/max_limit, tolerance(지연 비율 임계, 2.0 = 기준의 2배), backoff(감소 배율)
+    Output: limit (float, 호출자는 int로 비교)
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        clock=time.monotonic,
+    ):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(self.max_limit, max(self.min_limit, int(initial))))
+        self.tolerance = max(1.1, float(tolerance))
+        self.backoff = min(0.99, max(0.5, float(backoff)))
+        self._clock = clock
+        self._baselines = {}
+        self._ratios = {}
+        self._cooldown = 0
+
+    @property
+    def latency_ratio(self) -> float:
+        """가장 나쁜 라우트의 지연 비율 (지표/로그용)."""
+        return max(self._ratios.values(), default=1.0)
+
+    def on_sample(self, route: str, latency_seconds: float, inflight: int) -> bool:
+        """완료 1건 반영. 한도를 줄였으면 True."""
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        latency = max(MIN_BASELINE_SECONDS, latency_seconds)
+        ratio = self._ratios.get(route, 1.0)
+        ratio += (latency / self._baseline(route, latency) - ratio) * 0.2
+        self._ratios[route] = ratio
+
+        if ratio > self.tolerance:
+            if self._cooldown:
+                return False
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+            self._cooldown = int(self.limit)
+            return True
+        # 한도의 절반도 안 쓰는 동안에는 늘리지 않음 (한가할 때 한도가 근거 없이 커지는 것 방지).
+        if inflight * 2 >= self.limit:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        return False
+
+    def _baseline(self, route: str, latency: float) -> float:
+        now = self._clock()
+        # [현재 창 시작 시각, 현재 창 최소, 직전 창 최소]
+        state = self._baselines.get(route)
+        if state is None or now - state[0] >= BASELINE_WINDOW_SECONDS * 2:
+            state = [now, latency, latency]
+            self._baselines[route] = state
+        elif now - state[0] >= BASELINE_WINDOW_SECONDS:
+            state[0], state[1], state[2] = now, latency, state[1]
+        elif latency < state[1]:
+            state[1] = latency
+        return min(state[1], state[2])
+
+    def baselines(self) -> dict:
+        return {route: min(state[1], state[2]) for route, state in self._baselines.items()}
+
+
+class AdmissionTicket:
+    __slots__ = ("route", "priority", "client", "started")
+
+    def __init__(self, route: str, priority: str, client: str):
+        self.route = route
+        self.priority = priority
+        self.client = client
+        self.started = time.perf_counter()
+
+
+class AdmissionRejected:
+    """거절 결과. reason: "shed"(전역 한도/우선순위, 503) | "client_limit"(클라이언트별 동시 요청, 429)."""
+    __slots__ = ("priority", "reason", "status_code", "retry_after")
+
+    def __init__(self, priority: str, reason: str, status_code: int, retry_after: int):
+        self.priority = priority
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Purpose: 요청 시작 전에 받아들일지 결정 (핸들러/업스트림 비용을 치르기 전 거절).
+    Input: route_priorities({경로: NORMAL|LOW}, 없는 경로는 HIGH), limit(AdaptiveConcurrencyLimit),
+           low_priority_share(LOW가 쓸 수 있는 한도 비율 - 나머지는 NORMAL 몫으로 남김),
+           per_client_max_inflight(클라이언트 1개의 NORMAL+LOW 동시 요청 수, 0이면 제한 없음), retry_after_seconds
+    Output: admit() -> (AdmissionTicket | None, AdmissionRejected | None) / HIGH는 (None, None)
+    Side Effects: 없음 (로그/메트릭은 호출자가 기록)
+    """
+
+    def __init__(
+        self,
+        route_priorities: dict,
+        limit: AdaptiveConcurrencyLimit,
+        low_priority_share: float = 0.5,
+        per_client_max_inflight: int = 4,
+        retry_after_seconds: int = 2,
+    ):
+        self.route_priorities = dict(route_priorities)
+        self.limit = limit
+        self.low_priority_share = min(1.0, max(0.05, float(low_priority_share)))
+        self.per_client_max_inflight = max(0, int(per_client_max_inflight))
+        self.retry_after_seconds = max(1, int(retry_after_seconds))
+        self.inflight = 0
+        self._per_client = {}
+
+    def priority_for(self, path: str) -> str:
+        return self.route_priorities.get(path, HIGH)
+
+    def admit(self, path: str, client: str):
+        priority = self.priority_for(path)
+        if priority == HIGH:
+            return None, None
+
+        if self.per_client_max_inflight and self._per_client.get(client, 0) >= self.per_client_max_inflight:
+            return None, AdmissionRejected(priority, "client_limit", 429, 1)
+
+        capacity = int(self.limit.limit)
+        if priority == LOW:
+            capacity = max(1, int(self.limit.limit * self.low_priority_share))
+        if self.inflight >= capacity:
+            return None, AdmissionRejected(priority, "shed", 503, self.retry_after_seconds)
+
+        self.inflight += 1
+        self._per_client[client] = self._per_client.get(client, 0) + 1
+        return AdmissionTicket(path, priority, client), None
+
+    def release(self, ticket: AdmissionTicket, status_code: int = None, sampled: bool = True) -> bool:
+        """
+        Purpose: 처리 완료 반영. 2xx가 아니거나(예외/연결 끊김은 None) sampled=False(업스트림을 거치지 않은 응답)면
+                 지연 표본 없이 슬롯만 반환 (4xx 거절/캐시 hit 같은 빠른 응답이 기준 지연을 끌어내리거나,
+                 Gemini 장애가 전역 한도를 줄이지 않도록).
+        Output: 이번 표본으로 한도를 줄였으면 True
+        """
+        self.inflight = max(0, self.inflight - 1)
+        remaining = self._per_client.get(ticket.client, 0) - 1
+        if remaining > 0:
+            self._per_client[ticket.client] = remaining
+        else:
+            self._per_client.pop(ticket.client, None)
+        if not sampled or status_code is None or not 200 <= status_code < 300:
+            return False
+        return self.limit.on_sample(ticket.route, time.perf_counter() - ticket.started, self.inflight)
+
+    def tracked_clients(self) -> int:
+        return len(self._per_client)
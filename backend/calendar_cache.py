@@ -0,0 +1,375 @@
+"""
+Calendar Cache Layer (backend/calendar_cache.py)
+역할: iCloud ICS 조회 결과 캐시 (single-flight 갱신, stale-while-revalidate, 소스별 조건부 GET 상태 보관)
+호출 관계: main.py (/calendar/events) -> CalendarCache.get() -> fetch(previous) (이벤트 루프, 여러 소스 동시 조회)
+          멀티 워커 모드: CalendarCache -> backend.shared_state.SharedCalendarCoordinator (lease/공유 payload)
+수정 시 주의사항: get()은 이벤트 루프에서만 호출됩니다. fetch는 비동기 I/O, 파싱(build_snapshot)은 asyncio.to_thread로 분리.
+  갱신 실패 시 마지막 정상 스냅샷을 stale 표시와 함께 계속 제공합니다.
+  일부 소스만 실패하면 그 소스의 직전 이벤트를 재사용하는 판단은 build_snapshot(main.py)이 합니다 (SourceState.error).
+  coordinator가 있으면 lease를 가진 워커만 iCloud를 조회하고 나머지는 공유된 결과를 받아 씁니다.
+  스냅샷의 versions(since 변경분 이력)는 build_snapshot/restore_snapshot이 previous를 이어받아 만들고, 304/stale 전환에서는 그대로 유지합니다.
+  반복 일정 표시 구간은 스냅샷을 만든 날짜(display_date) 기준이므로, 업스트림이 304여도 날짜가 바뀌면
+  expand_snapshot(previous)로 워커 스레드에서 다시 펼칩니다 (304 갱신 시점 또는 날짜가 바뀐 뒤 첫 캐시 히트).
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from backend.precompressed import PrecompressedBody
+
+logger = logging.getLogger("DevilTown")
+
+
+class CalendarUnavailableError(Exception):
+    """정상 스냅샷이 한 번도 없고 업스트림 조회도 실패한 상태."""
+
+
+@dataclass
+class FetchResult:
+    """한 번의 갱신 조회 결과. status=304면 모든 소스가 변경 없음 (스냅샷 재검증만), 200이면 sources로 재구성."""
+    status: int
+    sources: list = field(default_factory=list)
+
+
+@dataclass
+class SourceState:
+    """소스 1개의 마지막 정상 응답 (조건부 GET 검증자 + 파싱된 이벤트). error가 있으면 직전 이벤트를 재사용 중."""
+    etag: str = ""
+    last_modified: str = ""
+    events: list = field(default_factory=list)
+    fetched_at: float = 0.0
+    error: str = ""
+
+
+# 스냅샷별로 보관하는 범위 조회 응답 본문 수 (같은 날 같은 from=today 요청이 대부분).
+QUERY_BODY_CACHE_SIZE = 64
+
+
+@dataclass
+class CalendarSnapshot:
+    """한 번의 갱신 결과. payload는 응답 JSON 그대로이며 갱신 사이에 변경하지 않음."""
+    payload: dict
+    fetched_at: float
+    sources: dict = field(default_factory=dict)
+    stale: bool = False
+    events: list = field(default_factory=list)
+    index: object = None
+    recurrence: object = None
+    versions: object = None
+    display_date: date = None
+    body: PrecompressedBody = None
+    query_bodies: OrderedDict = field(default_factory=OrderedDict)
+
+    def encoded_body(self) -> PrecompressedBody:
+        """전체 payload 직렬화/압축 결과 (스냅샷당 1회 계산)."""
+        if self.body is None:
+            self.body = PrecompressedBody.from_json(self.payload)
+        return self.body
+
+    def encoded_query_body(self, key, build_payload) -> PrecompressedBody:
+        """범위 조회 응답 본문을 스냅샷 수명 동안 LRU로 재사용."""
+        cached = self.query_bodies.get(key)
+        if cached is not None:
+            self.query_bodies.move_to_end(key)
+            return cached
+        cached = PrecompressedBody.from_json(build_payload())
+        self.query_bodies[key] = cached
+        while len(self.query_bodies) > QUERY_BODY_CACHE_SIZE:
+            self.query_bodies.popitem(last=False)
+        return cached
+
+    def validators(self) -> dict:
+        """다음 조건부 GET에 붙일 소스별 (ETag, Last-Modified)."""
+        return {name: (state.etag, state.last_modified) for name, state in self.sources.items()}
+
+    def has_source_errors(self) -> bool:
+        return any(state.error for state in self.sources.values())
+
+
+class CalendarCache:
+    """
+    Purpose: 캘린더 응답 캐시. 만료 전에는 즉시 반환, 만료 후에는 이전 값을 즉시 반환하면서
+             백그라운드에서 1개의 갱신만 수행(single-flight). 최초 미스만 갱신 완료를 기다림.
+    Input: fetch(previous) -> awaitable FetchResult, build_snapshot(FetchResult, previous) -> CalendarSnapshot
+           coordinator(선택, SharedCalendarCoordinator), restore_snapshot(공유 dict, previous) -> CalendarSnapshot
+           expand_snapshot(선택, previous) -> CalendarSnapshot (같은 원본 이벤트를 오늘 기준으로 다시 펼침)
+    Output: get() -> (CalendarSnapshot, cache_state) / cache_state: "hit" | "stale" | "miss"
+    Side Effects: 갱신 시 fetch(외부 HTTP)는 이벤트 루프에서 대기, build(ICS 파싱)는 워커 스레드에서 실행
+    Exceptions: CalendarUnavailableError (정상 스냅샷이 없고 갱신도 실패)
+    """
+
+    def __init__(
+        self,
+        fetch,
+        build_snapshot,
+        ttl_seconds: float,
+        failure_retry_seconds: float = 30.0,
+        coordinator=None,
+        restore_snapshot=None,
+        follower_wait_seconds: float = 15.0,
+        expand_snapshot=None,
+    ):
+        self._fetch = fetch
+        self._build_snapshot = build_snapshot
+        self.ttl_seconds = max(1.0, float(ttl_seconds))
+        self.failure_retry_seconds = max(1.0, float(failure_retry_seconds))
+        self._coordinator = coordinator
+        self._restore_snapshot = restore_snapshot
+        self.follower_wait_seconds = max(0.0, float(follower_wait_seconds))
+        self._shared_version = 0
+        self._snapshot = None
+        self._expires_at = 0.0
+        self._refresh_task = None
+        self._expand_snapshot = expand_snapshot
+        self._rollover_task = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def age_seconds(self) -> float:
+        if self._snapshot is None:
+            return -1.0
+        return max(0.0, time.time() - self._snapshot.fetched_at)
+
+    async def get(self, job_id: str = "SYSTEM"):
+        now = time.time()
+        if self._snapshot is not None:
+            if now < self._expires_at:
+                if self._needs_rollover(self._snapshot):
+                    # 자정이 지났는데 TTL이 남은 경우: 지금 값을 돌려주고 재확장은 백그라운드에서 1회만.
+                    self._ensure_rollover(job_id)
+                return self._snapshot, "hit"
+            # stale-while-revalidate: 이전 값을 바로 돌려주고 갱신은 백그라운드에서 1회만.
+            self._ensure_refresh(job_id)
+            return self._snapshot, "stale"
+
+        if now < self._expires_at:
+            # 최근 최초 조회가 실패했다면 재시도 간격 동안은 업스트림을 다시 기다리지 않고 즉시 실패.
+            raise CalendarUnavailableError("calendar source unavailable (retry backoff)")
+        await asyncio.shield(self._ensure_refresh(job_id))
+        if self._snapshot is None:
+            raise CalendarUnavailableError("calendar source unavailable and no cached snapshot")
+        return self._snapshot, "miss"
+
+    def _ensure_refresh(self, job_id: str):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(job_id))
+        return self._refresh_task
+
+    def _needs_rollover(self, snapshot: CalendarSnapshot) -> bool:
+        return (
+            self._expand_snapshot is not None
+            and snapshot.display_date is not None
+            and snapshot.display_date != date.today()
+        )
+
+    def _ensure_rollover(self, job_id: str):
+        if self._rollover_task is None or self._rollover_task.done():
+            self._rollover_task = asyncio.create_task(self._rollover(job_id))
+        return self._rollover_task
+
+    async def _rollover(self, job_id: str):
+        started = time.time()
+        base = self._snapshot
+        try:
+            snapshot = await self._expanded(base)
+        except Exception as e:
+            # 같은 날 매 히트마다 재시도하지 않도록 기준 날짜만 넘김 (다음 200 갱신에서 다시 펼쳐짐).
+            base.display_date = date.today()
+            logger.error(
+                f"Calendar day rollover failed: {e}",
+                extra={"job_id": job_id, "step": "CALENDAR_ROLLOVER", "status": "FAIL"},
+            )
+            return
+        # 재확장 중에 갱신이 끝나 더 새 스냅샷이 들어왔으면 그 값을 유지.
+        if self._snapshot is base:
+            self._snapshot = snapshot
+        logger.info(
+            f"Calendar display window moved to {snapshot.display_date}",
+            extra={
+                "job_id": job_id,
+                "step": "CALENDAR_ROLLOVER",
+                "status": "SUCCESS",
+                "duration_ms": int((time.time() - started) * 1000),
+            },
+        )
+
+    async def _expanded(self, base: CalendarSnapshot) -> CalendarSnapshot:
+        """같은 원본 이벤트를 오늘 기준으로 다시 펼친 스냅샷 (신선도/stale 표시는 base 그대로)."""
+        snapshot = await asyncio.to_thread(self._expand_snapshot, base)
+        snapshot.fetched_at = base.fetched_at
+        return self._mark_stale(snapshot) if base.stale else snapshot
+
+    async def _refresh(self, job_id: str):
+        started = time.time()
+        previous = self._snapshot
+        try:
+            if self._coordinator is None:
+                step_status = await self._refresh_from_source(previous)
+            else:
+                step_status = await self._refresh_shared(previous, job_id)
+        except Exception as e:
+            duration = int((time.time() - started) * 1000)
+            # 실패 직후 매 요청마다 재시도하지 않도록 짧은 재시도 간격을 둠.
+            self._expires_at = time.time() + self.failure_retry_seconds
+            if previous is not None:
+                self._snapshot = self._mark_stale(previous)
+            logger.error(
+                f"Calendar fetch failed: {e}. serving_stale={previous is not None}",
+                extra={"job_id": job_id, "step": "CALENDAR_FETCH", "status": "FAIL", "duration_ms": duration},
+            )
+            return
+
+        duration = int((time.time() - started) * 1000)
+        logger.info(
+            f"Calendar events refreshed ({self._snapshot.payload.get('count', 0)})",
+            extra={"job_id": job_id, "step": "CALENDAR_FETCH", "status": step_status, "duration_ms": duration},
+        )
+
+    async def _refresh_from_source(self, previous) -> str:
+        result = await self._fetch(previous)
+        if result.status == 304 and previous is not None:
+            self._snapshot = self._revalidated(previous)
+            if self._needs_rollover(self._snapshot):
+                self._snapshot = await self._expanded(self._snapshot)
+            step_status = "NOT_MODIFIED"
+        else:
+            self._snapshot = await asyncio.to_thread(self._build_snapshot, result, previous)
+            step_status = "SUCCESS"
+        self._expires_at = time.time() + self.ttl_seconds
+        return step_status
+
+    async def _refresh_shared(self, previous, job_id: str) -> str:
+        """멀티 워커: 공유 값이 신선하면 채택, 아니면 lease를 얻은 워커만 업스트림 조회 후 게시."""
+        coordinator = self._coordinator
+        shared = await asyncio.to_thread(coordinator.load, self._shared_version)
+        if shared is not None and time.time() - shared.updated_at < self.ttl_seconds:
+            await self._adopt_shared(shared, previous)
+            return "SHARED"
+
+        if await asyncio.to_thread(coordinator.try_lead):
+            step_status = await self._refresh_from_source(previous)
+            try:
+                if step_status == "NOT_MODIFIED" and self._shared_version:
+                    await asyncio.to_thread(coordinator.touch)
+                else:
+                    self._shared_version = await asyncio.to_thread(
+                        coordinator.publish, self._snapshot_to_shared(self._snapshot)
+                    )
+            except Exception as e:
+                # 게시 실패는 이 워커의 응답에는 영향이 없으므로 경고만 남김 (다른 워커는 다음 주기에 재시도).
+                logger.warning(
+                    f"Calendar shared publish failed: {e}",
+                    extra={"job_id": job_id, "step": "CALENDAR_SHARED", "status": "WARN"},
+                )
+            return step_status
+
+        # 다른 워커가 갱신 담당: 공유 값이 오래됐어도 그대로 쓰고, 없으면 최초 게시를 잠시 기다림.
+        deadline = time.time() + self.follower_wait_seconds
+        while shared is None and time.time() < deadline:
+            await asyncio.sleep(0.5)
+            shared = await asyncio.to_thread(coordinator.load, self._shared_version)
+        if shared is None:
+            raise CalendarUnavailableError("calendar refresh leader has not published yet")
+        await self._adopt_shared(shared, previous)
+        # 담당 워커가 한 주기 이상 갱신하지 못했다면 stale로 표시 (담당 워커도 같은 상태를 응답 중).
+        if time.time() - shared.updated_at >= self.ttl_seconds * 2:
+            self._snapshot = self._mark_stale(self._snapshot)
+        self._expires_at = time.time() + self.failure_retry_seconds
+        return "SHARED_FOLLOWER"
+
+    async def _adopt_shared(self, shared, previous):
+        if shared.data is None and previous is not None:
+            self._snapshot = self._revalidated(previous, fetched_at=shared.updated_at)
+            if self._needs_rollover(self._snapshot):
+                self._snapshot = await self._expanded(self._snapshot)
+        else:
+            data = shared.data
+            if data is None:
+                data = (await asyncio.to_thread(self._coordinator.load, 0)).data
+            snapshot = await asyncio.to_thread(self._restore_snapshot, data, previous)
+            snapshot.fetched_at = shared.updated_at
+            self._snapshot = snapshot
+            self._shared_version = shared.version
+        self._expires_at = shared.updated_at + self.ttl_seconds
+
+    @staticmethod
+    def _snapshot_to_shared(snapshot: CalendarSnapshot) -> dict:
+        sources = {
+            name: {"etag": state.etag, "last_modified": state.last_modified, "fetched_at": state.fetched_at, "error": state.error}
+            for name, state in snapshot.sources.items()
+        }
+        shared = {"events": snapshot.events, "sources": sources}
+        if snapshot.versions is not None:
+            # 워커마다 다른 version을 매기면 since 조회가 워커에 따라 full로 떨어지므로 게시자 값을 함께 공유.
+            shared["version"] = snapshot.versions.version
+        return shared
+
+    @staticmethod
+    def _revalidated(previous: CalendarSnapshot, fetched_at: float = None) -> CalendarSnapshot:
+        # 304: 본문이 같으므로 payload는 그대로 두고 신선도 기준 시각만 갱신.
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        if not previous.stale:
+            previous.fetched_at = fetched_at
+            return previous
+        payload = {k: v for k, v in previous.payload.items() if k != "last_success_at"}
+        payload["stale"] = False
+        return CalendarSnapshot(
+            payload=payload,
+            fetched_at=fetched_at,
+            sources=previous.sources,
+            stale=False,
+            events=previous.events,
+            index=previous.index,
+            recurrence=previous.recurrence,
+            versions=previous.versions,
+            display_date=previous.display_date,
+        )
+
+    @staticmethod
+    def _mark_stale(previous: CalendarSnapshot) -> CalendarSnapshot:
+        if previous.stale:
+            return previous
+        return CalendarSnapshot(
+            payload=dict(previous.payload, stale=True, last_success_at=_iso(previous.fetched_at)),
+            fetched_at=previous.fetched_at,
+            sources=previous.sources,
+            stale=True,
+            events=previous.events,
+            index=previous.index,
+            recurrence=previous.recurrence,
+            versions=previous.versions,
+            display_date=previous.display_date,
+        )
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def snapshot_from_events(events: list, sources: dict, source: str = "icloud") -> CalendarSnapshot:
+    """파싱된 이벤트 목록과 소스별 상태로 응답 payload/스냅샷 생성 (sources 순서대로 소스 요약 포함)."""
+    source_summary = []
+    for name, state in sources.items():
+        item = {"name": name, "count": len(state.events), "stale": bool(state.error)}
+        if state.error and state.fetched_at:
+            item["last_success_at"] = _iso(state.fetched_at)
+        source_summary.append(item)
+    payload = {
+        "source": source,
+        "count": len(events),
+        "events": events,
+        "sources": source_summary,
+        "stale": False,
+    }
+    return CalendarSnapshot(
+        payload=payload,
+        fetched_at=time.time(),
+        sources=sources,
+        events=events,
+    )
@@ -0,0 +1,166 @@
+"""
+Calendar Delta Versions (backend/calendar_delta.py)
+역할: 캘린더 원본(반복 마스터/개별 수정본/일반 일정)의 내용 해시로 version을 부여하고 (내용이 바뀐 갱신에서만 증가),
+      /calendar/events?since=<version>&since_date=<표시 기준일> 응답용 변경분(added/changed/removed/removed_series) 계산
+호출 관계: main.py (_indexed_calendar_snapshot, 갱신/공유 복원/날짜 재확장마다 1회, 워커 스레드) -> CalendarVersions.advance()
+          main.py (/calendar/events?since=) -> CalendarVersions.delta() (스냅샷 수명 동안 (since, since_date)별 응답 본문 캐시)
+수정 시 주의사항: 응답 이벤트 키는 `소스:id`(반복 회차는 `소스:uid#YYYYMMDDTHHMMSS`)이고, 같은 키가 겹치면 `~2`, `~3`을 붙입니다.
+  version은 날짜와 무관한 원본 내용만 봅니다. 날짜가 바뀌어 표시 구간 끝에서 빠지거나 들어오는 회차는
+  클라이언트가 보낸 since_date의 구간을 현재 시리즈로 다시 펼쳐 비교해 따로 계산합니다 (시리즈가 그대로인 경우만).
+  내용이 바뀐 시리즈(마스터 또는 개별 수정본)는 `removed_series`(`소스:uid` 접두어)로 통째로 지우고 현재 회차를 다시 보냅니다.
+  해시는 응답/원본 이벤트 dict 그대로(sort_keys JSON)로 계산하므로 워커가 달라도 같은 내용이면 같은 값입니다.
+  version은 밀리초 시각 기반이라 재시작해도 이전 값과 겹치지 않고, 이력에 없는 since는 전체 재동기화(full)로 응답합니다.
+  advance()는 이전 인스턴스를 바꾸지 않습니다 (이력 dict는 새로 만들고 해시 dict는 버전 간 공유).
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+
+
+def event_keys(events: list) -> list:
+    """이벤트 목록과 같은 순서의 안정 키 목록 (`소스:id`, 중복은 등장 순서대로 `~n`)."""
+    keys = []
+    seen = {}
+    for event in events:
+        key = f"{event.get('source', '')}:{event.get('id', '')}"
+        count = seen.get(key, 0) + 1
+        seen[key] = count
+        keys.append(key if count == 1 else f"{key}~{count}")
+    return keys
+
+
+def event_hash(event: dict) -> str:
+    encoded = json.dumps(event, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def series_prefix(key: str) -> str:
+    """응답 키가 속한 시리즈 접두어 (`소스:uid#회차` -> `소스:uid`, 반복이 아니면 키 그대로)."""
+    return key.split("#", 1)[0]
+
+
+def _series_hashes(source_events: list) -> dict:
+    """반복 마스터와 개별 수정본(RECURRENCE-ID)을 `소스:uid`별로 묶은 내용 해시."""
+    grouped = {}
+    for event in source_events:
+        if "recurrence" in event or "recurrence_id" in event:
+            grouped.setdefault(f"{event.get('source', '')}:{event.get('id', '')}", []).append(event_hash(event))
+    return {prefix: ",".join(sorted(hashes)) for prefix, hashes in grouped.items()}
+
+
+class CalendarVersions:
+    """
+    Purpose: 스냅샷 1개의 version + 응답 이벤트 키, 원본 내용 해시(일반 일정/시리즈별), 직전 version들의 해시 이력.
+    Input: advance(previous, display_events, source_events, recurrence, max_history, version=None)
+           - previous: 직전 스냅샷의 CalendarVersions (없으면 None)
+           - recurrence: 이 스냅샷의 RecurrenceExpander (base_events, display_date, 구간 재확장에 사용)
+           - version: 다른 워커가 게시한 값 (멀티 워커 모드에서 워커 간 version을 맞출 때)
+    Output: delta(since, since_date) -> {"added", "changed", "removed", "removed_series"} | None(전체 재동기화 필요)
+    """
+
+    def __init__(self, version: int, events: list, keys: list, base_hashes: dict, series_hashes: dict,
+                 history: OrderedDict, recurrence):
+        self.version = version
+        self.events = events
+        self.keys = keys
+        self.base_hashes = base_hashes
+        self.series_hashes = series_hashes
+        self.history = history
+        self.recurrence = recurrence
+        self.display_date = recurrence.display_date if recurrence is not None else None
+
+    @classmethod
+    def advance(cls, previous, display_events: list, source_events: list, recurrence, max_history: int,
+                version: int = None):
+        keys = event_keys(display_events)
+        # 반복 회차가 아닌 응답 이벤트(일반 일정, 개별 수정본, 확장하지 않는 시리즈 원본)는 날짜와 무관하게 항상 포함됨.
+        base_ids = {id(event) for event in recurrence.base_events} if recurrence is not None else None
+        base_hashes = {
+            key: event_hash(event)
+            for key, event in zip(keys, display_events)
+            if base_ids is None or id(event) in base_ids
+        }
+        series_hashes = _series_hashes(source_events)
+        if (
+            previous is not None
+            and base_hashes == previous.base_hashes
+            and series_hashes == previous.series_hashes
+            and version in (None, previous.version)
+        ):
+            # 원본 내용이 같으면 (날짜만 바뀌어 회차가 이동해도) version을 올리지 않음.
+            return cls(previous.version, display_events, keys, previous.base_hashes, previous.series_hashes,
+                       previous.history, recurrence)
+
+        history = OrderedDict(previous.history) if previous is not None else OrderedDict()
+        if previous is not None:
+            history[previous.version] = (previous.base_hashes, previous.series_hashes)
+        while len(history) > max(0, max_history):
+            history.popitem(last=False)
+        if version is None:
+            floor = previous.version + 1 if previous is not None else 1
+            version = max(floor, int(time.time() * 1000))
+        return cls(int(version), display_events, keys, base_hashes, series_hashes, history, recurrence)
+
+    def classify(self, since: int, since_date: date = None) -> str:
+        """since 요청 결과 종류: current(변경 없음) | delta | full (지표 라벨)."""
+        if since == self.version and since_date == self.display_date:
+            return "current"
+        return "delta" if since == self.version or since in self.history else "full"
+
+    def delta(self, since: int, since_date: date = None):
+        if since == self.version:
+            old_base, old_series = self.base_hashes, self.series_hashes
+        elif since in self.history:
+            old_base, old_series = self.history[since]
+        else:
+            return None
+
+        series_hashes = self.series_hashes
+        dirty = {
+            prefix for prefix in set(old_series) | set(series_hashes)
+            if old_series.get(prefix) != series_hashes.get(prefix)
+        }
+        if since_date != self.display_date and (since_date is None or self.display_date is None):
+            # 클라이언트가 받은 표시 구간을 알 수 없으면 모든 시리즈를 다시 보냄.
+            dirty |= set(old_series) | set(series_hashes)
+
+        old_instances = set()
+        if since_date is not None and since_date != self.display_date and self.display_date is not None:
+            recurrence = self.recurrence
+            start = datetime(since_date.year, since_date.month, since_date.day) - recurrence.past
+            old_instances = {
+                f"{event.get('source', '')}:{event.get('id', '')}"
+                for event in recurrence.occurrences(start, start + recurrence.past + recurrence.horizon)
+            }
+            old_instances = {key for key in old_instances if series_prefix(key) not in dirty}
+        moved = since_date != self.display_date
+
+        added = []
+        changed = []
+        current_instances = set()
+        base_hashes = self.base_hashes
+        for key, event in zip(self.keys, self.events):
+            new_hash = base_hashes.get(key)
+            if series_prefix(key) in dirty:
+                added.append(dict(event, key=key))
+            elif new_hash is not None:
+                old_hash = old_base.get(key)
+                if old_hash is None:
+                    added.append(dict(event, key=key))
+                elif old_hash != new_hash:
+                    changed.append(dict(event, key=key))
+            elif moved:
+                # 그대로인 시리즈의 회차: 이전 표시 구간에 없던 것만 새로 보냄.
+                current_instances.add(key)
+                if key not in old_instances:
+                    added.append(dict(event, key=key))
+        removed = [key for key in old_base if key not in base_hashes and series_prefix(key) not in dirty]
+        removed.extend(sorted(old_instances - current_instances))
+        return {"added": added, "changed": changed, "removed": removed, "removed_series": sorted(dirty)}
+
+    def keyed_events(self) -> list:
+        """전체 재동기화 응답용: 이벤트마다 key 필드를 붙인 사본."""
+        return [dict(event, key=key) for key, event in zip(self.keys, self.events)]
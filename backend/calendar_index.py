@@ -0,0 +1,104 @@
+"""
+Calendar Time Index (backend/calendar_index.py)
+역할: 캐시 갱신마다 1회 만드는 이벤트 시간 인덱스 (from/to 범위 조회 + 커서 페이지네이션)
+호출 관계: main.py (_build_calendar_snapshot) -> CalendarIndex(events)
+          main.py (/calendar/events?from=&to=&limit=&cursor=) -> CalendarIndex.query()
+수정 시 주의사항: 시간 비교 키는 ISO 문자열 앞 19자(YYYY-MM-DDTHH:MM:SS, 벽시계 기준)입니다.
+  backend.ics_parser.parse_ics_events의 정렬 기준(start 문자열)과 같은 방식으로 비교해야 결과가 일관됩니다.
+"""
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from operator import itemgetter
+
+TIME_KEY_LENGTH = 19
+
+
+class InvalidCalendarQueryError(ValueError):
+    """from/to/cursor 형식 오류 (호출자는 400으로 응답)."""
+
+
+def time_key(iso_text: str) -> str:
+    return (iso_text or "")[:TIME_KEY_LENGTH]
+
+
+def parse_query_time(raw: str) -> str:
+    """'2026-02-20' 또는 ISO datetime 문자열을 비교 키로 변환."""
+    text = (raw or "").strip()
+    if not text:
+        return ""
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise InvalidCalendarQueryError(f"Invalid datetime: {text}") from exc
+    return time_key(parsed.replace(tzinfo=None).isoformat(timespec="seconds"))
+
+
+def encode_cursor(sort_key) -> str:
+    raw = json.dumps(list(sort_key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start, event_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (str(start), str(event_id))
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise InvalidCalendarQueryError("Invalid cursor") from exc
+
+
+class CalendarIndex:
+    """
+    Purpose: 시작 시각 정렬 배열 + 종료 시각 prefix-max 배열로 구간 겹침 조회를 bisect로 처리.
+    Input: events(list[dict]) - start/end/id 필드를 가진 응답용 이벤트
+    Output: query() -> (events_page, next_cursor | None)
+    Side Effects: 없음 (생성 후 불변, 여러 요청이 동시에 읽어도 안전)
+    """
+
+    def __init__(self, events: list):
+        # 키만 비교 (여러 캘린더에 같은 UID/시작 시각이 있어도 이벤트 dict끼리 비교하지 않도록 안정 정렬).
+        keyed = sorted(
+            (((time_key(ev.get("start")), str(ev.get("id", ""))), ev) for ev in events),
+            key=itemgetter(0),
+        )
+        self._sort_keys = [key for key, _ in keyed]
+        self._start_keys = [key[0] for key in self._sort_keys]
+        self._events = [ev for _, ev in keyed]
+        self._end_keys = []
+        self._max_end_keys = []
+        running_max = ""
+        for (start, _), ev in keyed:
+            end = time_key(ev.get("end")) or start
+            self._end_keys.append(end)
+            running_max = max(running_max, end)
+            self._max_end_keys.append(running_max)
+
+    def __len__(self):
+        return len(self._events)
+
+    def query(self, start_key: str = "", end_key: str = "", limit: int = 0, cursor: str = ""):
+        """
+        Purpose: [start_key, end_key) 구간과 겹치는 이벤트를 시작 시각 순으로 반환.
+        Input: 비교 키(parse_query_time 결과), limit(0이면 제한 없음), cursor(이전 페이지의 next_cursor)
+        Output: (events, next_cursor)
+        Exceptions: InvalidCalendarQueryError (cursor 형식 오류)
+        """
+        # 종료 시각 prefix-max가 start_key 이상이 되는 첫 위치 이전 이벤트는 모두 구간 밖.
+        lo = bisect_left(self._max_end_keys, start_key) if start_key else 0
+        if cursor:
+            lo = max(lo, bisect_right(self._sort_keys, decode_cursor(cursor)))
+        hi = bisect_left(self._start_keys, end_key) if end_key else len(self._events)
+
+        page = []
+        for i in range(lo, hi):
+            if start_key and self._end_keys[i] < start_key:
+                continue
+            page.append(self._events[i])
+            if limit and len(page) >= limit:
+                next_cursor = encode_cursor(self._sort_keys[i]) if i + 1 < hi else None
+                return page, next_cursor
+        return page, None
@@ -0,0 +1,190 @@
+"""
+Calendar Sources (backend/calendar_sources.py)
+역할: 여러 ICS 캘린더(러닝 모임/대회/DJ 등)를 keep-alive 연결 풀 1개로 동시에 조회하고, 소스별 정렬된 이벤트를 k-way 병합
+호출 관계: main.py (_fetch_calendar_sources, 이벤트 루프) -> CalendarSourceFetcher.fetch_all()
+          main.py (_build_calendar_snapshot, 워커 스레드) -> merge_source_events()
+          main.py (shutdown 이벤트) -> CalendarSourceFetcher.aclose()
+수정 시 주의사항: fetch_all()은 이벤트 루프에서만 호출합니다 (httpx.AsyncClient는 처음 쓴 루프에 묶임).
+  소스마다 deadline(timeout_seconds)이 따로 걸려 느린/실패한 소스가 다른 소스의 결과를 막거나 버리게 하지 않습니다.
+  실패한 소스는 SourceResult(status=0, error=...)로 돌려주며, 직전 정상 이벤트를 계속 쓸지는 호출자가 정합니다.
+  본문 디코딩/파싱은 이벤트 루프를 막지 않도록 호출자가 워커 스레드에서 합니다.
+  merge_source_events()는 소스별 목록이 이미 start 순으로 정렬돼 있다고 가정합니다 (parse_ics_events 결과).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from heapq import merge
+from operator import itemgetter
+
+import httpx
+
+logger = logging.getLogger("DevilTown")
+
+# 소스 1개만 설정하면 기존 응답과 같은 이름을 씀 (`source: "icloud"`).
+DEFAULT_SOURCE_NAME = "icloud"
+
+
+@dataclass(frozen=True)
+class CalendarSource:
+    name: str
+    url: str
+
+
+@dataclass
+class SourceResult:
+    """소스 1개의 조회 결과. status: 200(본문 있음) / 304(변경 없음) / 0(실패, error에 사유). body는 디코딩 전 bytes."""
+    name: str
+    status: int
+    body: bytes = b""
+    etag: str = ""
+    last_modified: str = ""
+    error: str = ""
+    duration_ms: int = 0
+
+
+def _normalize_url(raw_url: str) -> str:
+    if raw_url.startswith("webcal://"):
+        return "https://" + raw_url[len("webcal://"):]
+    return raw_url
+
+
+def parse_calendar_sources(raw: str) -> list:
+    """
+    Purpose: 쉼표로 구분한 ICS 소스 목록을 파싱. 항목은 `이름=URL` 또는 URL만.
+    Input: 예) "runs=webcal://p44.../a,races=https://.../b" / "https://.../calendar.ics"
+    Output: [CalendarSource] (URL이 빈 항목은 제외, 이름 중복 시 뒤에 -2, -3을 붙임)
+    """
+    entries = [item.strip() for item in (raw or "").split(",") if item.strip()]
+    sources = []
+    used = set()
+    for position, entry in enumerate(entries, start=1):
+        name, url = "", entry
+        head, sep, tail = entry.partition("=")
+        # URL 쿼리 문자열의 '='와 구분: 이름 부분에는 ':'나 '/'가 없음.
+        if sep and head and ":" not in head and "/" not in head:
+            name, url = head.strip().lower(), tail.strip()
+        if not url:
+            continue
+        if not name:
+            name = DEFAULT_SOURCE_NAME if len(entries) == 1 else f"calendar-{position}"
+        unique = name
+        suffix = 2
+        while unique in used:
+            unique = f"{name}-{suffix}"
+            suffix += 1
+        used.add(unique)
+        sources.append(CalendarSource(name=unique, url=_normalize_url(url)))
+    return sources
+
+
+class CalendarSourceFetcher:
+    """
+    Purpose: 모든 소스를 하나의 AsyncClient(연결 풀/keep-alive)로 동시에 조건부 GET.
+    Input: sources([CalendarSource]), timeout_seconds(소스별 전체 응답 deadline), user_agent,
+           max_connections(풀 크기), keepalive_seconds(유휴 연결 유지 시간 - 캐시 TTL보다 길게)
+    Output: fetch_all() -> [SourceResult] (sources 순서)
+    Side Effects: 외부 HTTP 호출, 첫 호출 시 AsyncClient 생성
+    """
+
+    def __init__(
+        self,
+        sources,
+        timeout_seconds: float,
+        user_agent: str,
+        max_connections: int = 8,
+        keepalive_seconds: float = 300.0,
+    ):
+        self.sources = list(sources)
+        self.timeout_seconds = max(1.0, float(timeout_seconds))
+        self.user_agent = user_agent
+        self.max_connections = max(1, int(max_connections))
+        self.keepalive_seconds = max(1.0, float(keepalive_seconds))
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": self.user_agent},
+                timeout=httpx.Timeout(self.timeout_seconds, connect=min(5.0, self.timeout_seconds)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def fetch_all(self, validators: dict = None) -> list:
+        """
+        Purpose: 모든 소스를 동시에 조회 (소스별 deadline, 실패는 결과로 격리).
+        Input: validators - {소스 이름: (etag, last_modified)} (직전 정상 응답의 검증자)
+        Output: [SourceResult] (sources 순서, 예외를 던지지 않음)
+        """
+        validators = validators or {}
+        client = self._get_client()
+        return list(
+            await asyncio.gather(
+                *(self._fetch_one(client, source, *validators.get(source.name, ("", ""))) for source in self.sources)
+            )
+        )
+
+    async def _fetch_one(self, client, source: CalendarSource, etag: str, last_modified: str) -> SourceResult:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        started = time.perf_counter()
+        try:
+            # httpx timeout은 연결/읽기 단계별이라 본문을 조금씩 흘리는 소스도 끊도록 전체 deadline을 한 번 더 건다.
+            res = await asyncio.wait_for(client.get(source.url, headers=headers), self.timeout_seconds)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            if res.status_code == 304:
+                return SourceResult(name=source.name, status=304, duration_ms=duration_ms)
+            res.raise_for_status()
+            return SourceResult(
+                name=source.name,
+                status=200,
+                body=res.content,
+                etag=res.headers.get("ETag", "") or "",
+                last_modified=res.headers.get("Last-Modified", "") or "",
+                duration_ms=duration_ms,
+            )
+        except Exception as e:
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            reason = _failure_reason(e)
+            logger.warning(
+                f"Calendar source failed source={source.name}: {reason}",
+                extra={"step": "CALENDAR_SOURCE", "status": "FAIL", "duration_ms": duration_ms},
+            )
+            return SourceResult(name=source.name, status=0, error=reason, duration_ms=duration_ms)
+
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+def _failure_reason(error: Exception) -> str:
+    # 공개 캘린더 URL 자체가 비밀 토큰이므로 URL이 들어가는 예외 메시지 대신 상태/종류만 남김.
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    return type(error).__name__
+
+
+def merge_source_events(streams) -> list:
+    """
+    Purpose: 소스별로 이미 start 순 정렬된 이벤트 목록을 k-way 힙 병합 (전체 재정렬 없음, O(N log k)).
+    Input: streams - [(소스 이름, [event dict])] (event에는 이미 "source"가 붙어 있음)
+    Output: start 순 단일 목록 (같은 start는 streams 순서 유지)
+    """
+    lists = [events for _, events in streams if events]
+    if len(lists) == 1:
+        return list(lists[0])
+    return list(merge(*lists, key=itemgetter("start")))
@@ -0,0 +1,168 @@
+"""
+Chat Response Cache (backend/chat_response_cache.py)
+역할: 같은 (프롬프트 해시, 모델, 히스토리, 메시지) 채팅 요청의 응답 재사용 (LRU + TTL + 메모리 상한, 키당 여러 변형)
+      + 동시에 들어온 동일 요청을 업스트림 호출 1회로 합치기(coalescing)
+호출 관계: main.py (/chat, /chat/stream) -> ChatResponseCache.get_or_compute() / get() / put()
+수정 시 주의사항: 이벤트 루프 스레드에서만 접근합니다 (락 없음, in-flight는 asyncio.Future).
+  키당 variants개의 응답이 모일 때까지는 miss로 처리해 새 응답을 생성하므로, 같은 인사말에도 답이 돌아가며 나옵니다.
+  업스트림 예외는 캐시하지 않고, 합쳐진 대기자 전원에게 같은 예외를 전달합니다.
+  선행 요청이 취소되면(클라이언트 disconnect) 대기자에게 CancelledError를 넘기지 않고 대기자 중 하나가 이어서 생성합니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+# 키 문자열/리스트/OrderedDict 노드 등 응답 본문 외 항목당 대략적인 고정 비용.
+ENTRY_OVERHEAD_BYTES = 256
+_TRAILING_PUNCTUATION = " .!?~"
+
+
+class _LeaderCancelled(Exception):
+    """선행 요청이 취소돼 결과가 없음. 대기자 자신의 취소(CancelledError)와 구분하기 위한 내부 신호."""
+
+
+def normalize_text(text: str) -> str:
+    """공백 정리 + 대소문자 무시 + 끝 문장부호 제거 ("안녕?" == "안녕 ")."""
+    return " ".join(str(text or "").split()).casefold().rstrip(_TRAILING_PUNCTUATION)
+
+
+class _Entry:
+    __slots__ = ("replies", "size", "expires_at", "next_index")
+
+    def __init__(self, expires_at: float, size: int):
+        self.replies = []
+        self.size = size
+        self.expires_at = expires_at
+        self.next_index = 0
+
+
+class ChatResponseCache:
+    """
+    Purpose: 채팅 응답 캐시. 조회 hit이면 Gemini 호출 없이 저장된 변형 중 하나를 순환 반환.
+    Input: max_entries, max_bytes(응답 본문 + 항목 오버헤드 합계 상한), ttl_seconds, variants(키당 보관 응답 수)
+    Output: get_or_compute(key, compute) -> (text, "hit" | "coalesced" | "miss")
+    Side Effects: 없음 (메모리 내 상태만 변경)
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, variants: int = 1, clock=time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl_seconds = max(1.0, float(ttl_seconds))
+        self.variants = max(1, int(variants))
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(prompt_hash: str, model: str, history: list, message: str) -> str:
+        normalized_history = [(msg["role"], normalize_text(msg["content"])) for msg in history]
+        raw = json.dumps(
+            [prompt_hash or "", model, normalized_history, normalize_text(message)],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """변형이 다 모인 유효 항목이면 다음 변형을, 아니면 None (hit/miss 통계 갱신)."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            self._remove(key)
+            entry = None
+        if entry is None or len(entry.replies) < self.variants:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        reply = entry.replies[entry.next_index % len(entry.replies)]
+        entry.next_index += 1
+        return reply
+
+    def put(self, key: str, text: str):
+        if not text:
+            return
+        size = len(text.encode("utf-8"))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(self._clock() + self.ttl_seconds, ENTRY_OVERHEAD_BYTES)
+            self._entries[key] = entry
+            self.bytes_used += ENTRY_OVERHEAD_BYTES
+        elif len(entry.replies) >= self.variants or text in entry.replies:
+            return
+        entry.replies.append(text)
+        entry.size += size
+        self.bytes_used += size
+        self._entries.move_to_end(key)
+        self._evict()
+
+    async def get_or_compute(self, key: str, compute):
+        """
+        Purpose: 캐시 조회 -> 같은 키가 생성 중이면 그 결과를 기다림 -> 아니면 compute() 1회 실행 후 저장.
+        Input: key(make_key 결과), compute(인자 없는 코루틴 함수)
+        Output: (text, source)
+        Exceptions: compute()가 던진 예외 (합쳐진 대기자에게도 동일하게 전달)
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, "hit"
+            pending = self._in_flight.get(key)
+            if pending is None:
+                return await self._compute(key, compute), "miss"
+            self.coalesced += 1
+            try:
+                # 대기자 하나가 취소돼도 선행 요청의 Future는 취소되지 않도록 shield.
+                return await asyncio.shield(pending), "coalesced"
+            except _LeaderCancelled:
+                # 선행 요청만 취소된 것이므로 처음부터 다시: 먼저 깨어난 대기자가 선행 요청이 되고 나머지는 그에 합류.
+                self.coalesced -= 1
+
+    async def _compute(self, key: str, compute):
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            text = await compute()
+        except BaseException as e:
+            # 취소는 그대로 넘기면 대기자가 자기 취소와 구분할 수 없으므로 내부 신호로 바꿔 전달.
+            future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+            # 대기자가 없어도 "exception was never retrieved" 경고가 나지 않도록 회수 표시.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        future.set_result(text)
+        self.put(key, text)
+        return text
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.bytes_used -= entry.size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self.bytes_used -= entry.size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes_used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
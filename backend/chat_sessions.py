@@ -0,0 +1,171 @@
+"""
+Chat Session Store (backend/chat_sessions.py)
+역할: 서버 측 대화 상태(LRU + TTL) 보관, 토큰 예산 기준 히스토리 절단, 오래된 턴의 롤링 요약
+호출 관계: main.py (/chat, /chat/stream: session_id 사용 시) -> ChatSessionStore.get()/create() -> ChatSession
+수정 시 주의사항: 이벤트 루프 스레드에서만 접근합니다 (락 없음). 워커 스레드에는 model_history() 결과(복사본)만 넘깁니다.
+  토큰 수는 근사치(estimate_tokens)이며 턴 생성 시 1회만 계산해 캐시합니다.
+  요약은 LLM 호출 없는 추출식(각 턴의 첫 문장)이라 비용이 없습니다.
+"""
+
+import re
+import secrets
+import time
+from collections import OrderedDict, deque
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s|\n")
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+SUMMARY_USER_PREFIX = "[이전 대화 요약]\n"
+SUMMARY_ACK = "기억하고 있다. 계속해."
+
+
+def estimate_tokens(text: str) -> int:
+    """Gemini 토큰 수 근사: ASCII 약 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰."""
+    ascii_count = sum(1 for ch in text if ch < "\x80")
+    return (ascii_count + 3) // 4 + (len(text) - ascii_count) + 1
+
+
+class Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+        self.tokens = estimate_tokens(content)
+
+
+def _first_sentence(text: str, max_chars: int = 80) -> str:
+    head = _SENTENCE_END.split(text.strip(), maxsplit=1)[0].strip()
+    return head if len(head) <= max_chars else head[: max_chars - 1] + "…"
+
+
+def trim_to_budget(history: list, token_budget: int) -> list:
+    """최근 턴부터 거꾸로 담아 토큰 예산 안의 히스토리만 반환 (user로 시작하도록 정렬)."""
+    kept = []
+    used = 0
+    for msg in reversed(history):
+        tokens = estimate_tokens(msg["content"])
+        if kept and used + tokens > token_budget:
+            break
+        kept.append(msg)
+        used += tokens
+    kept.reverse()
+    # Gemini 히스토리는 user 턴으로 시작해야 하므로 앞쪽의 고아 assistant 턴 제거.
+    while kept and kept[0]["role"] != "user":
+        kept.pop(0)
+    return kept
+
+
+class ChatSession:
+    """
+    Purpose: 세션 1개의 턴 목록 + 롤링 요약. 예산 초과 시 가장 오래된 턴 쌍을 요약으로 접음.
+    Input: session_id, token_budget(턴 합계 상한), summary_max_tokens(요약 상한)
+    Output: model_history() -> [{"role", "content"}] (요약 쌍 + 최근 턴)
+    """
+
+    def __init__(self, session_id: str, token_budget: int, summary_max_tokens: int):
+        self.session_id = session_id
+        self.token_budget = max(1, int(token_budget))
+        self.summary_max_tokens = max(0, int(summary_max_tokens))
+        self.turns = deque()
+        self.turn_tokens = 0
+        self.summary_lines = deque()
+        self.summary_tokens = 0
+        self.last_access = time.monotonic()
+
+    def append(self, role: str, content: str):
+        turn = Turn(role, content)
+        self.turns.append(turn)
+        self.turn_tokens += turn.tokens
+        self._compact()
+
+    def _compact(self):
+        # 다음 user 턴 직전까지(user 턴 + 뒤따르는 assistant 턴 전부) 밀어내 히스토리가 항상 user 턴으로 시작하도록 유지.
+        # 뒤에 user 턴이 없으면 더 밀어내지 않음 (마지막 user 턴과 그 응답은 예산을 넘어도 유지).
+        while self.turn_tokens > self.token_budget and len(self.turns) > 2:
+            cut = 1
+            while cut < len(self.turns) and self.turns[cut].role != "user":
+                cut += 1
+            if cut == len(self.turns):
+                break
+            evicted = [self.turns.popleft() for _ in range(cut)]
+            for turn in evicted:
+                self.turn_tokens -= turn.tokens
+            self._summarize(evicted)
+
+    def _summarize(self, turns):
+        if not self.summary_max_tokens:
+            return
+        for turn in turns:
+            speaker = "사용자" if turn.role == "user" else "코치"
+            line = f"- {speaker}: {_first_sentence(turn.content)}"
+            tokens = estimate_tokens(line)
+            self.summary_lines.append((line, tokens))
+            self.summary_tokens += tokens
+        while self.summary_tokens > self.summary_max_tokens and self.summary_lines:
+            _, tokens = self.summary_lines.popleft()
+            self.summary_tokens -= tokens
+
+    def model_history(self) -> list:
+        history = []
+        if self.summary_lines:
+            summary = "\n".join(line for line, _ in self.summary_lines)
+            history.append({"role": "user", "content": SUMMARY_USER_PREFIX + summary})
+            history.append({"role": "assistant", "content": SUMMARY_ACK})
+        history.extend({"role": turn.role, "content": turn.content} for turn in self.turns)
+        return history
+
+    def seed(self, history: list):
+        # 클라이언트 히스토리는 잘린 채로 올 수 있으므로 앞쪽의 고아 assistant 턴은 버림 (trim_to_budget과 동일).
+        started = False
+        for msg in history:
+            started = started or msg["role"] == "user"
+            if started:
+                self.append(msg["role"], msg["content"])
+
+
+class ChatSessionStore:
+    """
+    Purpose: session_id -> ChatSession 매핑 (최대 max_sessions개 LRU, 마지막 사용 후 ttl_seconds 만료).
+    Input: max_sessions, ttl_seconds, token_budget, summary_max_tokens
+    Output: get(session_id) -> ChatSession | None, create() -> ChatSession (새 ID 발급)
+    Side Effects: 없음 (메모리 내 상태만 변경)
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float, token_budget: int, summary_max_tokens: int):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_seconds = max(1.0, float(ttl_seconds))
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self._sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, now: float):
+        # LRU 순서 = 마지막 사용 순서이므로 앞쪽만 확인하면 됨 (상환 O(1)).
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id: str):
+        """보관 중인 세션을 돌려주고 사용 시각을 갱신. 모르는/만료된/형식이 틀린 ID는 None."""
+        now = time.monotonic()
+        self._expire(now)
+        valid = bool(session_id) and SESSION_ID_PATTERN.match(session_id) is not None
+        session = self._sessions.get(session_id) if valid else None
+        if session is not None:
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def create(self):
+        # 클라이언트가 고른 ID는 쓰지 않고 서버가 새 ID를 발급 (추측 가능한 ID로 세션 생성 방지).
+        new_id = secrets.token_urlsafe(18)
+        session = ChatSession(new_id, self.token_budget, self.summary_max_tokens)
+        self._sessions[new_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,151 @@
+"""
+Skull Dice Comment Pool (backend/dice_comment_pool.py)
+역할: 거리별로 미리 생성한 독설 코멘트를 메모리에 보관하고 백그라운드에서 배치로 보충
+호출 관계: main.py (/dice-comment) -> DiceCommentPool.pop()/recycle()
+          main.py (startup) -> DiceCommentPool.start() -> refill loop -> generate_batch(async)
+수정 시 주의사항: 거리 목록은 js/game_video.js의 finalizeGameResult 분포와 일치해야 합니다.
+  pop()은 이벤트 루프 스레드에서만 호출됩니다(락 없음).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+logger = logging.getLogger("DevilTown")
+
+# finalizeGameResult가 만들 수 있는 거리 전체 (0km, 42.195km, 30km LSD, 3~21km)
+DICE_DISTANCES = ("0km", "42.195km", "30km LSD") + tuple(f"{km}km" for km in range(3, 22))
+
+
+class DiceCommentPool:
+    """
+    Purpose: 주사위 요청을 업스트림 호출 없이 O(1) 메모리 pop으로 처리.
+    Input: generate_batch(distance, count) -> list[str] 코루틴 함수, 워터마크/주기 설정
+    Output: pop() -> 코멘트 또는 None(풀 비어 있음)
+    Side Effects: start() 이후 백그라운드 태스크가 generate_batch(Gemini)를 호출
+    Exceptions: generate_batch 예외는 로그 후 backoff (요청 경로로 전파되지 않음)
+    """
+
+    def __init__(
+        self,
+        generate_batch,
+        distances=DICE_DISTANCES,
+        low_watermark: int = 3,
+        high_watermark: int = 12,
+        recent_window: int = 24,
+        refill_interval_seconds: float = 30.0,
+        failure_backoff_seconds: float = 60.0,
+    ):
+        self._generate_batch = generate_batch
+        self.low_watermark = max(0, int(low_watermark))
+        self.high_watermark = max(self.low_watermark + 1, int(high_watermark))
+        self.refill_interval_seconds = max(1.0, float(refill_interval_seconds))
+        self.failure_backoff_seconds = max(1.0, float(failure_backoff_seconds))
+        self._pools = {distance: deque() for distance in distances}
+        # 최근에 내보낸 코멘트는 보충 시 다시 넣지 않아 같은 문구 반복을 줄임.
+        self._recent = {distance: deque(maxlen=max(1, int(recent_window))) for distance in distances}
+        self._wake = None
+        self._task = None
+        self._backoff_until = 0.0
+
+    def supports(self, distance: str) -> bool:
+        return distance in self._pools
+
+    def size(self, distance: str) -> int:
+        pool = self._pools.get(distance)
+        return len(pool) if pool is not None else 0
+
+    def pop(self, distance: str):
+        pool = self._pools.get(distance)
+        if not pool:
+            self._request_refill()
+            return None
+        comment = pool.popleft()
+        self._recent[distance].append(comment)
+        if len(pool) < self.low_watermark:
+            self._request_refill()
+        return comment
+
+    def recycle(self, distance: str):
+        """풀과 업스트림이 모두 불가할 때 최근 사용 문구 중 하나를 재사용 (없으면 None)."""
+        recent = self._recent.get(distance)
+        if not recent:
+            return None
+        return random.choice(recent)
+
+    def _request_refill(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refill_loop(self):
+        while True:
+            self._wake.clear()
+            if time.monotonic() >= self._backoff_until:
+                await self._refill_low_pools()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refill_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill_low_pools(self):
+        # 가장 비어 있는 거리부터 하나씩 채워 사용자 요청용 LLM 슬롯을 독점하지 않음.
+        low = sorted(
+            (d for d, pool in self._pools.items() if len(pool) < self.low_watermark),
+            key=lambda d: len(self._pools[d]),
+        )
+        for distance in low:
+            if not await self._refill_one(distance):
+                self._backoff_until = time.monotonic() + self.failure_backoff_seconds
+                return
+
+    async def _refill_one(self, distance: str) -> bool:
+        pool = self._pools[distance]
+        wanted = self.high_watermark - len(pool)
+        if wanted <= 0:
+            return True
+
+        started = time.time()
+        try:
+            batch = await self._generate_batch(distance, wanted)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                f"Dice pool refill failed distance={distance}: {e}. backoff_s={self.failure_backoff_seconds}",
+                extra={"step": "DICE_POOL_REFILL", "status": "FAIL"},
+            )
+            return False
+
+        blocked = set(pool) | set(self._recent[distance])
+        fresh = []
+        for comment in batch:
+            if comment and comment not in blocked:
+                blocked.add(comment)
+                fresh.append(comment)
+        random.shuffle(fresh)
+        pool.extend(fresh[:wanted])
+
+        duration = int((time.time() - started) * 1000)
+        logger.info(
+            f"Dice pool refilled distance={distance} added={min(len(fresh), wanted)} size={len(pool)}",
+            extra={"step": "DICE_POOL_REFILL", "duration_ms": duration},
+        )
+        return True
@@ -0,0 +1,593 @@
+"""
+ICS Parser (backend/ics_parser.py)
+역할: iCloud 공개 ICS 본문을 응답용 이벤트 목록으로 변환하는 단일 패스 스트리밍 파서
+      (라인 unfolding 제너레이터, 길이/접미사 분기 날짜 파싱 + 메모이즈, TZID/VTIMEZONE 해석)
+호출 관계: main.py (_build_calendar_snapshot, 워커 스레드) -> parse_ics_events()
+          bench/bench_ics_parser.py -> parse_ics_events() (기존 파서와 속도/메모리 비교)
+수정 시 주의사항: 문서 전체를 펼친 사본을 만들지 마세요 (iter_unfolded_lines는 한 줄씩 yield).
+  TZID는 IANA 이름(zoneinfo, Windows는 tzdata 패키지 필요) -> 문서의 VTIMEZONE -> 경로형 이름의 뒷부분 순으로 해석하고,
+  모두 실패하면 기존처럼 오프셋 없는 벽시계 시각을 반환합니다. VTIMEZONE은 사용하는 VEVENT보다 앞에 있어야 합니다.
+  start/end 문자열은 해당 시간대의 벽시계 시각 + 오프셋입니다 (calendar_index의 비교 키가 앞 19자를 씀).
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # pragma: no cover - Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+# 응답 payload/반복 확장에 쓰는 VEVENT 속성만 보관 (나머지는 파싱 단계에서 버림).
+EVENT_PROPERTIES = frozenset(
+    {"UID", "SUMMARY", "LOCATION", "DESCRIPTION", "DTSTART", "DTEND", "RRULE", "RECURRENCE-ID"}
+)
+# 여러 줄에 나뉘어 올 수 있어 모두 모으는 속성.
+MULTI_PROPERTIES = frozenset({"CATEGORIES", "EXDATE", "RDATE"})
+# TZID 파라미터를 읽어야 하는 날짜 속성.
+DATE_PROPERTIES = frozenset({"DTSTART", "DTEND", "RECURRENCE-ID", "EXDATE", "RDATE"})
+TIMEZONE_PROPERTIES = frozenset({"TZID", "DTSTART", "TZOFFSETFROM", "TZOFFSETTO", "RRULE"})
+
+# iter_physical_lines가 한 번에 splitlines()하는 구간 크기 (문자 수). 메모리 상한과 C 루프 효율의 절충.
+CHUNK_CHARS = 64 * 1024
+# 문서 단위 날짜 메모의 항목 수 상한. 넘으면 비워서 캘린더 크기와 무관하게 임시 메모리를 일정하게 유지.
+MEMO_MAX_ENTRIES = 4096
+
+_ESCAPE_PATTERN = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "N": "\n", ",": ",", ";": ";", "\\": "\\"}
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+
+def iter_physical_lines(text: str, chunk_chars: int = CHUNK_CHARS):
+    """본문을 chunk_chars 단위(줄 경계)로 잘라 물리 줄을 하나씩 yield. 전체 줄 목록을 한 번에 만들지 않음."""
+    pos = 0
+    length = len(text)
+    while pos < length:
+        end = text.find("\n", pos + chunk_chars)
+        end = length if end == -1 else end + 1
+        yield from text[pos:end].splitlines()
+        pos = end
+
+
+def iter_unfolded_lines(lines):
+    """RFC 5545 folding(공백/탭으로 시작하는 연속 줄)을 펼친 논리 줄을 하나씩 yield."""
+    pending = None
+    parts = None
+    for line in lines:
+        if line[:1] in (" ", "\t"):
+            if pending is None:
+                continue
+            if parts is None:
+                parts = [pending]
+            parts.append(line[1:])
+            continue
+        if pending is not None:
+            yield "".join(parts) if parts is not None else pending
+        pending = line
+        parts = None
+    if pending is not None:
+        yield "".join(parts) if parts is not None else pending
+
+
+def clean_ics_text(value: str) -> str:
+    """TEXT 값 이스케이프(\\n, \\, \\; \\\\) 해제. 역슬래시가 없으면 strip만."""
+    if not value:
+        return ""
+    if "\\" not in value:
+        return value.strip()
+    if "\\\\" in value:
+        # 이스케이프된 역슬래시가 있으면 순서 의존 없이 한 번에 치환.
+        return _ESCAPE_PATTERN.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value).strip()
+    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").strip()
+
+
+def split_property(line: str):
+    """
+    Purpose: 'NAME;PARAM=V;...:VALUE' 한 줄을 (NAME 대문자, params dict, value)로 분리.
+    Output: 콜론이 없으면 None. 따옴표로 감싼 파라미터 값 안의 ':' ';'는 구분자로 보지 않음.
+    """
+    colon = line.find(":")
+    if colon == -1:
+        return None
+    semi = line.find(";", 0, colon)
+    if semi == -1:
+        return line[:colon].upper(), None, line[colon + 1:]
+
+    if '"' in line[semi:colon]:
+        in_quotes = False
+        for i in range(semi, len(line)):
+            char = line[i]
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ":" and not in_quotes:
+                colon = i
+                break
+        else:
+            return None
+
+    params = {}
+    for item in _split_params(line[semi + 1:colon]):
+        key, sep, val = item.partition("=")
+        if sep:
+            params[key.upper()] = val.strip('"')
+    return line[:semi].upper(), params, line[colon + 1:]
+
+
+def _split_params(text: str):
+    if '"' not in text:
+        return text.split(";")
+    items = []
+    start = 0
+    in_quotes = False
+    for i, char in enumerate(text):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ";" and not in_quotes:
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return items
+
+
+def _digits(value: str, start: int, end: int):
+    chunk = value[start:end]
+    return int(chunk) if chunk.isdigit() else None
+
+
+def parse_ics_datetime(value: str, tz=None):
+    """
+    Purpose: DATE / DATE-TIME 값을 형식 문자열 시도 없이 길이와 'Z' 접미사로 분기해 파싱.
+    Input: value('20260105', '20260105T070000', '20260105T070000Z', 초 생략형), tz(TZID로 해석된 tzinfo 또는 None)
+    Output: (datetime | None, all_day)
+    """
+    raw = (value or "").strip()
+    length = len(raw)
+    utc = raw.endswith("Z")
+    if utc:
+        raw = raw[:-1]
+        length -= 1
+
+    year = _digits(raw, 0, 4)
+    month = _digits(raw, 4, 6)
+    day = _digits(raw, 6, 8)
+    if year is None or month is None or day is None:
+        return None, False
+
+    if length == 8 and not utc:
+        try:
+            return datetime(year, month, day), True
+        except ValueError:
+            return None, False
+
+    if length not in (13, 15) or raw[8] != "T":
+        return None, False
+    hour = _digits(raw, 9, 11)
+    minute = _digits(raw, 11, 13)
+    second = _digits(raw, 13, 15) if length == 15 else 0
+    if hour is None or minute is None or second is None:
+        return None, False
+
+    try:
+        parsed = datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        return None, False
+    if utc:
+        return parsed.replace(tzinfo=timezone.utc), False
+    if tz is not None:
+        return parsed.replace(tzinfo=tz), False
+    return parsed, False
+
+
+@lru_cache(maxsize=256)
+def load_zoneinfo(name: str):
+    if ZoneInfo is None or not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        return None
+
+
+def _parse_utc_offset(value: str):
+    """'+0900' / '-0430' / '+093000' -> timedelta (형식 오류는 None)."""
+    raw = (value or "").strip()
+    if len(raw) not in (5, 7) or raw[0] not in "+-" or not raw[1:].isdigit():
+        return None
+    seconds = int(raw[1:3]) * 3600 + int(raw[3:5]) * 60 + (int(raw[5:7]) if len(raw) == 7 else 0)
+    return timedelta(seconds=-seconds if raw[0] == "-" else seconds)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, nth: int):
+    """month의 nth번째(음수면 끝에서부터) weekday 날짜."""
+    if nth > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-nth - 1))
+
+
+class _Observance:
+    """VTIMEZONE의 STANDARD/DAYLIGHT 1개. RRULE은 FREQ=YEARLY;BYMONTH;BYDAY(±nWD) 형식만 해석."""
+
+    __slots__ = ("start", "offset_from", "offset_to", "month", "weekday", "nth")
+
+    def __init__(self, start: datetime, offset_from: timedelta, offset_to: timedelta, rrule: str):
+        self.start = start
+        self.offset_from = offset_from
+        self.offset_to = offset_to
+        self.month = None
+        self.weekday = None
+        self.nth = None
+        rule = dict(part.partition("=")[::2] for part in (rrule or "").upper().split(";") if "=" in part)
+        byday = rule.get("BYDAY", "")
+        if rule.get("FREQ") == "YEARLY" and rule.get("BYMONTH", "").isdigit() and byday[-2:] in _WEEKDAYS:
+            nth_text = byday[:-2] or "1"
+            if nth_text.lstrip("+-").isdigit():
+                self.month = int(rule["BYMONTH"])
+                self.weekday = _WEEKDAYS[byday[-2:]]
+                self.nth = int(nth_text)
+
+    def onset(self, year: int):
+        """year 안의 전환 시각(전환 직전 벽시계 기준). 반복 규칙이 없으면 시작 연도에만 존재."""
+        if self.month is None:
+            return self.start if self.start.year == year else None
+        if year < self.start.year:
+            return None
+        day = _nth_weekday(year, self.month, self.weekday, self.nth)
+        return datetime(day.year, day.month, day.day, self.start.hour, self.start.minute, self.start.second)
+
+
+class VTimezone(tzinfo):
+    """
+    Purpose: 문서에 포함된 VTIMEZONE 정의로 만든 tzinfo (IANA 이름이 아닌 TZID용 폴백).
+    Input: tzid, observances(_Observance 목록)
+    Output: utcoffset(dt) - dt 이전의 가장 늦은 전환의 TZOFFSETTO (전환 이전이면 가장 이른 정의의 TZOFFSETFROM)
+    """
+
+    def __init__(self, tzid: str, observances: list):
+        self.tzid = tzid
+        self._observances = observances
+        self._initial_offset = min(observances, key=lambda obs: obs.start).offset_from
+
+    def utcoffset(self, dt):
+        if dt is None:
+            return self._initial_offset
+        wall = dt.replace(tzinfo=None)
+        latest = None
+        offset = self._initial_offset
+        for obs in self._observances:
+            onset = obs.onset(wall.year)
+            if onset is None or onset > wall:
+                # 올해 전환 전이면 작년 전환이 유효 (반복 없는 정의는 시작 시각 그대로).
+                onset = obs.onset(wall.year - 1) if obs.month is not None else obs.start
+            if onset is not None and onset <= wall and (latest is None or onset > latest):
+                latest = onset
+                offset = obs.offset_to
+        return offset
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return self.tzid
+
+    def __repr__(self):
+        return f"VTimezone({self.tzid!r})"
+
+
+class TimezoneResolver:
+    """TZID -> tzinfo. zoneinfo(IANA) -> 문서 VTIMEZONE -> 경로형 TZID의 뒷부분(IANA) 순. 결과는 문서 단위로 메모이즈."""
+
+    def __init__(self):
+        self._definitions = {}
+        self._resolved = {}
+
+    def define(self, tzid: str, observances: list):
+        if tzid and observances:
+            self._definitions[tzid] = VTimezone(tzid, observances)
+            self._resolved.pop(tzid, None)
+
+    def resolve(self, tzid: str):
+        if not tzid:
+            return None
+        if tzid in self._resolved:
+            return self._resolved[tzid]
+        tz = load_zoneinfo(tzid) or self._definitions.get(tzid)
+        if tz is None and "/" in tzid:
+            # '/mozilla.org/20070129_1/Asia/Seoul' 같은 벤더 접두사형 TZID.
+            segments = [part for part in tzid.split("/") if part]
+            for i in range(1, len(segments)):
+                tz = load_zoneinfo("/".join(segments[i:]))
+                if tz is not None:
+                    break
+        self._resolved[tzid] = tz
+        return tz
+
+
+@lru_cache(maxsize=256)
+def _tzid_param(param_text: str) -> str:
+    """';TZID=Asia/Seoul;VALUE=DATE-TIME' 같은 파라미터 구간에서 TZID 값만 (같은 구간 문자열은 재사용)."""
+    for item in _split_params(param_text):
+        key, sep, val = item.partition("=")
+        if sep and key.upper() == "TZID":
+            return val.strip('"')
+    return ""
+
+
+def format_utc_offset(offset: timedelta) -> str:
+    """timedelta -> '+09:00' (초 단위 오프셋은 '+HH:MM:SS'). datetime.isoformat과 같은 표기."""
+    seconds = int(offset.total_seconds())
+    sign = "-" if seconds < 0 else "+"
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{sign}{hours:02d}:{minutes:02d}" + (f":{secs:02d}" if secs else "")
+
+
+class _DateTimeMemo:
+    """
+    같은 (값, TZID) 조합의 파싱 결과(ISO 문자열)를 문서 단위로 재사용 (반복 일정은 시작 시각이 겹침).
+    형식이 맞는 값은 datetime.isoformat 없이 문자열 조립으로 ISO를 만들고, TZID 시각은 오프셋만 tzinfo에 물어봄.
+    """
+
+    def __init__(self, resolver: TimezoneResolver):
+        self._resolver = resolver
+        self._values = {}
+        self._valid_dates = {}
+        self._offset_text = {}
+
+    def _date_ok(self, ymd: str) -> bool:
+        ok = self._valid_dates.get(ymd)
+        if ok is None:
+            ok = parse_ics_datetime(ymd)[0] is not None
+            if len(self._valid_dates) >= MEMO_MAX_ENTRIES:
+                self._valid_dates.clear()
+            self._valid_dates[ymd] = ok
+        return ok
+
+    def zone_key(self, tzid: str) -> str:
+        """TZID가 IANA 시간대로 해석되면 그 이름 (VTIMEZONE 전용 정의나 해석 실패는 "")."""
+        tz = self._resolver.resolve(tzid) if tzid else None
+        return getattr(tz, "key", "") or ""
+
+    def iso(self, value: str, tzid: str = ""):
+        key = (value, tzid)
+        cached = self._values.get(key)
+        if cached is None:
+            cached = self._parse(value.strip(), tzid)
+            if len(self._values) >= MEMO_MAX_ENTRIES:
+                self._values.clear()
+            self._values[key] = cached
+        return cached
+
+    def _parse(self, raw: str, tzid: str):
+        length = len(raw)
+        if length == 8:
+            return (f"{raw[:4]}-{raw[4:6]}-{raw[6:]}T00:00:00", True) if self._date_ok(raw) else (None, False)
+        utc = length == 16 and raw[15] == "Z"
+        tz = self._resolver.resolve(tzid) if tzid and not utc else None
+        if not (
+            (length == 15 or utc)
+            and raw[8] == "T"
+            and raw[9:15].isdigit()
+            and raw[9:11] < "24"
+            and raw[11:13] < "60"
+            and raw[13:15] < "60"
+            and self._date_ok(raw[:8])
+        ):
+            # 초 생략형 등 드문 형식은 datetime으로 (결과는 위 메모로 1회만).
+            parsed, all_day = parse_ics_datetime(raw, tz)
+            return (parsed.isoformat() if parsed is not None else None), all_day
+
+        iso = f"{raw[:4]}-{raw[4:6]}-{raw[6:8]}T{raw[9:11]}:{raw[11:13]}:{raw[13:15]}"
+        if utc:
+            return iso + "+00:00", False
+        if tz is None:
+            return iso, False
+        offset = tz.utcoffset(
+            datetime(int(raw[:4]), int(raw[4:6]), int(raw[6:8]), int(raw[9:11]), int(raw[11:13]), int(raw[13:15]))
+        )
+        suffix = self._offset_text.get(offset)
+        if suffix is None:
+            suffix = self._offset_text[offset] = format_utc_offset(offset)
+        return iso + suffix, False
+
+
+def _date_list(entries, memo: _DateTimeMemo):
+    """EXDATE/RDATE 줄들('a,b,c' 또는 PERIOD 'start/end')의 시작 시각 ISO 목록."""
+    values = []
+    for tzid, raw in entries:
+        for item in raw.split(","):
+            iso = memo.iso(item.split("/", 1)[0], tzid)[0]
+            if iso is not None:
+                values.append(iso)
+    return values
+
+
+def _event_to_payload(props: dict, multi: dict, memo: _DateTimeMemo, fallback_id: str):
+    start = props.get("DTSTART")
+    if start is None:
+        return None
+    start_iso, all_day = memo.iso(start[1], start[0])
+    if start_iso is None:
+        return None
+
+    end = props.get("DTEND")
+    end_iso = memo.iso(end[1], end[0])[0] if end is not None else None
+
+    tags = []
+    for _, raw in multi.get("CATEGORIES", ()):
+        for tag in raw.split(","):
+            cleaned = clean_ics_text(tag)
+            if cleaned:
+                tags.append(cleaned.lower())
+
+    uid = props.get("UID")
+    summary = props.get("SUMMARY")
+    location = props.get("LOCATION")
+    notes = props.get("DESCRIPTION")
+    payload = {
+        "id": uid[1] if uid is not None else fallback_id,
+        "title": clean_ics_text(summary[1]) if summary is not None else "Untitled",
+        "start": start_iso,
+        "end": end_iso,
+        "all_day": all_day,
+        "location": clean_ics_text(location[1]) if location is not None else "",
+        "notes": clean_ics_text(notes[1]) if notes is not None else "",
+        "categories": tags,
+    }
+
+    # 반복 정보는 내부 필드로만 전달 (backend.recurrence가 확장 후 응답에서 제거).
+    rrule = props.get("RRULE")
+    if rrule is not None or "RDATE" in multi:
+        payload["recurrence"] = {
+            "rrule": rrule[1].strip() if rrule is not None else "",
+            "rdates": _date_list(multi.get("RDATE", ()), memo),
+            "exdates": _date_list(multi.get("EXDATE", ()), memo),
+            "tzid": memo.zone_key(start[0]),
+        }
+    recurrence_id = props.get("RECURRENCE-ID")
+    if recurrence_id is not None:
+        rid_iso = memo.iso(recurrence_id[1], recurrence_id[0])[0]
+        if rid_iso is not None:
+            payload["recurrence_id"] = rid_iso
+    return payload
+
+
+class _IcsStreamParser:
+    """
+    Purpose: parse_ics_events의 단일 패스 상태 기계. 펼친 줄을 feed()로 받아 컴포넌트별 BEGIN/END/속성 처리로 나눔.
+    Output: events(정렬 전 payload 목록), resolver(문서의 VTIMEZONE 정의 포함)
+    """
+
+    __slots__ = ("resolver", "memo", "events", "component", "skip_depth", "props", "multi", "tz_id",
+                 "tz_observances", "observance")
+
+    def __init__(self):
+        self.resolver = TimezoneResolver()
+        self.memo = _DateTimeMemo(self.resolver)
+        self.events = []
+        # 현재 위치: None(캘린더 본문) / "VEVENT" / "VTIMEZONE" / "OBSERVANCE". 그 외 하위 컴포넌트(VALARM 등)는 depth로 건너뜀.
+        self.component = None
+        self.skip_depth = 0
+        self.props = None
+        self.multi = None
+        self.tz_id = ""
+        self.tz_observances = None
+        self.observance = None
+
+    def feed(self, line: str):
+        if line.startswith(("BEGIN:", "END:")):
+            self._boundary(line)
+        elif self.component is not None and not self.skip_depth:
+            self._property(line)
+
+    def _boundary(self, line: str):
+        begin = line[0] == "B"
+        if self.skip_depth:
+            self.skip_depth += 1 if begin else -1
+            return
+        name = line[6 if begin else 4:].strip().upper()
+        if begin:
+            self._begin(name)
+        else:
+            self._end(name)
+
+    def _begin(self, name: str):
+        component = self.component
+        if component is None and name == "VEVENT":
+            self.component = "VEVENT"
+            self.props = {}
+            self.multi = {}
+        elif component is None and name == "VTIMEZONE":
+            self.component = "VTIMEZONE"
+            self.tz_id = ""
+            self.tz_observances = []
+        elif component == "VTIMEZONE" and name in ("STANDARD", "DAYLIGHT"):
+            self.component = "OBSERVANCE"
+            self.observance = {}
+        elif component is not None:
+            self.skip_depth = 1
+
+    def _end(self, name: str):
+        component = self.component
+        if component == "VEVENT" and name == "VEVENT":
+            payload = _event_to_payload(self.props, self.multi, self.memo, f"event-{len(self.events) + 1}")
+            if payload:
+                self.events.append(payload)
+            self.component = None
+        elif component == "OBSERVANCE":
+            _append_observance(self.tz_observances, self.observance)
+            self.component = "VTIMEZONE"
+        elif component == "VTIMEZONE" and name == "VTIMEZONE":
+            self.resolver.define(self.tz_id, self.tz_observances)
+            self.component = None
+
+    def _property(self, line: str):
+        # 이름만 먼저 보고 필요 없는 속성은 파라미터 분석 없이 버림.
+        colon = line.find(":")
+        if colon == -1:
+            return
+        semi = line.find(";", 0, colon)
+        prop = line[: semi if semi != -1 else colon].upper()
+        if self.component == "VEVENT":
+            self._event_property(line, prop, semi, colon)
+        elif self.component == "OBSERVANCE":
+            if prop in TIMEZONE_PROPERTIES:
+                self.observance[prop] = line[colon + 1:]
+        elif prop == "TZID":
+            self.tz_id = line[colon + 1:].strip()
+
+    def _event_property(self, line: str, prop: str, semi: int, colon: int):
+        if prop in EVENT_PROPERTIES:
+            if prop in self.props:
+                return
+        elif prop not in MULTI_PROPERTIES:
+            return
+        entry = _property_entry(line, prop, semi, colon)
+        if entry is None:
+            return
+        if prop in MULTI_PROPERTIES:
+            self.multi.setdefault(prop, []).append(entry)
+        else:
+            self.props[prop] = entry
+
+
+def _property_entry(line: str, prop: str, semi: int, colon: int):
+    """VEVENT 속성 줄 -> (TZID, 값). 따옴표 파라미터를 정식 분리하지 못하면 None."""
+    if semi == -1 or prop not in DATE_PROPERTIES:
+        return "", line[colon + 1:]
+    if '"' in line[semi:colon]:
+        # 따옴표 안의 ':'가 있을 수 있어 정식 분리.
+        parsed = split_property(line)
+        return (parsed[1].get("TZID", ""), parsed[2]) if parsed is not None else None
+    return _tzid_param(line[semi + 1:colon]), line[colon + 1:]
+
+
+def parse_ics_events(ics_text: str):
+    """
+    Purpose: ICS 본문을 한 번 훑어 VEVENT를 응답 payload(dict) 목록으로 변환.
+    Input: ics_text(str) 또는 이미 줄 단위로 나뉜 iterable(파일 객체 등)
+    Output: start 문자열 오름차순 이벤트 목록 (DTSTART가 없거나 잘못된 이벤트는 제외).
+            반복 일정 원본에는 "recurrence", RECURRENCE-ID 개별 수정본에는 "recurrence_id" 내부 필드가 붙음
+    Side Effects: 없음
+    """
+    lines = iter_physical_lines(ics_text) if isinstance(ics_text, str) else (line.rstrip("\r\n") for line in ics_text)
+    parser = _IcsStreamParser()
+    feed = parser.feed
+    for line in iter_unfolded_lines(lines):
+        feed(line)
+    parser.events.sort(key=itemgetter("start"))
+    return parser.events
+
+
+def _append_observance(observances: list, raw: dict):
+    start, _ = parse_ics_datetime(raw.get("DTSTART", ""))
+    offset_to = _parse_utc_offset(raw.get("TZOFFSETTO", ""))
+    if start is None or offset_to is None:
+        return
+    offset_from = _parse_utc_offset(raw.get("TZOFFSETFROM", "")) or offset_to
+    observances.append(_Observance(start, offset_from, offset_to, raw.get("RRULE", "")))
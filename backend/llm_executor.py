@@ -0,0 +1,186 @@
+"""
+LLM Execution Layer (backend/llm_executor.py)
+역할: 동기식 Gemini SDK 호출을 이벤트 루프 밖의 제한된 워커 풀에서 실행
+호출 관계: main.py (/chat, /dice-comment) -> LLMExecutor.run() -> ThreadPoolExecutor
+          main.py (/chat/stream) -> LLMExecutor.stream() -> 워커 스레드가 청크를 루프로 전달
+수정 시 주의사항: 슬롯은 워커 스레드가 실제로 끝났을 때 반환됩니다.
+  (deadline 초과로 응답을 포기해도 스레드가 끝나기 전까지는 용량을 계속 점유)
+  stream()은 응답 시작 전에 슬롯을 잡으므로, 호출자는 이터레이션을 시작하지 않았더라도 LLMStream.aclose()를 반드시 불러야
+  워커가 업스트림 생성을 끝까지 소비하지 않습니다 (async generator는 시작 전에 닫으면 finally가 실행되지 않음).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LLMBusyError(Exception):
+    """동시 실행 + 대기열이 모두 찬 상태. 호출자는 503/Retry-After로 응답해야 함."""
+
+
+class LLMTimeoutError(Exception):
+    """호출별 deadline 안에 업스트림 응답을 받지 못함."""
+
+
+class LLMStream:
+    """
+    Purpose: LLMExecutor.stream() 결과. 청크 async iterator + 시작 여부와 무관하게 워커를 멈추는 cancel()/aclose().
+    Side Effects: cancel() 후 워커는 아직 시작 전이면 업스트림을 호출하지 않고, 진행 중이면 다음 청크에서 멈춤
+    """
+
+    def __init__(self, chunks, cancel_event):
+        self._chunks = chunks
+        self._cancel_event = cancel_event
+
+    def __aiter__(self):
+        return self._chunks
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    async def aclose(self):
+        self.cancel()
+        await self._chunks.aclose()
+
+
+class LLMExecutor:
+    """
+    Purpose: 블로킹 LLM 호출을 별도 스레드 풀에서 실행해 다른 라우트의 지연을 분리.
+    Input: max_concurrency(동시 실행 워커 수), max_queue(대기 허용 수)
+    Output: run()이 호출 함수의 반환값을 그대로 돌려줌
+    Side Effects: 워커 스레드에서 외부 API 호출 수행
+    Exceptions: LLMBusyError(용량 초과), LLMTimeoutError(deadline 초과)
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, thread_name_prefix: str = "llm"):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self._capacity = self.max_concurrency + self.max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=thread_name_prefix,
+        )
+        # 완료 콜백이 워커 스레드에서 실행되므로 카운터는 스레드 락으로 보호.
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """실행 중 + 대기 중인 호출 수."""
+        return self._pending
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._pending >= self._capacity:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Purpose: 용량을 확보한 뒤 워커 풀에 작업을 넣고 concurrent Future를 반환.
+        Exceptions: LLMBusyError
+        """
+        if not self._try_acquire():
+            raise LLMBusyError("LLM worker pool and wait queue are full")
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        """
+        Purpose: fn(*args, **kwargs)를 워커 스레드에서 실행하고 결과를 await.
+        Input: timeout(초) - 대기열 대기 시간을 포함한 전체 deadline
+        Output: fn의 반환값
+        Exceptions: LLMBusyError, LLMTimeoutError, fn이 던진 예외
+        """
+        future = self.submit(fn, *args, **kwargs)
+        wrapped = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(wrapped, timeout=timeout)
+        except asyncio.TimeoutError as exc:
+            # 아직 시작 전인 작업은 여기서 취소되어 슬롯이 즉시 반환됨.
+            future.cancel()
+            raise LLMTimeoutError(f"LLM call exceeded deadline ({timeout}s)") from exc
+
+    def stream(self, fn, *args, timeout: float = None, **kwargs):
+        """
+        Purpose: 청크를 yield하는 블로킹 이터러블 fn(*args, **kwargs)을 워커 스레드에서 소비하고
+                 이벤트 루프 쪽에는 async generator로 노출.
+        Input: timeout(초) - 스트림 전체 deadline
+        Output: LLMStream (청크를 순서대로 내보내는 async iterator, 끝나면 aclose() 필수)
+        Side Effects: 소비자가 중단하거나 aclose()하면(클라이언트 disconnect 등) 워커는 다음 청크에서 업스트림
+                      이터레이션을 멈추고 close()하여 더 이상 토큰을 받지 않음
+        Exceptions: LLMBusyError(즉시, 응답 시작 전), LLMTimeoutError, fn이 던진 예외(이터레이션 중)
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        cancel_event = threading.Event()
+
+        def _emit(kind, value):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, value))
+            except RuntimeError:
+                # 루프가 이미 닫힌 경우(서버 종료 중) 전달할 대상이 없음.
+                cancel_event.set()
+
+        def _pump():
+            iterator = None
+            if cancel_event.is_set():
+                # 대기열에 있는 동안 소비자가 떠남 - 업스트림을 호출하지 않고 슬롯 반환.
+                return
+            try:
+                iterator = iter(fn(*args, **kwargs))
+                for chunk in iterator:
+                    if cancel_event.is_set():
+                        break
+                    _emit("chunk", chunk)
+                else:
+                    _emit("done", None)
+            except Exception as exc:
+                _emit("error", exc)
+            finally:
+                close = getattr(iterator, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+
+        # 용량 검사는 응답을 시작하기 전에 끝내야 503으로 거절할 수 있으므로 즉시 submit.
+        self.submit(_pump)
+        chunks = self._consume_stream(queue, cancel_event, loop.time() + timeout if timeout else None)
+        return LLMStream(chunks, cancel_event)
+
+    @staticmethod
+    async def _consume_stream(queue, cancel_event, deadline):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise LLMTimeoutError("LLM stream exceeded deadline")
+                try:
+                    kind, value = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError as exc:
+                    raise LLMTimeoutError("LLM stream exceeded deadline") from exc
+                if kind == "chunk":
+                    yield value
+                elif kind == "done":
+                    return
+                else:
+                    raise value
+        finally:
+            cancel_event.set()
+
+    def shutdown(self):
+        """프로세스 종료 시 대기 중인 작업은 버리고 풀을 정리."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,183 @@
+"""
+Logging Pipeline (backend/log_pipeline.py)
+역할: 요청 경로의 로그 호출을 메모리 큐 적재(O(1))로 끝내고, 백그라운드 스레드가 묶어서 파일/콘솔에 기록
+호출 관계: main.py (로깅 초기화) -> BatchingQueueHandler -> RotatingFileHandler / StreamHandler
+수정 시 주의사항: 큐가 가득 차면 레코드를 버리고 카운트만 올립니다 (요청을 절대 막지 않음).
+  포맷터는 레코드에 속성을 덧붙이지 않습니다 (job_id 등 기본값은 포맷 시점에만 적용).
+  프로세스 종료 시 atexit로 남은 레코드를 비웁니다.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import BaseRotatingHandler
+
+# Global Rules 로그 스키마 기본값 (extra가 없는 레코드용)
+RECORD_DEFAULTS = {"job_id": "SYSTEM", "step": "CORE", "status": "SUCCESS", "duration_ms": 0}
+
+
+class StructuredFormatter(logging.Formatter):
+    """%-스타일 포맷에 job_id/step/status/duration_ms 기본값을 채워 넣는 텍스트 포맷터."""
+
+    def formatMessage(self, record):
+        values = dict(RECORD_DEFAULTS)
+        values.update(record.__dict__)
+        return self._fmt % values
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 1개 (ts, level, job_id, step, status, duration_ms, message[, exc])."""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+        for key, default in RECORD_DEFAULTS.items():
+            data[key] = getattr(record, key, default)
+        data["message"] = record.getMessage()
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BatchingQueueHandler(logging.Handler):
+    """
+    Purpose: emit()은 bounded 큐에 넣기만 하고, writer 스레드가 최대 batch_size개씩 모아 대상 핸들러에 1회 flush.
+    Input: targets(실제 기록 핸들러 목록), max_queue, batch_size, flush_interval_seconds
+    Output: dropped(큐 포화로 버린 레코드 수)
+    Side Effects: 데몬 스레드 1개, 대상 핸들러 파일/콘솔 I/O
+    Exceptions: 없음 - 기록 실패는 대상 핸들러의 handleError로 처리
+    """
+
+    def __init__(self, targets, max_queue: int = 10000, batch_size: int = 256, flush_interval_seconds: float = 0.2):
+        super().__init__()
+        self.targets = list(targets)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_seconds = max(0.01, float(flush_interval_seconds))
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def emit(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._flush_batch(self._drain())
+
+    def _drain(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                first = None
+            batch = self._drain(first)
+            if self.dropped != self._reported_dropped:
+                batch.append(self._drop_record())
+            if batch:
+                self._flush_batch(batch)
+
+    def _drop_record(self):
+        dropped = self.dropped
+        self._reported_dropped = dropped
+        return _make_record(
+            logging.WARNING, f"Log queue full, dropped_total={dropped}", step="LOG_PIPELINE", status="WARN"
+        )
+
+    def _flush_batch(self, batch):
+        if not batch:
+            return
+        for target in self.targets:
+            records = [record for record in batch if record.levelno >= target.level]
+            if records:
+                _write_records(target, records)
+
+
+def _make_record(level: int, message: str, **extra):
+    record = logging.LogRecord("DevilTown", level, __file__, 0, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def _write_records(target: logging.Handler, records):
+    """StreamHandler 계열은 포맷된 줄을 한 번에 write + flush 1회, 그 외 핸들러는 레코드별 handle()."""
+    if not isinstance(target, logging.StreamHandler):
+        for record in records:
+            target.handle(record)
+        return
+
+    lines = []
+    for record in records:
+        try:
+            lines.append(target.format(record) + target.terminator)
+        except Exception:
+            target.handleError(record)
+    if not lines:
+        return
+    text = "".join(lines)
+    with target.lock:
+        try:
+            if isinstance(target, BaseRotatingHandler):
+                # 배치 단위로 롤오버 판단 (배치 크기만큼만 상한을 넘을 수 있음).
+                if target.stream is None:
+                    target.stream = target._open()
+                if target.shouldRollover(records[0]):
+                    target.doRollover()
+            target.stream.write(text)
+            target.flush()
+        except Exception:
+            target.handleError(records[-1])
+
+
+class ReceiveSampler:
+    """
+    Purpose: 성공 요청의 RECEIVE 로그를 sample_rate 비율로만 남김 (실패 요청은 사후에 항상 기록).
+    Input: sample_rate (0.0 ~ 1.0, 1.0이면 기존처럼 전부 기록)
+    Output: should_log_upfront() -> bool
+    Side Effects: 없음 (이벤트 루프 스레드에서만 호출)
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        # 난수 대신 누적 크레딧으로 정확히 비율만큼 기록 (요청 경로 비용 최소화).
+        self._credit = 0.0
+
+    def should_log_upfront(self) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        self._credit += self.sample_rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
@@ -0,0 +1,220 @@
+"""
+In-Process Metrics Registry (backend/metrics.py)
+역할: 카운터/히스토그램/게이지를 프로세스 메모리에 모아 Prometheus 텍스트 형식으로 노출
+호출 관계: main.py (log_requests, enforce_rate_limit, 캘린더/Gemini 호출) -> MetricsRegistry.inc()/observe()
+          main.py (GET /metrics) -> MetricsRegistry.render()
+          main.py (startup) -> EventLoopLagMonitor
+수정 시 주의사항: 기록 경로에 락이 없습니다. 스레드마다 자기 샤드(dict)만 쓰고, render()가 샤드를 합산합니다.
+  라벨 값은 고정된 소수 집합(라우트 템플릿, 상태 코드 등)만 사용해야 합니다 (요청 경로 원문/IP 금지).
+  멀티 워커 모드에서는 워커별 값이며 합산은 수집 측에서 합니다.
+"""
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 초 단위 지연 버킷 (정적 파일 ~ Gemini 응답까지)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class MetricsRegistry:
+    """
+    Purpose: 핫 패스에서 락 없이 기록 가능한 메트릭 저장소 (스레드별 샤드).
+    Input: namespace(메트릭 이름 접두사)
+    Output: render() -> Prometheus text exposition (text/plain; version=0.0.4)
+    Side Effects: 없음 (메모리 내 상태만 변경)
+    """
+
+    def __init__(self, namespace: str = "deviltown"):
+        self.namespace = namespace
+        self._meta = {}
+        self._buckets = {}
+        self._gauges = {}
+        self._gauge_callbacks = {}
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}"
+
+    def counter(self, name: str, help_text: str, label_names=()):
+        self._meta[name] = ("counter", help_text, tuple(label_names))
+
+    def histogram(self, name: str, help_text: str, label_names=(), buckets=LATENCY_BUCKETS):
+        self._meta[name] = ("histogram", help_text, tuple(label_names))
+        self._buckets[name] = tuple(buckets)
+
+    def gauge(self, name: str, help_text: str, label_names=(), callback=None):
+        """callback이 있으면 render 시점에 호출 (반환: 값 또는 {label_values: 값})."""
+        self._meta[name] = ("gauge", help_text, tuple(label_names))
+        if callback is not None:
+            self._gauge_callbacks[name] = callback
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels=(), amount: float = 1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels=()):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        state = histograms.get(key)
+        bounds = self._buckets[name]
+        if state is None:
+            # [버킷별 카운트..., +Inf 카운트, 합계]
+            state = [0] * (len(bounds) + 1) + [0.0]
+            histograms[key] = state
+        state[bisect_left(bounds, value)] += 1
+        state[-1] += value
+
+    def set_gauge(self, name: str, value: float, labels=()):
+        # 단일 대입은 GIL 하에서 원자적이므로 게이지는 공용 dict에 바로 기록.
+        self._gauges[(name, labels)] = value
+
+    @contextmanager
+    def timed(self, histogram_name: str, labels=(), error_counter: str = None):
+        """블록 실행 시간을 히스토그램에 기록하고, 예외 발생 시 error_counter를 증가."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if error_counter:
+                self.inc(error_counter, labels)
+            raise
+        finally:
+            self.observe(histogram_name, time.perf_counter() - started, labels)
+
+    def _collect(self):
+        counters = {}
+        histograms = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict.items() -> list 변환은 GIL 하에서 한 번에 수행되어 기록 중인 샤드도 안전하게 복사됨.
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, state in list(shard.histograms.items()):
+                merged = histograms.get(key)
+                if merged is None:
+                    histograms[key] = list(state)
+                else:
+                    for i, value in enumerate(state):
+                        merged[i] += value
+        return counters, histograms
+
+    def render(self) -> str:
+        counters, histograms = self._collect()
+        gauges = dict(self._gauges)
+        for name, callback in self._gauge_callbacks.items():
+            try:
+                result = callback()
+            except Exception:
+                continue
+            if isinstance(result, dict):
+                for labels, value in result.items():
+                    gauges[(name, labels)] = value
+            else:
+                gauges[(name, ())] = result
+
+        lines = []
+        for name, (kind, help_text, label_names) in self._meta.items():
+            full = self._name(name)
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            if kind == "counter":
+                for (key_name, labels), value in sorted(counters.items()):
+                    if key_name == name:
+                        lines.append(f"{full}{_labels(label_names, labels)} {_number(value)}")
+            elif kind == "gauge":
+                for (key_name, labels), value in sorted(gauges.items()):
+                    if key_name == name:
+                        lines.append(f"{full}{_labels(label_names, labels)} {_number(value)}")
+            else:
+                bounds = self._buckets[name]
+                for (key_name, labels), state in sorted(histograms.items()):
+                    if key_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(bounds + (float("inf"),), state[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(
+                            f"{full}_bucket{_labels(label_names + ('le',), labels + (le,))} {cumulative}"
+                        )
+                    lines.append(f"{full}_sum{_labels(label_names, labels)} {_number(state[-1])}")
+                    lines.append(f"{full}_count{_labels(label_names, labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+
+class EventLoopLagMonitor:
+    """
+    Purpose: 주기적으로 sleep한 뒤 실제 깨어난 시각과의 차이로 이벤트 루프 지연(블로킹)을 측정.
+    Input: registry, gauge/histogram 이름, interval_seconds
+    Side Effects: 이벤트 루프에 백그라운드 태스크 1개
+    """
+
+    def __init__(self, registry: MetricsRegistry, gauge_name: str, histogram_name: str, interval_seconds: float = 0.5):
+        self._registry = registry
+        self._gauge_name = gauge_name
+        self._histogram_name = histogram_name
+        self.interval_seconds = max(0.05, float(interval_seconds))
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(0.0, loop.time() - expected)
+            self._registry.set_gauge(self._gauge_name, lag)
+            self._registry.observe(self._histogram_name, lag)
@@ -0,0 +1,224 @@
+"""
+Gemini Model Registry (backend/model_registry.py)
+역할: 시스템 프롬프트 메모리 캐시(mtime 기반 핫 리로드)와 설정별 GenerativeModel 재사용
+호출 관계: main.py (_start_chat_session, _generate_dice_comment) -> ModelRegistry.get_model()
+수정 시 주의사항: 키는 (모델명, generation_config, 프롬프트 해시)이므로 프롬프트 파일이 바뀌면
+  새 모델이 만들어지고 이전 항목은 LRU로 밀려납니다. get_model()은 워커 스레드에서 호출됩니다.
+  모델/context cache 생성(네트워크 호출)은 레지스트리 락 밖에서 키별 1개만 수행하고, 결과만 락 안에서 게시합니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+logger = logging.getLogger("DevilTown")
+
+
+def prompt_digest(text: str) -> str:
+    """프롬프트 본문 해시 (레지스트리/응답 캐시 키 용도)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class SystemPromptCache:
+    """
+    Purpose: system_prompt.md를 메모리에 보관하고 파일 mtime이 바뀐 경우에만 다시 읽음.
+    Input: path, fallback(읽기 실패 시 문구), check_interval_seconds(stat 호출 최소 간격)
+    Output: get() -> (prompt_text, sha256)
+    Side Effects: check_interval마다 최대 1회 os.stat, mtime 변경 시 파일 읽기
+    """
+
+    def __init__(self, path: str, fallback: str, check_interval_seconds: float = 5.0):
+        self.path = path
+        self.fallback = fallback
+        self.check_interval_seconds = max(0.0, float(check_interval_seconds))
+        self._lock = threading.Lock()
+        self._text = None
+        self._digest = None
+        self._mtime = None
+        self._next_check_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._text is not None and now < self._next_check_at:
+            return self._text, self._digest
+
+        with self._lock:
+            if self._text is not None and now < self._next_check_at:
+                return self._text, self._digest
+            self._next_check_at = now + self.check_interval_seconds
+            self._reload_if_changed()
+            return self._text, self._digest
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self._text is None:
+                logger.warning(
+                    f"Failed to load {self.path}: {e}",
+                    extra={"step": "PROMPT_LOAD", "status": "WARN"},
+                )
+                self._set(self.fallback, None)
+            return
+
+        if mtime == self._mtime and self._text is not None:
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except Exception as e:
+            logger.warning(
+                f"Failed to load {self.path}: {e}. Keeping previous prompt.",
+                extra={"step": "PROMPT_LOAD", "status": "WARN"},
+            )
+            if self._text is None:
+                self._set(self.fallback, None)
+            return
+
+        reloaded = self._text is not None
+        self._set(text, mtime)
+        logger.info(
+            f"System prompt {'reloaded' if reloaded else 'loaded'} chars={len(text)} sha={self._digest[:12]}",
+            extra={"step": "PROMPT_LOAD"},
+        )
+
+    def _set(self, text: str, mtime):
+        self._text = text
+        self._digest = prompt_digest(text)
+        self._mtime = mtime
+
+
+class ModelRegistry:
+    """
+    Purpose: genai.configure()를 1회만 수행하고 동일 설정의 GenerativeModel을 재사용.
+             옵션으로 긴 system_instruction을 Gemini context cache에 올려 턴마다 재전송하지 않음.
+    Input: genai 모듈, api_key, max_entries, context_cache_* 설정
+    Output: get_model() -> GenerativeModel
+    Side Effects: context cache 생성 시 Gemini API 호출 (만료 전 자동 재생성)
+    Exceptions: 모델 생성 실패는 호출자에게 전파 (context cache 실패는 일반 모델로 폴백)
+    """
+
+    # 만료 직전에 캐시를 쓰는 요청이 실패하지 않도록 여유를 두고 재생성.
+    CONTEXT_CACHE_REFRESH_MARGIN_SECONDS = 60
+
+    def __init__(
+        self,
+        genai_module,
+        api_key: str,
+        max_entries: int = 16,
+        context_cache_enabled: bool = False,
+        context_cache_model: str = "",
+        context_cache_ttl_seconds: int = 3600,
+    ):
+        self._genai = genai_module
+        self._api_key = api_key
+        self._max_entries = max(1, int(max_entries))
+        self._context_cache_enabled = bool(context_cache_enabled)
+        self._context_cache_model = context_cache_model
+        self._context_cache_ttl_seconds = max(300, int(context_cache_ttl_seconds))
+        self._lock = threading.Lock()
+        self._configured = False
+        self._entries = OrderedDict()
+        # 생성 중인 키 -> 완료 이벤트 (같은 키의 동시 미스가 CachedContent를 중복 생성하지 않도록).
+        self._building = {}
+        # context cache를 지원하지 않는 프롬프트(최소 토큰 미달 등)는 재시도하지 않음.
+        self._context_cache_rejected = set()
+
+    def _ensure_configured(self):
+        if not self._configured:
+            self._genai.configure(api_key=self._api_key)
+            self._configured = True
+
+    @staticmethod
+    def _make_key(model_name: str, generation_config, system_instruction):
+        config_key = json.dumps(generation_config or {}, sort_keys=True)
+        return (model_name, config_key, prompt_digest(system_instruction) if system_instruction else "")
+
+    def get_model(self, model_name: str, generation_config: dict = None, system_instruction: str = None):
+        key = self._make_key(model_name, generation_config, system_instruction)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["expires_at"] > time.time():
+                    self._entries.move_to_end(key)
+                    return entry["model"]
+                pending = self._building.get(key)
+                if pending is None:
+                    pending = self._building[key] = threading.Event()
+                    self._ensure_configured()
+                    break
+                if entry is not None:
+                    # 다른 스레드가 재생성 중: 이전 context cache는 만료 여유(REFRESH_MARGIN) 안이므로 그대로 사용.
+                    return entry["model"]
+            # 같은 키의 최초 생성만 기다림 (다른 키/캐시 히트는 락을 잡고 바로 반환).
+            pending.wait()
+
+        model = None
+        try:
+            model, expires_at = self._build_model(key, model_name, generation_config, system_instruction)
+        finally:
+            with self._lock:
+                if model is not None:
+                    current = self._entries.get(key)
+                    if current is None or current["expires_at"] < expires_at:
+                        self._entries[key] = {"model": model, "expires_at": expires_at}
+                    else:
+                        model = current["model"]
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+                self._building.pop(key, None)
+            pending.set()
+        return model
+
+    def _build_model(self, key, model_name, generation_config, system_instruction):
+        if (
+            self._context_cache_enabled
+            and system_instruction
+            and key not in self._context_cache_rejected
+        ):
+            cached_model = self._build_context_cached_model(key, generation_config, system_instruction)
+            if cached_model is not None:
+                expires_at = time.time() + self._context_cache_ttl_seconds - self.CONTEXT_CACHE_REFRESH_MARGIN_SECONDS
+                return cached_model, expires_at
+
+        kwargs = {"model_name": model_name}
+        if generation_config:
+            kwargs["generation_config"] = generation_config
+        if system_instruction:
+            kwargs["system_instruction"] = system_instruction
+        return self._genai.GenerativeModel(**kwargs), float("inf")
+
+    def _build_context_cached_model(self, key, generation_config, system_instruction):
+        started = time.time()
+        try:
+            cached_content = self._genai.caching.CachedContent.create(
+                model=self._context_cache_model,
+                display_name=f"deviltown-prompt-{key[2][:12]}",
+                system_instruction=system_instruction,
+                ttl=timedelta(seconds=self._context_cache_ttl_seconds),
+            )
+            model = self._genai.GenerativeModel.from_cached_content(
+                cached_content=cached_content,
+                generation_config=generation_config,
+            )
+        except Exception as e:
+            self._context_cache_rejected.add(key)
+            logger.warning(
+                f"Context cache unavailable, using inline system prompt: {e}",
+                extra={"step": "MODEL_REGISTRY", "status": "WARN"},
+            )
+            return None
+
+        duration = int((time.time() - started) * 1000)
+        logger.info(
+            f"Context cache created model={self._context_cache_model} ttl_s={self._context_cache_ttl_seconds}",
+            extra={"step": "MODEL_REGISTRY", "duration_ms": duration},
+        )
+        return model
@@ -0,0 +1,92 @@
+"""
+Precompressed Response Bodies (backend/precompressed.py)
+역할: 응답 본문을 1회 직렬화하고 gzip/Brotli 변형과 강한 ETag를 함께 계산해 보관
+호출 관계: backend.calendar_cache.CalendarSnapshot -> PrecompressedBody
+          main.py (_precompressed_response) -> select()/etag_matches()
+수정 시 주의사항: brotli 패키지는 선택 의존성입니다 (없으면 gzip/identity만 제공).
+  본문은 생성 후 불변이어야 하며 ETag는 identity 본문의 SHA-256 기반입니다.
+"""
+
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이보다 작은 본문은 압축 이득보다 헤더/CPU 비용이 커서 identity로만 보냄.
+MIN_COMPRESS_BYTES = 512
+
+
+def json_bytes(payload) -> bytes:
+    """FastAPI 기본 직렬화와 같은 의미(UTF-8 JSON)를 공백 없이 1회 생성."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q_value = params.strip()
+        if q_value.startswith("q="):
+            try:
+                if float(q_value[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더(목록/약한 비교/* 포함)가 현재 ETag와 일치하는지 검사."""
+    header = (if_none_match or "").strip()
+    if not header:
+        return False
+    if header == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class PrecompressedBody:
+    """
+    Purpose: 동일 본문을 요청마다 다시 직렬화/압축하지 않도록 모든 인코딩 변형을 미리 계산.
+    Input: body(bytes), media_type
+    Output: select(accept_encoding) -> (content_encoding | None, bytes)
+    Side Effects: 생성 시 gzip/Brotli 압축 CPU 사용 (캐시 갱신 시 1회)
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.media_type = media_type
+        self.identity = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.gzip = None
+        self.br = None
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.gzip = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=9)
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(json_bytes(payload), "application/json")
+
+    def select(self, accept_encoding: str):
+        if self.gzip is None:
+            return None, self.identity
+        accepted = _accepted_encodings(accept_encoding)
+        if self.br is not None and "br" in accepted:
+            return "br", self.br
+        if "gzip" in accepted:
+            return "gzip", self.gzip
+        return None, self.identity
@@ -0,0 +1,281 @@
+"""
+On-demand Profiling (backend/profiling.py)
+역할: 운영 중 지연 원인 추적용 프로파일러 3종
+      1) 요청 1건 cProfile (비밀 헤더가 있는 요청만, X-Request-ID로 저장)
+      2) 프로세스 전체 샘플링 프로파일러 (시간 제한, flamegraph용 folded stack 출력)
+      3) 이벤트 루프 watchdog (루프를 threshold 이상 막은 콜백의 스택을 막혀 있는 동안 캡처해 로그)
+호출 관계: backend.request_middleware.RequestContextMiddleware -> ProfilingControl.should_profile() / RequestProfiler
+          main.py (/admin/profiles*, /admin/profile/*) -> ProfileStore, sample_process(), LoopWatchdog
+수정 시 주의사항: PROFILING_ADMIN_TOKEN이 없으면 main.py가 ProfilingControl을 만들지 않고 관리 라우트도 등록하지 않습니다
+  (미들웨어는 `profiler is None` 비교 1번만 하므로 비활성 시 비용 없음).
+  cProfile은 스레드 단위라, 프로파일 중인 요청이 await하는 동안 같은 루프에서 실행된 다른 요청의 콜백도 함께 잡힙니다.
+  한가한 워커에서 쓰거나 샘플링 프로파일과 함께 보세요. 동시에 1건만 프로파일합니다 (나머지는 그냥 처리).
+  파일 이름은 ProfileStore.path_for()에서만 해석합니다 (경로 조작 방지).
+"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("DevilTown")
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+# 관리 라우트 자체(샘플링 최대 60초 등)는 같은 토큰 헤더를 보내도 요청 프로파일 대상에서 제외.
+ADMIN_PATH_PREFIX = "/admin/"
+SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+# 샘플링/watchdog 스택 깊이 상한 (재귀가 깊은 스택 1개가 결과를 지배하지 않도록).
+MAX_STACK_DEPTH = 64
+
+
+class ProfileStore:
+    """
+    Purpose: 프로파일 결과 파일 보관 (최근 max_files개만 유지).
+    Input: directory, max_files
+    Output: save_*() -> 파일 이름, list_profiles() -> [{name, bytes, created_at}]
+    Side Effects: 디스크 쓰기/삭제 (워커 스레드에서 호출)
+    """
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = directory
+        self.max_files = max(1, int(max_files))
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str):
+        if not SAFE_NAME.match(name or "") or name.startswith("."):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def save_stats(self, name: str, profile: cProfile.Profile) -> str:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, name))
+            self._prune()
+        return name
+
+    def save_text(self, name: str, text: str) -> str:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                f.write(text)
+            self._prune()
+        return name
+
+    def list_profiles(self) -> list:
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return [
+            {"name": entry.name, "bytes": entry.stat().st_size, "created_at": int(entry.stat().st_mtime)}
+            for entry in entries
+        ]
+
+    def _prune(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in entries[: max(0, len(entries) - self.max_files)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def stats_text(path: str, limit: int = 40, sort: str = "cumulative") -> str:
+    """저장된 cProfile 덤프를 pstats 표(상위 limit개)로 변환."""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class RequestProfiler:
+    """
+    Purpose: 요청 1건을 cProfile로 감싸고 request-<job_id>.prof로 저장 (snakeviz/flameprof/`python -m pstats`로 열람).
+    Output: begin() -> Profile | None(다른 요청을 프로파일 중), save() -> 저장된 파일 이름
+    수정 시 주의사항: end()는 finally에서 동기로 호출합니다 (요청이 취소돼도 프로파일러가 켜진 채 남지 않도록).
+    """
+
+    def __init__(self, store: ProfileStore):
+        self.store = store
+        self._active = False
+
+    def begin(self):
+        if self._active:
+            return None
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end(self, profile: cProfile.Profile):
+        profile.disable()
+        self._active = False
+
+    async def save(self, job_id: str, profile: cProfile.Profile, path: str, duration_ms: int) -> str:
+        name = await asyncio.to_thread(self.store.save_stats, f"request-{job_id}.prof", profile)
+        logger.info(
+            f"Request profile saved name={name} path={path}",
+            extra={"job_id": job_id, "step": "PROFILE_REQUEST", "status": "SUCCESS", "duration_ms": duration_ms},
+        )
+        return name
+
+
+class ProfilingControl:
+    """
+    Purpose: 관리자 토큰 확인 + 요청 프로파일러/샘플러 상태를 한곳에 보관.
+    Input: token(PROFILING_ADMIN_TOKEN, 비어 있으면 만들지 않음), store(ProfileStore)
+    """
+
+    def __init__(self, token: str, store: ProfileStore):
+        self._token = token.encode("utf-8")
+        self.store = store
+        self.requests = RequestProfiler(store)
+        self.sampling_active = False
+
+    def token_matches(self, value) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        return bool(value) and hmac.compare_digest(value, self._token)
+
+    def should_profile(self, path: str, headers) -> bool:
+        """관리 라우트가 아니고 ASGI raw 헤더 목록에 올바른 X-Profile-Token이 있는지 (요청 프로파일 트리거)."""
+        if path.startswith(ADMIN_PATH_PREFIX):
+            return False
+        for name, value in headers:
+            if name == PROFILE_TOKEN_HEADER:
+                return self.token_matches(value)
+        return False
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _folded_stack(frame) -> list:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_process(seconds: float, interval_seconds: float) -> str:
+    """
+    Purpose: seconds 동안 interval마다 모든 스레드의 스택을 샘플링해 folded stack 텍스트로 반환.
+    Output: "스레드;파일:함수;...;파일:함수 샘플수" 줄 목록 (flamegraph.pl, speedscope, inferno에 바로 입력)
+    Side Effects: 호출 스레드를 seconds 동안 점유 (asyncio.to_thread로 호출), 샘플마다 GIL을 잠깐 잡음
+    """
+    own_id = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    counts = Counter()
+    samples = 0
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = [names.get(thread_id, f"thread-{thread_id}")] + _folded_stack(frame)
+            counts[";".join(stack)] += 1
+        samples += 1
+        time.sleep(interval_seconds)
+    lines = [f"{stack} {count}" for stack, count in counts.most_common()]
+    logger.info(
+        f"Sampling profile finished samples={samples} stacks={len(lines)}",
+        extra={"step": "PROFILE_SAMPLING", "status": "SUCCESS", "duration_ms": int(seconds * 1000)},
+    )
+    return "\n".join(lines) + "\n"
+
+
+class LoopWatchdog:
+    """
+    Purpose: 이벤트 루프가 threshold 이상 응답하지 않으면, 막혀 있는 그 순간의 루프 스레드 스택을 WARN 로그 1줄로 기록.
+             (asyncio debug 모드와 달리 루프 밖 스레드가 감시하므로 무엇이 막고 있는지 스택으로 남음, 평소 오버헤드는 heartbeat 태스크 1개)
+    Input: threshold_seconds, duration_seconds(None이면 stop()까지)
+    Side Effects: 이벤트 루프에 heartbeat 태스크 1개 + 감시 데몬 스레드 1개
+    """
+
+    def __init__(self, threshold_seconds: float, duration_seconds: float = None):
+        self.threshold_seconds = max(0.01, float(threshold_seconds))
+        self.interval_seconds = min(0.05, self.threshold_seconds / 4)
+        self.deadline = time.monotonic() + duration_seconds if duration_seconds else None
+        self.reports = 0
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """이벤트 루프 스레드에서 호출."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Loop watchdog started threshold_ms={int(self.threshold_seconds * 1000)}",
+            extra={"step": "LOOP_WATCHDOG", "status": "START"},
+        )
+
+    def stop(self):
+        self._stop.set()
+
+    async def _heartbeat(self):
+        while not self._stop.is_set():
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.interval_seconds):
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                break
+            beat = self._beat
+            blocked = now - beat - self.interval_seconds
+            if blocked < self.threshold_seconds or beat == reported_beat:
+                continue
+            # 같은 블로킹 구간은 한 번만 기록 (heartbeat가 다시 돌면 beat 값이 바뀜).
+            reported_beat = beat
+            self.reports += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = " > ".join(
+                f"{label}:{line}" for label, line in self._stack_with_lines(frame)
+            ) if frame is not None else "(no frame)"
+            logger.warning(
+                f"Event loop blocked >= {int(blocked * 1000)}ms stack={stack}",
+                extra={"step": "LOOP_WATCHDOG", "status": "WARN", "duration_ms": int(blocked * 1000)},
+            )
+        self._stop.set()
+        logger.info(
+            f"Loop watchdog stopped reports={self.reports}",
+            extra={"step": "LOOP_WATCHDOG", "status": "SUCCESS"},
+        )
+
+    @staticmethod
+    def _stack_with_lines(frame):
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append((_frame_label(frame), frame.f_lineno))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
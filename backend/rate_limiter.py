@@ -0,0 +1,138 @@
+"""
+Sliding-Window Rate Limiter (backend/rate_limiter.py)
+역할: (scope, client) 단위 요청 수 제한 - 슬라이딩 윈도우 카운터, 샤드별 락, 타이밍 휠 만료
+호출 관계: main.py (enforce_rate_limit) -> SlidingWindowRateLimiter.hit()
+          bench/bench_rate_limiter.py -> 키 수별 호출 비용 측정
+수정 시 주의사항: 한 키의 상태는 __slots__ 객체 1개(윈도우 번호, 현재/이전 카운트)입니다.
+  만료는 요청 경로에서 지나간 휠 슬롯만 비우므로 전체 스캔이 없습니다(상환 O(1)).
+"""
+
+import math
+import threading
+import time
+
+
+class _Bucket:
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "wheel", "cursor")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # dict 삽입 순서를 이용해 키 상한 초과 시 가장 오래된 키부터 O(1)로 제거.
+        self.buckets = {}
+        # 만료 윈도우 번호 -> 그 시점에 만료 후보가 되는 키 목록 (타이밍 휠)
+        self.wheel = {}
+        self.cursor = None
+
+
+class SlidingWindowRateLimiter:
+    """
+    Purpose: 고정 윈도우 경계의 2배 버스트 없이 요청 수를 제한 (이전 윈도우 카운트를 경과 비율로 가중).
+    Input: window_seconds, max_keys(전체 추적 키 상한), shard_count(2의 거듭제곱으로 올림)
+    Output: hit() -> 0(허용) 또는 Retry-After 초(거절)
+    Side Effects: 없음 (메모리 내 상태만 변경)
+    """
+
+    def __init__(self, window_seconds: float, max_keys: int, shard_count: int = 16, clock=time.time):
+        self.window_seconds = max(1.0, float(window_seconds))
+        count = 1
+        while count < max(1, int(shard_count)):
+            count <<= 1
+        self._mask = count - 1
+        self._shards = [_Shard() for _ in range(count)]
+        self._max_keys_per_shard = max(1, int(max_keys) // count)
+        self._clock = clock
+
+    def key_count(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def hit(self, scope: str, client: str, limit: int) -> int:
+        if limit <= 0:
+            return 0
+
+        now = self._clock()
+        window = int(now // self.window_seconds)
+        shard = self._shards[hash(client) & self._mask]
+        key = (scope, client)
+
+        with shard.lock:
+            # 같은 윈도우 안에서는 커서가 이미 앞서 있으므로 만료 처리를 건너뜀.
+            if shard.cursor is None or shard.cursor <= window:
+                self._expire(shard, window)
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = self._insert(shard, key, window)
+            elif bucket.window != window:
+                bucket.previous = bucket.current if bucket.window == window - 1 else 0
+                bucket.current = 0
+                bucket.window = window
+                self._schedule(shard, key, window)
+
+            elapsed = (now - window * self.window_seconds) / self.window_seconds
+            estimate = bucket.previous * (1.0 - elapsed) + bucket.current
+            if estimate + 1 > limit:
+                return self._retry_after(bucket, limit, elapsed)
+
+            bucket.current += 1
+            return 0
+
+    def _insert(self, shard: _Shard, key, window: int) -> _Bucket:
+        if len(shard.buckets) >= self._max_keys_per_shard:
+            shard.buckets.pop(next(iter(shard.buckets)))
+        bucket = _Bucket(window)
+        shard.buckets[key] = bucket
+        self._schedule(shard, key, window)
+        return bucket
+
+    @staticmethod
+    def _schedule(shard: _Shard, key, window: int):
+        # 윈도우 w의 카운트는 w+1까지 '이전 윈도우'로 쓰이므로 w+2에 만료 후보가 됨.
+        slot = shard.wheel.get(window + 2)
+        if slot is None:
+            shard.wheel[window + 2] = [key]
+        else:
+            slot.append(key)
+
+    @staticmethod
+    def _expire(shard: _Shard, window: int):
+        cursor = shard.cursor
+        if cursor is None:
+            shard.cursor = window
+            return
+        if cursor > window:
+            return
+        if window - cursor > len(shard.wheel):
+            # 오래 유휴 상태였다면 윈도우를 하나씩 넘기지 않고 남은 슬롯만 처리.
+            due = [slot for slot in shard.wheel if slot <= window]
+        else:
+            due = range(cursor, window + 1)
+        buckets = shard.buckets
+        for slot in due:
+            keys = shard.wheel.pop(slot, None)
+            if not keys:
+                continue
+            for key in keys:
+                bucket = buckets.get(key)
+                # 그 사이 다시 사용된 키는 더 뒤 슬롯에 재등록되어 있으므로 건너뜀.
+                if bucket is not None and bucket.window + 2 <= slot:
+                    del buckets[key]
+        shard.cursor = window + 1
+
+    def _retry_after(self, bucket: _Bucket, limit: int, elapsed: float) -> int:
+        # previous * (1 - t) + current + 1 <= limit 가 되는 경과 비율 t까지 대기.
+        if bucket.current < limit:
+            needed = 1.0 - (limit - bucket.current - 1) / bucket.previous
+            wait = (needed - elapsed) * self.window_seconds
+        else:
+            # 현재 윈도우가 이미 가득 참: 다음 윈도우에서 current가 previous로 넘어간 뒤 기준.
+            needed_next = 1.0 - (limit - 1) / bucket.current
+            wait = (1.0 - elapsed + max(0.0, needed_next)) * self.window_seconds
+        return max(1, int(math.ceil(wait)))
@@ -0,0 +1,414 @@
+"""
+Calendar Recurrence (backend/recurrence.py)
+역할: 반복 일정(RRULE/RDATE/EXDATE) 확장과 RECURRENCE-ID 개별 수정본 병합 - 요청/표시 구간만 지연 생성
+호출 관계: main.py (_indexed_calendar_snapshot, 갱신마다 1회) -> RecurrenceExpander(events)
+          main.py (/calendar/events 전체 응답) -> RecurrenceExpander.display_events() (날짜가 바뀌면 CalendarCache가 재확장)
+          main.py (/calendar/events?from=&to=) -> RecurrenceExpander.window_index() (스냅샷 수명 동안 구간별 LRU)
+수정 시 주의사항: 확장 비용 상한 - 시리즈 1개가 한 구간에서 만드는 인스턴스는 max_instances개, 인스턴스 없이 연달아 도는
+  빈 주기는 max_instances * SCAN_FACTOR개까지만 허용합니다 (맞는 날이 없는 규칙도 안전). COUNT가 없거나 주기마다 정확히
+  인스턴스 1개인 규칙(BY* 없음)은 구간 시작 직전 주기로 바로 건너뛰고, 그 외 COUNT 규칙은 회차를 세기 위해 DTSTART부터 훑습니다.
+  지원하는 RRULE: FREQ=DAILY/WEEKLY/MONTHLY/YEARLY + INTERVAL, COUNT, UNTIL, BYDAY(±n), BYMONTHDAY, BYMONTH, WKST.
+  그 외 BY* 규칙이 있는 시리즈는 확장하지 않고 원본 1건만 보여줍니다.
+  시간 비교는 원본 DTSTART 시간대의 벽시계 기준이며, window_index()는 이벤트 루프에서만 호출합니다 (락 없음).
+"""
+
+import calendar
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from heapq import merge
+from operator import itemgetter
+
+from backend.calendar_index import CalendarIndex, time_key
+from backend.ics_parser import format_utc_offset, load_zoneinfo
+
+logger = logging.getLogger("DevilTown")
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+SUPPORTED_PARTS = frozenset({"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "BYMONTH", "WKST"})
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+# 인스턴스 없이 연달아 도는 주기 수 상한 = max_instances * SCAN_FACTOR (맞는 날이 없는 규칙에서 빈 주기를 도는 비용 제한).
+SCAN_FACTOR = 8
+INTERNAL_FIELDS = ("recurrence", "recurrence_id")
+
+
+class RecurrenceRule:
+    """
+    Purpose: RRULE 문자열 1개. iter_starts()로 DTSTART부터 순서대로 시작 시각(벽시계, naive)을 생성.
+    Input: parse()로 생성 (지원하지 않는 규칙이면 None)
+    """
+
+    __slots__ = ("freq", "interval", "count", "until", "by_day", "by_month_day", "by_month", "week_start")
+
+    def __init__(self, freq, interval=1, count=None, until=None, by_day=(), by_month_day=(), by_month=(), week_start=0):
+        self.freq = freq
+        self.interval = max(1, interval)
+        self.count = count
+        self.until = until
+        self.by_day = by_day
+        self.by_month_day = by_month_day
+        self.by_month = by_month
+        self.week_start = week_start
+
+    @classmethod
+    def parse(cls, text: str, until_parser):
+        """until_parser(UNTIL 원문) -> 원본 시간대 벽시계 datetime | None."""
+        parts = {}
+        for item in (text or "").upper().split(";"):
+            key, sep, value = item.strip().partition("=")
+            if sep:
+                parts[key] = value
+        if parts.get("FREQ") not in FREQUENCIES or not set(parts) <= SUPPORTED_PARTS:
+            return None
+        try:
+            by_day = []
+            for token in filter(None, parts.get("BYDAY", "").split(",")):
+                nth = int(token[:-2]) if token[:-2] else 0
+                by_day.append((WEEKDAYS[token[-2:]], nth))
+            rule = cls(
+                parts["FREQ"],
+                interval=int(parts.get("INTERVAL", "1")),
+                count=int(parts["COUNT"]) if "COUNT" in parts else None,
+                until=until_parser(parts["UNTIL"]) if "UNTIL" in parts else None,
+                by_day=tuple(by_day),
+                by_month_day=tuple(int(day) for day in filter(None, parts.get("BYMONTHDAY", "").split(","))),
+                by_month=tuple(int(month) for month in filter(None, parts.get("BYMONTH", "").split(","))),
+                week_start=WEEKDAYS.get(parts.get("WKST", "MO"), 0),
+            )
+        except (KeyError, ValueError):
+            return None
+        if "UNTIL" in parts and rule.until is None:
+            return None
+        # 연 단위 서수 BYDAY(예: 20MO = 그해 20번째 월요일)는 지원하지 않음.
+        if rule.freq == "YEARLY" and not rule.by_month and any(nth for _, nth in rule.by_day):
+            return None
+        return rule
+
+    def _one_per_period(self, dtstart: datetime) -> bool:
+        """모든 주기에 인스턴스가 정확히 1개 (BY* 없음, DTSTART 날짜가 모든 달/해에 존재)."""
+        if self.by_day or self.by_month_day or self.by_month:
+            return False
+        if self.freq == "MONTHLY":
+            return dtstart.day <= 28
+        return self.freq != "YEARLY" or (dtstart.month, dtstart.day) != (2, 29)
+
+    def _skip_periods(self, dtstart: datetime, search_from: datetime) -> int:
+        """
+        search_from 이전 주기를 건너뛰는 주기 수 (0 이상).
+        COUNT 규칙은 주기당 인스턴스가 1개일 때만 건너뜀 (건너뛴 주기 수 = 이미 나온 회차 수).
+        """
+        if search_from <= dtstart or (self.count is not None and not self._one_per_period(dtstart)):
+            return 0
+        if self.freq == "DAILY":
+            span = (search_from.date() - dtstart.date()).days
+        elif self.freq == "WEEKLY":
+            span = (search_from.date() - dtstart.date()).days // 7
+        elif self.freq == "MONTHLY":
+            span = (search_from.year - dtstart.year) * 12 + search_from.month - dtstart.month
+        else:
+            span = search_from.year - dtstart.year
+        # 경계 주기가 빠지지 않도록 한 주기 앞에서 시작.
+        return max(0, span // self.interval - 1)
+
+    def _period_days(self, dtstart: datetime, period: int):
+        """period번째 주기에 속하는 후보 날짜 목록 (오름차순, 규칙 필터 적용 전 BYMONTH 제외)."""
+        step = period * self.interval
+        if self.freq == "DAILY":
+            return [dtstart.date() + timedelta(days=step)]
+        if self.freq == "WEEKLY":
+            week_first = dtstart.date() - timedelta(days=(dtstart.weekday() - self.week_start) % 7) + timedelta(weeks=step)
+            weekdays = [day for day, _ in self.by_day] or [dtstart.weekday()]
+            return sorted(week_first + timedelta(days=(day - self.week_start) % 7) for day in set(weekdays))
+        if self.freq == "MONTHLY":
+            month_index = dtstart.month - 1 + step
+            return self._month_days(dtstart.year + month_index // 12, month_index % 12 + 1, dtstart.day)
+        year = dtstart.year + step
+        days = []
+        for month in self.by_month or (dtstart.month,):
+            days.extend(self._month_days(year, month, dtstart.day))
+        return sorted(days)
+
+    def _month_days(self, year: int, month: int, default_day: int):
+        if not 1 <= year <= 9999:
+            raise OverflowError(year)
+        last_day = calendar.monthrange(year, month)[1]
+        if self.by_month_day:
+            days = {day if day > 0 else last_day + day + 1 for day in self.by_month_day}
+            candidates = [date(year, month, day) for day in sorted(days) if 1 <= day <= last_day]
+            if self.by_day:
+                weekdays = {day for day, _ in self.by_day}
+                candidates = [day for day in candidates if day.weekday() in weekdays]
+            return candidates
+        if self.by_day:
+            days = set()
+            for weekday, nth in self.by_day:
+                first = (weekday - date(year, month, 1).weekday()) % 7 + 1
+                matches = list(range(first, last_day + 1, 7))
+                if nth == 0:
+                    days.update(matches)
+                elif -len(matches) <= nth <= len(matches) and nth:
+                    days.add(matches[nth - 1] if nth > 0 else matches[nth])
+            return [date(year, month, day) for day in sorted(days)]
+        # 기본: DTSTART와 같은 날짜 (그 날이 없는 달은 건너뜀, RFC 5545).
+        return [date(year, month, default_day)] if default_day <= last_day else []
+
+    def _matches_filters(self, day: date) -> bool:
+        if self.by_month and day.month not in self.by_month:
+            return False
+        if self.freq == "DAILY":
+            if self.by_day and day.weekday() not in {weekday for weekday, _ in self.by_day}:
+                return False
+            if self.by_month_day:
+                last_day = calendar.monthrange(day.year, day.month)[1]
+                if day.day not in {d if d > 0 else last_day + d + 1 for d in self.by_month_day}:
+                    return False
+        return True
+
+    def _period_starts(self, dtstart: datetime, period: int):
+        """period번째 주기의 인스턴스 시작 시각 (필터 적용, DTSTART 이하 제외). 9999년을 넘는 주기면 None."""
+        try:
+            days = self._period_days(dtstart, period)
+        except (OverflowError, ValueError):
+            return None
+        clock = dtstart.time()
+        starts = (datetime.combine(day, clock) for day in days if self._matches_filters(day))
+        return [start for start in starts if start > dtstart]
+
+    def iter_starts(self, dtstart: datetime, search_from: datetime, max_scan: int):
+        """
+        Purpose: search_from 직전 주기부터(건너뛸 수 없는 COUNT 규칙은 DTSTART부터) 시작 시각을 오름차순으로 생성.
+        Output: generator of datetime (naive 벽시계). UNTIL/COUNT 또는 인스턴스 없는 주기 max_scan개 연속 중 먼저 닿는 곳에서 종료.
+        """
+        period = self._skip_periods(dtstart, search_from)
+        # 건너뛴 주기마다 인스턴스가 1개씩 있었으므로 (DTSTART 포함) 나온 회차 수 = period.
+        emitted = period
+        if period == 0:
+            # DTSTART는 규칙과 맞지 않아도 항상 첫 인스턴스 (RFC 5545).
+            yield dtstart
+            emitted = 1
+        idle = 0
+        while idle < max_scan:
+            starts = self._period_starts(dtstart, period)
+            if starts is None:
+                return
+            for start in starts:
+                if (self.until is not None and start > self.until) or (self.count is not None and emitted >= self.count):
+                    return
+                emitted += 1
+                yield start
+            # 드문 규칙(예: 매월 1일만)도 인스턴스가 나오는 한 계속 진행하고, 빈 주기가 연달아 이어질 때만 멈춤.
+            idle = 0 if starts else idle + 1
+            period += 1
+
+
+class RecurringSeries:
+    """
+    Purpose: 반복 일정 원본 1건 (규칙 + RDATE/EXDATE + 개별 수정본으로 대체된 인스턴스).
+    Input: master(parse_ics_events 이벤트 dict, "recurrence" 필드 포함)
+    Output: occurrences(window_start, window_end, max_instances) -> 인스턴스 이벤트 dict 목록
+    """
+
+    def __init__(self, master: dict):
+        spec = master["recurrence"]
+        self.uid = str(master.get("id", ""))
+        self.template = {key: value for key, value in master.items() if key not in INTERNAL_FIELDS}
+        self.all_day = bool(master.get("all_day"))
+        start = datetime.fromisoformat(master["start"])
+        self.tz = load_zoneinfo(spec.get("tzid", "")) if spec.get("tzid") else start.tzinfo
+        if self.tz is not None and start.tzinfo is not None and spec.get("tzid"):
+            start = start.astimezone(self.tz)
+        self.dtstart = start.replace(tzinfo=None)
+        self.duration = None
+        if master.get("end"):
+            self.duration = self.to_wall(master["end"]) - self.dtstart
+        self.rule = RecurrenceRule.parse(spec.get("rrule", ""), self._parse_until) if spec.get("rrule") else None
+        self.supported = self.rule is not None or not spec.get("rrule")
+        self.rdates = sorted({self.to_wall(value) for value in spec.get("rdates", ())})
+        self.excluded = {self.to_wall(value) for value in spec.get("exdates", ())}
+
+    def to_wall(self, iso_text: str) -> datetime:
+        """ISO 문자열 -> 원본 시간대 벽시계 (naive). 다른 오프셋이면 원본 시간대로 변환."""
+        value = datetime.fromisoformat(iso_text)
+        if value.tzinfo is not None and self.tz is not None:
+            value = value.astimezone(self.tz)
+        return value.replace(tzinfo=None)
+
+    def _parse_until(self, raw: str):
+        raw = raw.strip()
+        try:
+            if len(raw) == 8:
+                # 종일 UNTIL은 그날 전체 포함.
+                return datetime.strptime(raw, "%Y%m%d").replace(hour=23, minute=59, second=59)
+            if raw.endswith("Z"):
+                until = datetime.strptime(raw, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+                return until.astimezone(self.tz).replace(tzinfo=None) if self.tz is not None else until.replace(tzinfo=None)
+            return datetime.strptime(raw, "%Y%m%dT%H%M%S")
+        except ValueError:
+            return None
+
+    def _iso(self, wall: datetime) -> str:
+        if self.all_day or self.tz is None:
+            return wall.isoformat()
+        return wall.isoformat() + format_utc_offset(self.tz.utcoffset(wall))
+
+    def _instance(self, wall: datetime) -> dict:
+        event = dict(self.template)
+        event["id"] = instance_id(self.uid, wall, self.all_day)
+        event["start"] = self._iso(wall)
+        event["end"] = self._iso(wall + self.duration) if self.duration is not None else None
+        return event
+
+    def occurrences(self, window_start: datetime, window_end: datetime, max_instances: int):
+        """[window_start, window_end)와 겹치는 인스턴스 (개별 수정본/EXDATE로 대체·제외된 시각은 빠짐)."""
+        duration = self.duration or timedelta(0)
+        search_from = window_start - duration
+        starts = (
+            self.rule.iter_starts(self.dtstart, search_from, max_instances * SCAN_FACTOR)
+            if self.rule is not None
+            else iter((self.dtstart,))
+        )
+        if self.rdates:
+            starts = merge(starts, self.rdates)
+
+        instances = []
+        previous = None
+        for wall in starts:
+            if wall >= window_end:
+                break
+            if wall == previous or wall in self.excluded or wall + duration < window_start:
+                continue
+            previous = wall
+            instances.append(self._instance(wall))
+            if len(instances) >= max_instances:
+                break
+        return instances
+
+
+def instance_id(uid: str, wall: datetime, all_day: bool) -> str:
+    """반복 인스턴스 id - 원래 시작 시각 기준이라 개별 수정본과 같은 id를 공유."""
+    return f"{uid}#{wall:%Y%m%d}" if all_day else f"{uid}#{wall:%Y%m%dT%H%M%S}"
+
+
+def _parse_key(key: str):
+    return datetime.fromisoformat(key) if key else None
+
+
+class RecurrenceExpander:
+    """
+    Purpose: 한 스냅샷(캐시 갱신 1회)의 반복 일정 확장기. 구간별 확장 결과를 스냅샷 수명 동안 메모이즈.
+    Input: events(parse_ics_events 결과), horizon_days(열린 구간의 확장 길이), past_days(전체 응답에 포함할 지난 기간),
+           max_span_days(한 구간 확장 길이 상한), max_instances(시리즈 1개 × 구간 1개당 인스턴스 상한), window_cache_size
+    Output: has_series, display_events(), window_index(start_key, end_key)
+    Side Effects: 생성 시 반복 시리즈가 있으면 INFO 로그 1줄 (지원하지 않는 규칙 수 포함)
+    """
+
+    def __init__(
+        self,
+        events: list,
+        horizon_days: int = 180,
+        past_days: int = 30,
+        max_span_days: int = 731,
+        max_instances: int = 500,
+        window_cache_size: int = 32,
+        now=None,
+    ):
+        self.horizon = timedelta(days=max(1, horizon_days))
+        self.past = timedelta(days=max(0, past_days))
+        self.max_span = timedelta(days=max(1, max_span_days))
+        self.max_instances = max(1, int(max_instances))
+        self.window_cache_size = max(1, int(window_cache_size))
+        self._now = now
+        self._windows = OrderedDict()
+        # display_events()가 기준으로 쓴 날짜 (반복 시리즈가 없으면 None - 날짜가 바뀌어도 전체 응답이 같음).
+        self.display_date = None
+
+        self.series = []
+        base = []
+        overrides = defaultdict(list)
+        unsupported = 0
+        for event in events:
+            if "recurrence_id" in event:
+                overrides[str(event.get("id", ""))].append(event)
+            elif "recurrence" in event:
+                series = RecurringSeries(event)
+                if series.supported:
+                    self.series.append(series)
+                else:
+                    unsupported += 1
+                    base.append(series.template)
+            else:
+                base.append(event)
+
+        series_by_uid = {series.uid: series for series in self.series}
+        for uid, items in overrides.items():
+            series = series_by_uid.get(uid)
+            for event in items:
+                cleaned = {key: value for key, value in event.items() if key not in INTERNAL_FIELDS}
+                if series is not None:
+                    wall = series.to_wall(event["recurrence_id"])
+                    series.excluded.add(wall)
+                    cleaned["id"] = instance_id(uid, wall, series.all_day)
+                base.append(cleaned)
+
+        # 개별 수정본은 뒤에 붙였으므로 다시 정렬 (없으면 parse_ics_events 순서 그대로).
+        self.base_events = sorted(base, key=itemgetter("start")) if overrides else base
+        self.base_index = CalendarIndex(self.base_events) if self.series else None
+        if self.series or unsupported:
+            logger.info(
+                f"Calendar recurrence series={len(self.series)} overrides={sum(map(len, overrides.values()))} "
+                f"unsupported={unsupported}",
+                extra={"step": "CALENDAR_RECURRENCE", "status": "SUCCESS" if not unsupported else "WARN"},
+            )
+
+    @property
+    def has_series(self) -> bool:
+        return bool(self.series)
+
+    def _today(self) -> datetime:
+        now = self._now() if callable(self._now) else datetime.now()
+        return datetime(now.year, now.month, now.day)
+
+    def occurrences(self, window_start: datetime, window_end: datetime) -> list:
+        """구간 [window_start, window_end)의 모든 시리즈 인스턴스를 (start, id) 순으로."""
+        if window_end - window_start > self.max_span:
+            window_end = window_start + self.max_span
+        instances = []
+        for series in self.series:
+            instances.extend(series.occurrences(window_start, window_end, self.max_instances))
+        instances.sort(key=lambda event: (time_key(event["start"]), event["id"]))
+        return instances
+
+    def display_events(self) -> list:
+        """전체 응답용: 반복이 아닌 이벤트 전부 + [오늘 - past_days, 오늘 + horizon_days) 인스턴스."""
+        if not self.series:
+            return self.base_events
+        today = self._today()
+        self.display_date = today.date()
+        instances = self.occurrences(today - self.past, today + self.horizon)
+        return list(merge(self.base_events, instances, key=itemgetter("start")))
+
+    def window_index(self, start_key: str, end_key: str) -> CalendarIndex:
+        """
+        Purpose: 범위 조회용 인덱스 (반복 아닌 이벤트 중 구간 내 + 구간 인스턴스). 같은 구간은 재사용.
+        Input: parse_query_time 결과 키. 열린 쪽은 반대쪽(없으면 오늘) 기준 horizon_days로 확장 범위를 정함.
+        """
+        key = (start_key, end_key)
+        cached = self._windows.get(key)
+        if cached is not None:
+            self._windows.move_to_end(key)
+            return cached
+
+        window_start = _parse_key(start_key)
+        window_end = _parse_key(end_key)
+        if window_start is None:
+            window_start = window_end - self.horizon if window_end is not None else self._today() - self.past
+        if window_end is None:
+            window_end = window_start + self.horizon
+        base, _ = self.base_index.query(start_key=start_key, end_key=end_key)
+        instances = self.occurrences(window_start, window_end) if window_start < window_end else []
+        cached = CalendarIndex(base + instances)
+
+        self._windows[key] = cached
+        while len(self._windows) > self.window_cache_size:
+            self._windows.popitem(last=False)
+        return cached
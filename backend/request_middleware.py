@@ -0,0 +1,305 @@
+"""
+Request Context Middleware (backend/request_middleware.py)
+역할: 순수 ASGI 미들웨어 1개로 요청 ID 발급, API Origin 가드, 전역 admission control(과부하 시 우선순위별 거절),
+      처리 시간 로그/메트릭, 응답 헤더 부착을 한 번에 처리
+호출 관계: main.py -> app.add_middleware(RequestContextMiddleware, ...) (가장 바깥 계층)
+          RequestContextMiddleware -> backend.admission.AdmissionController.admit()/release() (라우터보다 먼저)
+          RequestContextMiddleware -> backend.profiling.ProfilingControl (X-Profile-Token 헤더가 맞는 요청만 cProfile)
+          라우트 핸들러 -> request.state.job_id (scope["state"]에 기록된 값)
+수정 시 주의사항: BaseHTTPMiddleware(@app.middleware("http"))로 되돌리지 마세요. 계층마다 태스크/스트림 래핑 비용이 붙습니다.
+  로그 문구(Incoming/Completed/Unhandled/Blocked)는 로그 분석 도구가 그대로 파싱하므로 형식을 유지해야 합니다.
+  duration_ms는 응답 본문 전송 완료 시점까지입니다 (스트리밍 응답 포함).
+  admission 슬롯은 finally에서 반환합니다 (클라이언트가 끊겨 태스크가 취소돼도 슬롯이 새지 않도록).
+  profiler가 None이면(PROFILING_ADMIN_TOKEN 미설정) 요청당 None 비교 1번 외에 프로파일링 관련 작업이 없습니다.
+"""
+
+import json
+import logging
+import time
+import uuid
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from backend.admission import SKIP_SAMPLE_STATE_KEY
+
+logger = logging.getLogger("DevilTown")
+
+FORBIDDEN_ORIGIN_BODY = json.dumps(
+    {"detail": "Forbidden origin. This API is only available from the official site."}
+).encode("utf-8")
+CLIENT_IP_HEADERS = (b"cf-connecting-ip", b"x-real-ip", b"x-forwarded-for")
+
+
+@lru_cache(maxsize=512)
+def normalize_origin(origin_like: str) -> str:
+    """Origin/Referer 값을 `scheme://host[:port]` 소문자로 정규화 (잘못된 값은 ""). 결과는 LRU 메모이즈."""
+    raw = (origin_like or "").strip()
+    if not raw:
+        return ""
+
+    parsed = urlparse(raw)
+    if not parsed.scheme or not parsed.netloc:
+        # 운영 중 오타로 스킴 없이 넣는 경우를 보정.
+        parsed = urlparse(f"https://{raw}")
+
+    if not parsed.scheme or not parsed.netloc:
+        return ""
+
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def client_ip_from_scope(scope: dict) -> str:
+    """Cloudflare/프록시 헤더(cf-connecting-ip > x-real-ip > x-forwarded-for 첫 값) 우선, 없으면 소켓 주소."""
+    found = {}
+    for name, value in scope.get("headers", ()):
+        if name in CLIENT_IP_HEADERS and name not in found:
+            found[name] = value
+    for name in CLIENT_IP_HEADERS:
+        raw = found.get(name, b"").decode("latin-1").strip()
+        if name == b"x-forwarded-for":
+            raw = raw.split(",")[0].strip()
+        if raw:
+            return raw
+    client = scope.get("client")
+    if client and client[0]:
+        return client[0]
+    return "unknown"
+
+
+def route_label(scope: dict, static_prefixes=()) -> str:
+    """메트릭 라벨용 라우트 템플릿 (원문 경로를 쓰면 스캐너 요청으로 라벨 수가 무한히 늘어남)."""
+    route_path = getattr(scope.get("route"), "path", None)
+    if route_path:
+        return route_path
+    path = scope.get("path", "")
+    for prefix in static_prefixes:
+        if path.startswith(prefix + "/"):
+            return prefix
+    return "unmatched"
+
+
+class _RequestContext:
+    """요청 1건의 job_id/시작 시각/응답 상태 + 응답 시작 메시지에 공통 헤더를 붙이는 send 래퍼."""
+
+    __slots__ = ("job_id", "start", "method", "path", "receive_logged", "extra_headers", "status_code", "_send")
+
+    def __init__(self, scope, send, version_header):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.start = time.perf_counter()
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.receive_logged = False
+        self.extra_headers = [(b"x-request-id", self.job_id.encode("ascii")), version_header]
+        self.status_code = 500
+        self._send = send
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+            message = dict(message)
+            message["headers"] = list(message.get("headers", ())) + self.extra_headers
+        await self._send(message)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+class RequestContextMiddleware:
+    """
+    Purpose: 모든 HTTP 요청에 job_id를 붙이고, 제한 경로는 허용 Origin/Referer만 통과시키며, 처리 결과를 기록.
+    Input: app(ASGI), allowed_origins(정규화된 Origin 집합), restricted_paths, app_version,
+           metrics(MetricsRegistry), receive_sampler(ReceiveSampler), static_prefixes(메트릭 라벨용),
+           admission(AdmissionController, None이면 admission control 없음),
+           profiler(ProfilingControl, None이면 요청 프로파일링 없음)
+    Output: 응답에 X-Request-ID / X-App-Version 헤더 추가 (프로파일한 요청은 X-Profile: <덤프 이름>|busy), 차단 시 403 JSON,
+            과부하 거절 시 503(전역 한도) / 429(클라이언트별 동시 요청) JSON + Retry-After
+    Side Effects: 요청당 RESPONSE 로그 1줄(+샘플링된 RECEIVE 로그), http_* / admission_* 메트릭 기록
+    """
+
+    def __init__(
+        self,
+        app,
+        allowed_origins,
+        restricted_paths,
+        app_version: str,
+        metrics,
+        receive_sampler,
+        static_prefixes=(),
+        admission=None,
+        profiler=None,
+    ):
+        self.app = app
+        self.admission = admission
+        self.profiler = profiler
+        self.allowed_origins = frozenset(allowed_origins)
+        self.restricted_paths = frozenset(restricted_paths)
+        self.metrics = metrics
+        self.receive_sampler = receive_sampler
+        self.static_prefixes = tuple(static_prefixes)
+        self._version_header = (b"x-app-version", str(app_version).encode("latin-1", "replace"))
+
+    def _is_allowed_site_request(self, headers) -> bool:
+        origin = ""
+        referer = ""
+        for name, value in headers:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"referer":
+                referer = value.decode("latin-1")
+
+        # Origin이 있으면 Origin만, 없으면 Referer로 판단.
+        normalized = normalize_origin(origin) or normalize_origin(referer)
+        if normalized:
+            return normalized in self.allowed_origins
+        # Origin/Referer가 모두 없는 요청은 서버 간 직접 호출로 보고 차단.
+        return False
+
+    @staticmethod
+    def _log_receive(method: str, path: str, job_id: str):
+        logger.info(f"Incoming {method} to {path}", extra={"job_id": job_id, "step": "REQUEST", "status": "RECEIVE"})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = _RequestContext(scope, send, self._version_header)
+        # Request.state는 scope["state"]를 감싸므로 여기에 넣으면 핸들러에서 request.state.job_id로 읽힘.
+        scope.setdefault("state", {})["job_id"] = ctx.job_id
+        ctx.receive_logged = self.receive_sampler.should_log_upfront()
+        if ctx.receive_logged:
+            self._log_receive(ctx.method, ctx.path, ctx.job_id)
+
+        profile = None
+        if self._is_blocked(scope):
+            await self._reject_origin(ctx)
+        else:
+            ticket, rejection = self._admit(scope)
+            if rejection is not None:
+                await self._reject_overloaded(rejection, ctx.path, ctx.job_id, ctx.send)
+            else:
+                profile = await self._call_app(ctx, scope, receive, ticket)
+
+        duration_ms = self._log_completed(ctx, scope)
+        if profile is not None:
+            await self.profiler.requests.save(ctx.job_id, profile, ctx.path, duration_ms)
+
+    def _is_blocked(self, scope) -> bool:
+        return (
+            scope["method"] != "OPTIONS"
+            and scope["path"] in self.restricted_paths
+            and not self._is_allowed_site_request(scope["headers"])
+        )
+
+    def _admit(self, scope):
+        """(ticket, rejection). admission control이 없거나 CORS preflight면 (None, None)."""
+        if scope["method"] == "OPTIONS" or self.admission is None:
+            return None, None
+        return self.admission.admit(scope["path"], client_ip_from_scope(scope))
+
+    async def _reject_origin(self, ctx: _RequestContext):
+        logger.warning(
+            f"Blocked API request by origin guard path={ctx.path}",
+            extra={"job_id": ctx.job_id, "step": "ORIGIN_GUARD", "status": "FAIL", "duration_ms": 0},
+        )
+        await ctx.send(
+            {
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(FORBIDDEN_ORIGIN_BODY)).encode("ascii")),
+                ],
+            }
+        )
+        await ctx.send({"type": "http.response.body", "body": FORBIDDEN_ORIGIN_BODY})
+
+    async def _call_app(self, ctx: _RequestContext, scope, receive, ticket):
+        """핸들러 실행 (선택적으로 cProfile). 반환: 기록 중인 profile 또는 None."""
+        profile = self._begin_profile(ctx, scope)
+        completed = False
+        try:
+            await self.app(scope, receive, ctx.send)
+            completed = True
+        except Exception:
+            self._log_unhandled(ctx, scope)
+            raise
+        finally:
+            if profile is not None:
+                self.profiler.requests.end(profile)
+            if ticket is not None:
+                self._release_ticket(ticket, ctx.status_code if completed else None, ctx.job_id, scope["state"])
+        return profile
+
+    def _begin_profile(self, ctx: _RequestContext, scope):
+        if self.profiler is None or not self.profiler.should_profile(ctx.path, scope["headers"]):
+            return None
+        profile = self.profiler.requests.begin()
+        ctx.extra_headers.append((b"x-profile", f"request-{ctx.job_id}.prof".encode("ascii") if profile else b"busy"))
+        return profile
+
+    def _log_unhandled(self, ctx: _RequestContext, scope):
+        # except 블록 안에서 호출되므로 logger.exception이 현재 예외의 traceback을 기록.
+        elapsed = ctx.elapsed()
+        self._record_metrics(scope, ctx.method, 500, elapsed)
+        if not ctx.receive_logged:
+            self._log_receive(ctx.method, ctx.path, ctx.job_id)
+        logger.exception(
+            f"Unhandled exception on {ctx.path}",
+            extra={"job_id": ctx.job_id, "step": "RESPONSE", "status": "FAIL", "duration_ms": int(elapsed * 1000)},
+        )
+
+    def _log_completed(self, ctx: _RequestContext, scope) -> int:
+        """RESPONSE 로그 + http_* 메트릭. 반환: duration_ms."""
+        elapsed = ctx.elapsed()
+        self._record_metrics(scope, ctx.method, ctx.status_code, elapsed)
+        status = "SUCCESS" if ctx.status_code < 500 else "FAIL"
+        if not ctx.receive_logged and status == "FAIL":
+            self._log_receive(ctx.method, ctx.path, ctx.job_id)
+        duration_ms = int(elapsed * 1000)
+        logger.info(
+            f"Completed {ctx.path} code={ctx.status_code}",
+            extra={"job_id": ctx.job_id, "step": "RESPONSE", "status": status, "duration_ms": duration_ms},
+        )
+        return duration_ms
+
+    async def _reject_overloaded(self, rejection, path: str, job_id: str, send):
+        """핸들러를 부르지 않고 즉시 503/429 + Retry-After (업스트림/파싱 비용 없음)."""
+        self.metrics.inc("admission_rejections_total", (rejection.priority, rejection.reason))
+        logger.warning(
+            f"Admission rejected reason={rejection.reason} priority={rejection.priority} path={path} "
+            f"inflight={self.admission.inflight} limit={int(self.admission.limit.limit)}",
+            extra={"job_id": job_id, "step": "ADMISSION", "status": "FAIL", "duration_ms": 0},
+        )
+        body = json.dumps(
+            {"detail": f"Server is busy. Retry in {rejection.retry_after} seconds.", "reason": rejection.reason}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": rejection.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(rejection.retry_after).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def _release_ticket(self, ticket, status_code, job_id: str, state: dict):
+        if self.admission.release(ticket, status_code, sampled=not state.get(SKIP_SAMPLE_STATE_KEY)):
+            limit = self.admission.limit
+            logger.warning(
+                f"Admission limit decreased limit={int(limit.limit)} latency_ratio={limit.latency_ratio:.2f} "
+                f"inflight={self.admission.inflight}",
+                extra={"job_id": job_id, "step": "ADMISSION", "status": "WARN"},
+            )
+
+    def _record_metrics(self, scope, method: str, status_code: int, elapsed_seconds: float):
+        route = route_label(scope, self.static_prefixes)
+        if route == "unmatched" and scope["path"] in self.restricted_paths:
+            # Origin 가드에서 막힌 요청은 라우터까지 가지 않으므로 (고정 집합인) 경로를 그대로 라벨로 사용.
+            route = scope["path"]
+        self.metrics.observe("http_request_duration_seconds", elapsed_seconds, (route, method))
+        self.metrics.inc("http_requests_total", (route, method, str(status_code)))
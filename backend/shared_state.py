@@ -0,0 +1,330 @@
+"""
+Shared State Backend (backend/shared_state.py)
+역할: 멀티 워커(uvicorn --workers N) 모드에서 레이트 리밋 카운터/캘린더 데이터를 프로세스 간 공유
+호출 관계: main.py (SERVER_WORKERS > 1 또는 SHARED_STATE_ENABLED=1)
+          -> SharedRateLimiter.hit() (메모리) + sync() (백그라운드 태스크, 워커 스레드)
+          -> SharedCalendarCoordinator (backend.calendar_cache에서 사용)
+수정 시 주의사항: 외부 서비스 없이 로컬 SQLite(WAL) 파일 1개를 사용합니다.
+  sqlite3 연결은 스레드 간 공유할 수 없으므로 스레드별로 연결을 엽니다.
+  busy_timeout 동안 대기할 수 있으므로 SQLite 호출은 이벤트 루프가 아닌 워커 스레드(asyncio.to_thread)에서만 합니다.
+  스키마 변경 시 파일을 지워도 안전합니다 (캐시/카운터 성격의 데이터만 저장).
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger("DevilTown")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS rate_limits (
+        scope TEXT NOT NULL,
+        client TEXT NOT NULL,
+        window INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        PRIMARY KEY (scope, client)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS rate_limits_window ON rate_limits (window)",
+    """
+    CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+)
+
+
+class SharedStateStore:
+    """
+    Purpose: 워커 프로세스들이 함께 쓰는 SQLite(WAL) 파일 연결 관리.
+    Input: path(DB 파일 경로), busy_timeout_ms(다른 워커가 쓰는 중일 때 대기 한도)
+    Side Effects: 최초 생성 시 디렉터리/테이블 생성
+    Exceptions: sqlite3.Error (디스크/권한 문제)
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 2000):
+        self.path = path
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.connection()
+        with conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션 경계를 BEGIN IMMEDIATE로 직접 제어.
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._local.conn = conn
+        return conn
+
+
+class _SharedBucket:
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class SharedRateLimiter:
+    """
+    Purpose: SlidingWindowRateLimiter와 같은 의미의 제한을 모든 워커가 공유하는 카운터로 수행.
+             요청 경로(hit)는 워커 메모리의 카운터만 보고, SQLite와의 합산은 sync()가 백그라운드에서 수행.
+    Input: store, window_seconds, max_keys
+    Output: hit() -> 0(허용) 또는 Retry-After 초(거절), sync() -> 반영한 증가분 키 수
+    Side Effects: hit()은 메모리만 변경. sync()는 SQLite 트랜잭션 1회 (워커 스레드에서 주기 호출)
+    Exceptions: 없음 - DB 오류 시 워커 로컬 카운트로만 제한(fail-open 쪽)하고 경고 로그
+    수정 시 주의사항: 다른 워커의 카운트는 마지막 sync 시점 값이므로, 키 1개당 sync 간격만큼은 한도를 조금 넘길 수 있습니다.
+    """
+
+    def __init__(self, store: SharedStateStore, window_seconds: float, max_keys: int, clock=time.time):
+        self._store = store
+        self.window_seconds = max(1.0, float(window_seconds))
+        self.max_keys = max(1, int(max_keys))
+        self._clock = clock
+        self._lock = threading.Lock()
+        # dict 삽입 순서를 이용해 키 상한 초과 시 가장 오래된 키부터 제거 (SlidingWindowRateLimiter와 동일).
+        self._buckets = {}
+        # 아직 SQLite에 반영하지 않은 이 워커의 허용 수: (scope, client, window) -> count
+        self._pending = {}
+        self._purged_window = None
+        self._failing = False
+
+    def key_count(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, scope: str, client: str, limit: int) -> int:
+        if limit <= 0:
+            return 0
+        now = self._clock()
+        window = int(now // self.window_seconds)
+        elapsed = (now - window * self.window_seconds) / self.window_seconds
+        key = (scope, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.pop(next(iter(self._buckets)))
+                bucket = self._buckets[key] = _SharedBucket(window)
+            elif bucket.window != window:
+                bucket.previous = bucket.current if bucket.window == window - 1 else 0
+                bucket.current = 0
+                bucket.window = window
+
+            estimate = bucket.previous * (1.0 - elapsed) + bucket.current
+            if estimate + 1 > limit:
+                return self._retry_after(bucket.current, bucket.previous, limit, elapsed)
+            bucket.current += 1
+            pending_key = (scope, client, window)
+            self._pending[pending_key] = self._pending.get(pending_key, 0) + 1
+            return 0
+
+    def sync(self) -> int:
+        """
+        Purpose: 이 워커의 증가분을 공유 카운터에 더하고, 최근 사용한 키의 전체 워커 합계를 다시 읽어 로컬 카운터에 반영.
+        Side Effects: SQLite BEGIN IMMEDIATE 트랜잭션 1회 (busy_timeout 동안 대기할 수 있으므로 이벤트 루프에서 호출 금지)
+        """
+        window = int(self._clock() // self.window_seconds)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            keys = [key for key, bucket in self._buckets.items() if bucket.window >= window - 1]
+
+        conn = self._store.connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._purged_window != window:
+                    self._purge(conn, window)
+                for (scope, client, hit_window), count in pending.items():
+                    self._add_locked(conn, scope, client, hit_window, count)
+                rows = {}
+                for scope, client in keys:
+                    row = conn.execute(
+                        "SELECT window, current, previous FROM rate_limits WHERE scope = ? AND client = ?",
+                        (scope, client),
+                    ).fetchone()
+                    if row is not None:
+                        rows[(scope, client)] = row
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # 공유 저장소 장애로 전체 사이트가 429가 되는 것보다 워커별 제한으로 낮추는 편이 안전 (증가분은 버림).
+            if not self._failing:
+                logger.warning(
+                    f"Shared rate limit sync failed, using per-worker counts: {e}",
+                    extra={"step": "RATE_LIMIT", "status": "WARN"},
+                )
+            self._failing = True
+            return 0
+
+        if self._failing:
+            logger.info("Shared rate limit sync recovered", extra={"step": "RATE_LIMIT", "status": "SUCCESS"})
+            self._failing = False
+        with self._lock:
+            for key, (row_window, row_current, row_previous) in rows.items():
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                if row_window > bucket.window:
+                    bucket.window = row_window
+                if row_window == bucket.window:
+                    current, previous = row_current, row_previous
+                elif row_window == bucket.window - 1:
+                    current, previous = 0, row_current
+                else:
+                    current, previous = 0, 0
+                # 읽은 뒤에 이 워커가 허용한 요청(다음 sync 대상)은 아직 DB에 없으므로 더해 둠.
+                bucket.current = current + self._pending.get((key[0], key[1], bucket.window), 0)
+                bucket.previous = previous + self._pending.get((key[0], key[1], bucket.window - 1), 0)
+        return len(pending)
+
+    def _add_locked(self, conn, scope, client, window, count):
+        row = conn.execute(
+            "SELECT window, current, previous FROM rate_limits WHERE scope = ? AND client = ?",
+            (scope, client),
+        ).fetchone()
+        if row is None or row[0] < window:
+            previous = row[1] if row is not None and row[0] == window - 1 else 0
+            values = (window, count, previous)
+        elif row[0] == window:
+            values = (window, row[1] + count, row[2])
+        elif row[0] == window + 1:
+            # 다른 워커가 이미 다음 윈도우로 넘긴 키: 지난 증가분은 previous에 더함.
+            values = (row[0], row[1], row[2] + count)
+        else:
+            return
+        conn.execute(
+            "INSERT INTO rate_limits (scope, client, window, current, previous) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (scope, client) DO UPDATE SET "
+            "window = excluded.window, current = excluded.current, previous = excluded.previous",
+            (scope, client, *values),
+        )
+
+    def _retry_after(self, current: int, previous: int, limit: int, elapsed: float) -> int:
+        if current < limit:
+            wait = (1.0 - (limit - current - 1) / previous - elapsed) * self.window_seconds
+        else:
+            wait = (1.0 - elapsed + max(0.0, 1.0 - (limit - 1) / current)) * self.window_seconds
+        return max(1, int(math.ceil(wait)))
+
+    def _purge(self, conn, window: int):
+        # 윈도우가 바뀔 때 워커별로 1회만, 인덱스를 타는 범위 삭제로 만료 키 정리.
+        conn.execute("DELETE FROM rate_limits WHERE window < ?", (window - 1,))
+        overflow = conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0] - self.max_keys
+        if overflow > 0:
+            # WITHOUT ROWID 테이블이므로 기본 키 튜플로 가장 오래된 윈도우부터 제거.
+            conn.execute(
+                "DELETE FROM rate_limits WHERE (scope, client) IN "
+                "(SELECT scope, client FROM rate_limits ORDER BY window LIMIT ?)",
+                (overflow,),
+            )
+        with self._lock:
+            # 로컬 키도 같은 시점에 만료 (지난 두 윈도우에 쓰이지 않은 키).
+            stale = [key for key, bucket in self._buckets.items() if bucket.window < window - 1]
+            for key in stale:
+                del self._buckets[key]
+        self._purged_window = window
+
+
+@dataclass
+class SharedCalendarState:
+    version: int
+    updated_at: float
+    data: dict
+
+
+class SharedCalendarCoordinator:
+    """
+    Purpose: 캘린더 갱신을 lease를 가진 워커 1개만 수행하고, 결과를 다른 워커와 공유.
+    Input: store, worker_id, lease_seconds
+    Output: load()/publish()/touch()/try_lead()
+    Side Effects: SQLite 읽기/쓰기 (워커 스레드에서 호출)
+    Exceptions: sqlite3.Error 전파 (CalendarCache가 갱신 실패로 처리)
+    """
+
+    BLOB_NAME = "calendar"
+    LEASE_NAME = "calendar-refresh"
+
+    def __init__(self, store: SharedStateStore, worker_id: str, lease_seconds: float):
+        self._store = store
+        self.worker_id = worker_id
+        self.lease_seconds = max(5.0, float(lease_seconds))
+
+    def try_lead(self) -> bool:
+        now = time.time()
+        conn = self._store.connection()
+        conn.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+            (self.LEASE_NAME, self.worker_id, now + self.lease_seconds, now),
+        )
+        row = conn.execute("SELECT owner FROM leases WHERE name = ?", (self.LEASE_NAME,)).fetchone()
+        return bool(row) and row[0] == self.worker_id
+
+    def load(self, known_version: int = 0):
+        """공유된 최신 상태. known_version과 같으면 본문 없이 updated_at만 돌려줌 (data=None)."""
+        conn = self._store.connection()
+        row = conn.execute(
+            "SELECT version, updated_at FROM blobs WHERE name = ?", (self.BLOB_NAME,)
+        ).fetchone()
+        if row is None:
+            return None
+        version, updated_at = row
+        if version == known_version:
+            return SharedCalendarState(version=version, updated_at=updated_at, data=None)
+        data_row = conn.execute("SELECT data FROM blobs WHERE name = ?", (self.BLOB_NAME,)).fetchone()
+        return SharedCalendarState(version=version, updated_at=updated_at, data=json.loads(data_row[0]))
+
+    def publish(self, data: dict) -> int:
+        conn = self._store.connection()
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT version FROM blobs WHERE name = ?", (self.BLOB_NAME,)).fetchone()
+            version = (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT INTO blobs (name, version, updated_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET version = excluded.version, "
+                "updated_at = excluded.updated_at, data = excluded.data",
+                (self.BLOB_NAME, version, time.time(), body),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def touch(self):
+        """업스트림 304: 본문은 그대로 두고 신선도 기준 시각만 갱신."""
+        self._store.connection().execute(
+            "UPDATE blobs SET updated_at = ? WHERE name = ?", (time.time(), self.BLOB_NAME)
+        )
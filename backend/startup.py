@@ -0,0 +1,122 @@
+"""
+Startup Helpers (backend/startup.py)
+역할: 무거운 선택 의존성(google.generativeai)의 지연 import + 백그라운드 워밍업, 기동 단계별 소요 시간 기록
+호출 관계: main.py (모듈 최상단) -> StartupTimer.mark() ... log_summary()
+          main.py -> LazyModule("google.generativeai") -> ModelRegistry가 속성 접근 시 실제 import
+          main.py (startup 이벤트) -> LazyModule.warmup() -> 데몬 스레드에서 import
+수정 시 주의사항: LazyModule 속성 접근은 실제 import를 일으키므로 이벤트 루프 스레드에서 접근하지 마세요
+  (워커 스레드/워밍업 스레드 전용). 설치 여부 확인은 import 없이 available로 합니다.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger("DevilTown")
+
+
+class LazyModule:
+    """
+    Purpose: 모듈을 처음 속성에 접근할 때 import (프록시). 설치 여부는 find_spec으로만 확인.
+    Input: module_name
+    Output: 속성 접근 시 실제 모듈의 속성
+    Side Effects: 첫 접근/warmup() 시 import (수백 ms ~ 수 초, 스레드 락으로 1회만)
+    Exceptions: ImportError (설치는 됐지만 import가 실패한 경우 첫 접근마다 재발생)
+    """
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+        self.import_ms = None
+
+    @property
+    def available(self) -> bool:
+        if self._module is not None or self._module_name in sys.modules:
+            return True
+        try:
+            return importlib.util.find_spec(self._module_name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        module = self._module
+        if module is not None:
+            return module
+        with self._lock:
+            if self._module is None:
+                started = time.perf_counter()
+                self._module = importlib.import_module(self._module_name)
+                self.import_ms = int((time.perf_counter() - started) * 1000)
+                logger.info(
+                    f"Lazy import finished module={self._module_name}",
+                    extra={"step": "LAZY_IMPORT", "status": "SUCCESS", "duration_ms": self.import_ms},
+                )
+            return self._module
+
+    def __getattr__(self, name: str):
+        # __getattr__은 인스턴스에 없는 이름에만 호출되므로 내부 필드 접근에는 영향 없음.
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def warmup(self, then=None):
+        """
+        Purpose: 데몬 스레드에서 import(+ 선택적 후속 작업 then())을 미리 수행해 첫 AI 요청의 지연을 없앰.
+        Side Effects: 스레드 1개 (이미 로드됐거나 워밍업 중이면 아무것도 하지 않음)
+        """
+        if self._warmup_thread is not None or not self.available:
+            return
+
+        def _run():
+            try:
+                self.load()
+                if then is not None:
+                    then()
+            except Exception as e:
+                logger.warning(
+                    f"Warmup failed module={self._module_name}: {e}",
+                    extra={"step": "LAZY_IMPORT", "status": "WARN"},
+                )
+
+        self._warmup_thread = threading.Thread(target=_run, name=f"warmup-{self._module_name}", daemon=True)
+        self._warmup_thread.start()
+
+
+class StartupTimer:
+    """
+    Purpose: 모듈 import 시작부터 단계별 경과 시간을 기록해 기동 지연의 위치를 보여줌.
+    Output: phases() -> [(단계명, ms)], total_ms()
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._started = clock()
+        self._last = self._started
+        self._phases = []
+
+    def mark(self, phase: str):
+        now = self._clock()
+        self._phases.append((phase, round((now - self._last) * 1000, 1)))
+        self._last = now
+
+    def phases(self) -> list:
+        return list(self._phases)
+
+    def total_ms(self) -> float:
+        return round((self._last - self._started) * 1000, 1)
+
+    def log_summary(self):
+        detail = " ".join(f"{name}={ms:g}ms" for name, ms in self._phases)
+        logger.info(
+            f"Startup phases {detail}",
+            extra={"step": "BOOT_PROFILE", "status": "SUCCESS", "duration_ms": int(self.total_ms())},
+        )
@@ -0,0 +1,115 @@
+"""
+In-Memory Static Assets (backend/static_assets.py)
+역할: index.html, css/*, js/* 를 기동 시 메모리에 올리고 gzip/Brotli 변형 + 내용 해시 ETag를 미리 계산
+호출 관계: main.py (GET/HEAD /, /css/*, /js/*) -> StaticAssetStore.lookup()
+          -> backend.precompressed.PrecompressedBody (압축/ETag 재사용)
+수정 시 주의사항: 파일은 기동 시 1회만 읽습니다. 배포(git pull) 후에는 서버 재시작이 필요합니다.
+  fingerprint=True면 메모리 속 index.html의 css/js 참조를 'name.<hash>.ext'로 바꿔 immutable 캐시를 허용합니다.
+  디스크의 index.html은 수정하지 않습니다 (GitHub Pages 등 다른 배포 경로 영향 없음).
+"""
+
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+
+from backend.precompressed import PrecompressedBody
+
+# 지문(fingerprint) 이름으로 요청된 자산은 내용이 바뀌면 URL도 바뀌므로 1년 + immutable.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 원래 이름(index.html 포함)은 매번 ETag로 재검증 (변경 없으면 304).
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+FINGERPRINT_LENGTH = 12
+
+_ASSET_REF_PATTERN = re.compile(r'(\b(?:href|src)=")((?:css|js)/[^"?#]+)(?:\?[^"#]*)?(")')
+
+_TEXT_MEDIA_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+}
+
+
+@dataclass
+class StaticAsset:
+    body: PrecompressedBody
+    cache_control: str
+
+
+def _media_type(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _TEXT_MEDIA_TYPES:
+        return _TEXT_MEDIA_TYPES[ext]
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def fingerprinted_path(rel_path: str, body: PrecompressedBody) -> str:
+    """'js/app.js' -> 'js/app.<sha256 앞 12자>.js' (ETag와 같은 해시)."""
+    stem, ext = os.path.splitext(rel_path)
+    digest = body.etag.strip('"')[:FINGERPRINT_LENGTH]
+    return f"{stem}.{digest}{ext}"
+
+
+class StaticAssetStore:
+    """
+    Purpose: 정적 자산을 요청마다 stat/read 하지 않고 메모리의 미리 압축된 본문으로 응답.
+    Input: root(프로젝트 루트), directories(통째로 적재할 하위 폴더), index_file, fingerprint
+    Output: lookup(url_path) -> StaticAsset | None
+    Side Effects: load() 시 파일 읽기 + 압축 CPU (기동 시 1회)
+    Exceptions: OSError (index.html 읽기 실패 시 load()에서 전파)
+    """
+
+    def __init__(self, root: str, directories=("css", "js"), index_file: str = "index.html", fingerprint: bool = True):
+        self.root = root
+        self.directories = tuple(directories)
+        self.index_file = index_file
+        self.fingerprint = fingerprint
+        self._assets = {}
+        self.fingerprints = {}
+
+    def load(self):
+        assets = {}
+        fingerprints = {}
+        for directory in self.directories:
+            base = os.path.join(self.root, directory)
+            for dirpath, _, filenames in os.walk(base):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                    with open(full_path, "rb") as f:
+                        body = PrecompressedBody(f.read(), _media_type(rel_path))
+                    assets["/" + rel_path] = StaticAsset(body, REVALIDATE_CACHE_CONTROL)
+                    if self.fingerprint:
+                        hashed = fingerprinted_path(rel_path, body)
+                        fingerprints[rel_path] = hashed
+                        assets["/" + hashed] = StaticAsset(body, IMMUTABLE_CACHE_CONTROL)
+
+        with open(os.path.join(self.root, self.index_file), "r", encoding="utf-8") as f:
+            html = f.read()
+        if self.fingerprint:
+            html = self._rewrite_asset_urls(html, fingerprints)
+        index_asset = StaticAsset(PrecompressedBody(html.encode("utf-8"), _media_type(self.index_file)), REVALIDATE_CACHE_CONTROL)
+        assets["/"] = index_asset
+        assets["/" + self.index_file] = index_asset
+
+        # 완성된 dict로 한 번에 교체 (요청 처리 중 부분 적재 상태가 보이지 않도록).
+        self._assets = assets
+        self.fingerprints = fingerprints
+        return self
+
+    @staticmethod
+    def _rewrite_asset_urls(html: str, fingerprints: dict) -> str:
+        def replace(match):
+            hashed = fingerprints.get(match.group(2))
+            if hashed is None:
+                return match.group(0)
+            return f"{match.group(1)}{hashed}{match.group(3)}"
+
+        return _ASSET_REF_PATTERN.sub(replace, html)
+
+    def lookup(self, url_path: str):
+        return self._assets.get(url_path)
+
+    def __len__(self):
+        return len(self._assets)
@@ -0,0 +1,335 @@
+"""
+Upstream Guard (backend/upstream_guard.py)
+역할: Gemini 호출 보호 계층 - 서킷 브레이커(오류율/지연 기준 open, half-open 탐침), 짧은 호출의 p95 기반 헤징
+호출 관계: main.py (/chat, /chat/stream, /dice-comment, 주사위 풀 보충) -> UpstreamGuard.run()/stream() -> LLMExecutor
+수정 시 주의사항: 이벤트 루프 스레드에서만 접근합니다 (락 없음).
+  LLMBusyError(로컬 워커 풀 포화)와 클라이언트 취소는 업스트림 상태가 아니므로 브레이커 통계에 넣지 않습니다.
+  헤징은 워커가 비어 있을 때만 두 번째 호출을 보내며, 진 쪽 스레드는 SDK 타임아웃까지 슬롯을 점유할 수 있습니다.
+  stream()은 응답 시작 전에 브레이커 기회(half-open 탐침)와 워커 슬롯을 잡습니다. 호출자는 이터레이션 여부와 무관하게
+  GuardedStream.aclose()를 불러야 하며(응답 단위 finally), 그래야 탐침이 반납되고 워커가 생성을 멈춥니다.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from backend.llm_executor import LLMBusyError
+
+logger = logging.getLogger("DevilTown")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 업스트림 호출을 시도하지 않음. retry_after(초) 뒤 half-open 탐침 예정."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open")
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class CircuitBreaker:
+    """
+    Purpose: 최근 window_seconds 동안의 호출 결과로 업스트림 상태를 판단해 장애 중 호출을 즉시 차단.
+    Input: 오류율(error_rate_threshold) 또는 느린 호출 비율(slow_rate_threshold, slow_call_seconds 이상)이
+           min_calls 이상 표본에서 임계치를 넘으면 open_seconds 동안 open
+    Output: allow() -> bool, record(success, duration), release(), state
+    Side Effects: 상태 전이 시 WARN/INFO 로그 1줄
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 30.0,
+        min_calls: int = 8,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 12.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 20.0,
+        half_open_max_calls: int = 1,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.window_seconds = max(1.0, float(window_seconds))
+        self.min_calls = max(1, int(min_calls))
+        self.error_rate_threshold = float(error_rate_threshold)
+        self.slow_call_seconds = float(slow_call_seconds)
+        self.slow_rate_threshold = float(slow_rate_threshold)
+        self.open_seconds = max(1.0, float(open_seconds))
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._clock = clock
+        self.state = CLOSED
+        self._opened_until = 0.0
+        self._probes_in_flight = 0
+        # (시각, 실패 여부, 느림 여부) - 카운터를 함께 유지해 판정이 O(1).
+        self._window = deque()
+        self._failures = 0
+        self._slow = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_until - self._clock())
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if self._clock() < self._opened_until:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probes_in_flight >= self.half_open_max_calls:
+            return False
+        self._probes_in_flight += 1
+        return True
+
+    def release(self):
+        """allow()로 받은 기회를 결과 없이 반납 (로컬 거절/클라이언트 취소)."""
+        if self.state == HALF_OPEN and self._probes_in_flight:
+            self._probes_in_flight -= 1
+
+    def record(self, success: bool, duration: float):
+        slow = duration >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if success and not slow:
+                self._transition(CLOSED)
+            else:
+                self._transition(OPEN)
+            return
+        if self.state == OPEN:
+            # open 직전에 출발한 호출의 늦은 결과는 판정에 쓰지 않음.
+            return
+
+        now = self._clock()
+        self._window.append((now, not success, slow))
+        self._failures += not success
+        self._slow += slow
+        self._trim(now)
+
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        if self._failures / calls >= self.error_rate_threshold or self._slow / calls >= self.slow_rate_threshold:
+            self._transition(OPEN)
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            _, failed, slow = self._window.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _transition(self, state: str):
+        previous = self.state
+        self.state = state
+        self._probes_in_flight = 0
+        if state == OPEN:
+            self._opened_until = self._clock() + self.open_seconds
+            calls = len(self._window)
+            logger.warning(
+                f"Circuit {self.name} opened from={previous} calls={calls} failures={self._failures} slow={self._slow} "
+                f"open_s={self.open_seconds:g}",
+                extra={"step": "CIRCUIT", "status": "WARN"},
+            )
+        else:
+            logger.info(
+                f"Circuit {self.name} {previous} -> {state}",
+                extra={"step": "CIRCUIT", "status": "SUCCESS" if state == CLOSED else "WARN"},
+            )
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+
+
+class LatencyWindow:
+    """최근 size개 성공 호출 지연의 분위수 (min_samples 미만이면 None). 정렬은 refresh_every회마다 1번."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20, quantile: float = 0.95, refresh_every: int = 10):
+        self._samples = deque(maxlen=max(1, int(size)))
+        self.min_samples = max(1, int(min_samples))
+        self.quantile = float(quantile)
+        self.refresh_every = max(1, int(refresh_every))
+        self._since_refresh = 0
+        self._cached = None
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if self._cached is None or self._since_refresh >= self.refresh_every:
+            self._refresh()
+
+    def _refresh(self):
+        self._since_refresh = 0
+        if len(self._samples) < self.min_samples:
+            self._cached = None
+            return
+        ordered = sorted(self._samples)
+        self._cached = ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    def value(self):
+        return self._cached
+
+
+class UpstreamGuard:
+    """
+    Purpose: LLMExecutor 호출에 브레이커/헤징을 씌운 래퍼.
+    Input: executor(LLMExecutor), breaker(CircuitBreaker 또는 None=비활성), registry(MetricsRegistry, 선택),
+           hedge_min_delay_seconds(헤징 대기 하한)
+    Output: run() -> fn 반환값, stream() -> async generator
+    Exceptions: CircuitOpenError(즉시), LLMBusyError, LLMTimeoutError, fn이 던진 예외
+    """
+
+    def __init__(self, executor, breaker=None, registry=None, hedge_min_delay_seconds: float = 0.3):
+        self.executor = executor
+        self.breaker = breaker
+        self._registry = registry
+        self.hedge_min_delay_seconds = max(0.0, float(hedge_min_delay_seconds))
+        self._latency = {}
+
+    def _acquire(self):
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_after())
+
+    def _record(self, success: bool, duration: float):
+        if self.breaker is not None:
+            self.breaker.record(success, duration)
+
+    def _release(self):
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def _count(self, name: str, labels):
+        if self._registry is not None:
+            self._registry.inc(name, labels)
+
+    async def run(self, fn, *args, timeout: float, hedge_operation: str = None):
+        """
+        Purpose: fn을 워커 스레드에서 실행. hedge_operation이 있으면 해당 작업의 p95를 넘길 때 두 번째 호출을 보냄.
+        Input: timeout(초, 전체 deadline), hedge_operation(헤징/지연 통계 구분 이름)
+        """
+        self._acquire()
+        started = time.monotonic()
+        try:
+            if hedge_operation is None:
+                result = await self.executor.run(fn, *args, timeout=timeout)
+            else:
+                result = await self._run_hedged(fn, args, timeout, hedge_operation)
+        except (LLMBusyError, asyncio.CancelledError):
+            self._release()
+            raise
+        except Exception:
+            self._record(False, time.monotonic() - started)
+            raise
+        duration = time.monotonic() - started
+        self._record(True, duration)
+        if hedge_operation is not None:
+            self._latency.setdefault(hedge_operation, LatencyWindow()).add(duration)
+        return result
+
+    async def _run_hedged(self, fn, args, timeout: float, operation: str):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        primary = asyncio.ensure_future(self.executor.run(fn, *args, timeout=timeout))
+        window = self._latency.get(operation)
+        p95 = window.value() if window is not None else None
+        if p95 is None:
+            return await primary
+
+        delay = max(p95, self.hedge_min_delay_seconds)
+        done, _ = await asyncio.wait({primary}, timeout=min(delay, timeout))
+        if done or self.executor.pending >= self.executor.max_concurrency or deadline - loop.time() <= 0:
+            # 이미 끝났거나, 빈 워커가 없어 헤징이 대기열만 늘리는 경우엔 원 호출만 기다림.
+            return await primary
+
+        backup = asyncio.ensure_future(self.executor.run(fn, *args, timeout=deadline - loop.time()))
+        self._count("upstream_hedges_total", (operation, "fired"))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count("upstream_hedges_total", (operation, "won"))
+                        return task.result()
+                    if error is None or isinstance(error, LLMBusyError):
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream(self, fn, *args, timeout: float):
+        """
+        Purpose: LLMExecutor.stream()에 브레이커를 적용. 첫 청크까지의 시간을 지연 판정에 사용.
+        Output: GuardedStream (이터레이션 여부와 무관하게 aclose() 필수)
+        Exceptions: CircuitOpenError/LLMBusyError(즉시, 응답 시작 전)
+        """
+        self._acquire()
+        try:
+            chunks = self.executor.stream(fn, *args, timeout=timeout)
+        except LLMBusyError:
+            self._release()
+            raise
+        return GuardedStream(self, chunks)
+
+    def circuit_state_value(self) -> int:
+        return STATE_VALUES[self.breaker.state] if self.breaker is not None else 0
+
+
+class GuardedStream:
+    """
+    Purpose: UpstreamGuard.stream() 결과. 끝까지/오류로 끝나면 브레이커에 결과를 기록하고,
+             그 전에 aclose()되면(클라이언트 disconnect, 응답 시작 전 취소 포함) 결과 없이 기회를 반납.
+    Output: 청크 async iterator, cancel()(워커 중단 신호만), aclose()(멱등)
+    """
+
+    def __init__(self, guard: UpstreamGuard, chunks):
+        self._guard = guard
+        self._chunks = chunks
+        self._settled = False
+        self._iterator = self._watch()
+
+    def __aiter__(self):
+        return self._iterator
+
+    def cancel(self):
+        self._chunks.cancel()
+
+    async def aclose(self):
+        self._chunks.cancel()
+        # 이터레이션을 시작했다면 _watch()의 finally가 결과를 정리하고, 시작 전이면 아래에서 반납.
+        await self._iterator.aclose()
+        await self._chunks.aclose()
+        self._settle(None, 0.0)
+
+    def _settle(self, success, duration: float):
+        if self._settled:
+            return
+        self._settled = True
+        if success is None:
+            # 소비자가 중간에 멈춤(클라이언트 disconnect) - 업스트림 상태와 무관.
+            self._guard._release()
+        else:
+            self._guard._record(success, duration)
+
+    async def _watch(self):
+        started = time.monotonic()
+        first_chunk_after = None
+        success = None
+        try:
+            async for chunk in self._chunks:
+                if first_chunk_after is None:
+                    first_chunk_after = time.monotonic() - started
+                yield chunk
+            success = True
+        except Exception:
+            success = False
+            raise
+        finally:
+            await self._chunks.aclose()
+            self._settle(success, first_chunk_after if first_chunk_after is not None else time.monotonic() - started)
@@ -0,0 +1,211 @@
+"""
+ICS Parser Benchmark (bench/bench_ics_parser.py)
+역할: 합성 캘린더(1k ~ 50k 이벤트)로 기존 main.py 파서(전체 unfold 목록 + strptime 순차 시도)와
+      backend.ics_parser(스트리밍 단일 패스)의 파싱 시간/메모리 비교
+호출 관계: 개발자가 수동 실행 -> bench/fake_ics_server.build_ics() 본문 -> 두 파서 직접 호출 (네트워크 없음)
+수정 시 주의사항: 측정용 스크립트이며 서버 코드에서 import하지 않습니다.
+  메모리는 tracemalloc으로 따로 한 번 더 실행해 잽니다 (추적 오버헤드가 시간 측정에 섞이지 않도록).
+  transient_mb = 최고 사용량 - 결과 목록이 차지하는 양 (파싱 중에만 잡는 임시 메모리).
+  --zoned는 TZID/VTIMEZONE이 섞인 본문이며, 기존 파서는 TZID를 버리므로 결과 일치 비교를 하지 않습니다.
+
+실행 예시:
+    python bench/bench_ics_parser.py
+    python bench/bench_ics_parser.py --events 1000,10000,50000 --repeat 5 --zoned
+"""
+
+import argparse
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from backend.ics_parser import parse_ics_events  # noqa: E402
+from fake_ics_server import build_ics  # noqa: E402
+
+logger = logging.getLogger("DevilTown.bench")
+
+
+# ---- 1.3.x main.py 파서 (비교 기준, 동작 그대로) ----
+
+def _legacy_unfold_ics_lines(ics_text: str):
+    unfolded = []
+    for raw_line in ics_text.splitlines():
+        if raw_line.startswith((" ", "\t")) and unfolded:
+            unfolded[-1] += raw_line[1:]
+        else:
+            unfolded.append(raw_line.rstrip("\r"))
+    return unfolded
+
+
+def _legacy_clean_ics_text(value: str) -> str:
+    return (
+        (value or "")
+        .replace("\\n", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+        .strip()
+    )
+
+
+def _legacy_parse_ics_datetime(value: str):
+    raw = (value or "").strip()
+    if not raw:
+        return None, False
+    if len(raw) == 8 and raw.isdigit():
+        return datetime.strptime(raw, "%Y%m%d"), True
+    formats = [
+        ("%Y%m%dT%H%M%SZ", True),
+        ("%Y%m%dT%H%M%S", False),
+        ("%Y%m%dT%H%MZ", True),
+        ("%Y%m%dT%H%M", False),
+    ]
+    for fmt, is_utc in formats:
+        try:
+            parsed = datetime.strptime(raw, fmt)
+            if is_utc:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed, False
+        except ValueError:
+            continue
+    return None, False
+
+
+def _legacy_event_to_payload(raw_event: dict, fallback_id: str):
+    start_dt, all_day = _legacy_parse_ics_datetime(raw_event.get("DTSTART"))
+    if start_dt is None:
+        return None
+    end_dt, _ = _legacy_parse_ics_datetime(raw_event.get("DTEND"))
+    categories_raw = raw_event.get("CATEGORIES", "")
+    if isinstance(categories_raw, list):
+        categories_raw = ",".join(categories_raw)
+    categories = [
+        _legacy_clean_ics_text(tag).lower()
+        for tag in str(categories_raw).split(",")
+        if _legacy_clean_ics_text(tag)
+    ]
+    return {
+        "id": raw_event.get("UID", fallback_id),
+        "title": _legacy_clean_ics_text(raw_event.get("SUMMARY", "Untitled")),
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat() if end_dt else None,
+        "all_day": all_day,
+        "location": _legacy_clean_ics_text(raw_event.get("LOCATION", "")),
+        "notes": _legacy_clean_ics_text(raw_event.get("DESCRIPTION", "")),
+        "categories": categories,
+    }
+
+
+def legacy_parse_ics_events(ics_text: str):
+    events = []
+    current = None
+    for line in _legacy_unfold_ics_lines(ics_text):
+        if line == "BEGIN:VEVENT":
+            current = {}
+            continue
+        if line == "END:VEVENT":
+            if current is not None:
+                payload = _legacy_event_to_payload(current, f"event-{len(events) + 1}")
+                if payload:
+                    events.append(payload)
+            current = None
+            continue
+        if current is None or ":" not in line:
+            continue
+        key_part, value = line.split(":", 1)
+        prop = key_part.split(";", 1)[0].upper()
+        if prop in current:
+            if isinstance(current[prop], list):
+                current[prop].append(value)
+            else:
+                current[prop] = [current[prop], value]
+        else:
+            current[prop] = value
+    events.sort(key=lambda ev: ev.get("start", ""))
+    return events
+
+
+# ---- 측정 ----
+
+ZONE_HEADER = "\r\n".join(
+    [
+        "BEGIN:VTIMEZONE",
+        "TZID:Asia/Seoul",
+        "BEGIN:STANDARD",
+        "DTSTART:19880508T020000",
+        "TZOFFSETFROM:+0900",
+        "TZOFFSETTO:+0900",
+        "TZNAME:KST",
+        "END:STANDARD",
+        "END:VTIMEZONE",
+    ]
+)
+
+
+def build_zoned_ics(event_count: int) -> str:
+    """iCloud 내보내기와 같은 모양: VTIMEZONE 1개 + 시간 일정은 TZID=Asia/Seoul 벽시계 시각."""
+    text = build_ics(event_count).decode("utf-8")
+    text = text.replace("X-WR-CALNAME:Bench\r\n", "X-WR-CALNAME:Bench\r\n" + ZONE_HEADER + "\r\n", 1)
+    lines = []
+    for line in text.split("\r\n"):
+        if line.startswith(("DTSTART:", "DTEND:")) and line.endswith("Z"):
+            name, value = line.split(":", 1)
+            line = f"{name};TZID=Asia/Seoul:{value[:-1]}"
+        lines.append(line)
+    return "\r\n".join(lines)
+
+
+def time_parser(parse, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        parse(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def memory_of(parse, text: str):
+    """(peak_mb, transient_mb) - 본문 문자열 자체는 측정 전에 이미 할당돼 있어 포함되지 않음."""
+    gc.collect()
+    tracemalloc.start()
+    result = parse(text)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 1e6, (peak - retained) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs streaming ICS parser (time and memory)")
+    parser.add_argument("--events", default="1000,5000,20000,50000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--zoned", action="store_true", help="TZID/VTIMEZONE가 섞인 본문으로 측정")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.info(
+        f"{'events':>7} {'body_mb':>7} {'legacy_ms':>9} {'new_ms':>8} {'speedup':>7} "
+        f"{'legacy_peak_mb':>14} {'new_peak_mb':>11} {'legacy_tmp_mb':>13} {'new_tmp_mb':>10} {'same':>5}"
+    )
+    for count in [int(item) for item in args.events.split(",") if item.strip()]:
+        text = build_zoned_ics(count) if args.zoned else build_ics(count).decode("utf-8")
+        legacy_s = time_parser(legacy_parse_ics_events, text, args.repeat)
+        new_s = time_parser(parse_ics_events, text, args.repeat)
+        legacy_peak, legacy_tmp = memory_of(legacy_parse_ics_events, text)
+        new_peak, new_tmp = memory_of(parse_ics_events, text)
+        same = "-" if args.zoned else str(legacy_parse_ics_events(text) == parse_ics_events(text))
+        logger.info(
+            f"{count:>7} {len(text) / 1e6:>7.1f} {legacy_s * 1000:>9.1f} {new_s * 1000:>8.1f} {legacy_s / new_s:>6.2f}x "
+            f"{legacy_peak:>14.1f} {new_peak:>11.1f} {legacy_tmp:>13.1f} {new_tmp:>10.1f} {same:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Middleware Overhead Benchmark (bench/bench_middleware.py)
+역할: 요청 1건당 미들웨어 비용 비교 - 기존 BaseHTTPMiddleware 2계층(log_requests + enforce_api_origin) vs
+      순수 ASGI RequestContextMiddleware 1계층 vs 미들웨어 없음(기준)
+호출 관계: 개발자가 수동 실행 -> starlette 최소 앱 + backend.request_middleware (네트워크 없이 ASGI 직접 호출)
+수정 시 주의사항: 측정용 스크립트이며 서버 코드에서 import하지 않습니다. starlette(fastapi 의존성)가 필요합니다.
+  로그 출력 비용은 두 방식이 같으므로 DevilTown 로거를 끄고 프레임워크/가드 비용만 봅니다.
+
+실행 예시:
+    python bench/bench_middleware.py
+    python bench/bench_middleware.py --requests 20000 --concurrency 1,50,200
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from backend.log_pipeline import ReceiveSampler  # noqa: E402
+from backend.metrics import MetricsRegistry  # noqa: E402
+from backend.request_middleware import RequestContextMiddleware, normalize_origin  # noqa: E402
+
+logger = logging.getLogger("DevilTown.bench")
+app_logger = logging.getLogger("DevilTown")
+
+ALLOWED_ORIGINS = {"https://welcometodeviltown.com", "https://www.welcometodeviltown.com"}
+RESTRICTED_PATHS = {"/chat"}
+ORIGIN_HEADER = (b"origin", b"https://welcometodeviltown.com")
+
+
+def _legacy_normalize_origin(origin_like: str) -> str:
+    """1.3.x main._normalize_origin (메모이즈 없음)."""
+    raw = (origin_like or "").strip()
+    if not raw:
+        return ""
+    parsed = urlparse(raw)
+    if not parsed.scheme or not parsed.netloc:
+        parsed = urlparse(f"https://{raw}")
+    if not parsed.scheme or not parsed.netloc:
+        return ""
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+async def _chat(request: Request):
+    return JSONResponse({"response": "ok", "job_id": request.state.job_id})
+
+
+def _new_metrics() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.histogram("http_request_duration_seconds", "bench", ("route", "method"))
+    registry.counter("http_requests_total", "bench", ("route", "method", "code"))
+    return registry
+
+
+def build_app(variant: str) -> Starlette:
+    app = Starlette(routes=[Route("/chat", _chat, methods=["POST"])])
+    if variant == "none":
+        # 기준: 핸들러가 request.state.job_id를 읽을 수 있도록 scope에 값만 넣는 가장 얇은 래퍼.
+        return _inject_job_id(app)
+
+    registry = _new_metrics()
+    sampler = ReceiveSampler(0.0)
+    if variant == "asgi":
+        app.add_middleware(
+            RequestContextMiddleware,
+            allowed_origins=ALLOWED_ORIGINS,
+            restricted_paths=RESTRICTED_PATHS,
+            app_version="bench",
+            metrics=registry,
+            receive_sampler=sampler,
+        )
+        return app
+
+    # legacy: 1.3.x main.py의 두 @app.middleware("http") 계층 재현.
+    @app.middleware("http")
+    async def enforce_api_origin(request: Request, call_next):
+        if request.method != "OPTIONS" and request.url.path in RESTRICTED_PATHS:
+            origin = _legacy_normalize_origin(request.headers.get("origin", ""))
+            allowed = origin in ALLOWED_ORIGINS if origin else False
+            if not allowed:
+                return JSONResponse(status_code=403, content={"detail": "Forbidden origin."})
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        job_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+        request.state.job_id = job_id
+        sampler.should_log_upfront()
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+        registry.observe("http_request_duration_seconds", time.time() - start_time, (route, request.method))
+        registry.inc("http_requests_total", (route, request.method, str(response.status_code)))
+        app_logger.info(f"Completed {request.url.path} code={response.status_code}")
+        response.headers["X-Request-ID"] = job_id
+        response.headers["X-App-Version"] = "bench"
+        return response
+
+    return app
+
+
+def _inject_job_id(app):
+    async def wrapper(scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["job_id"] = "bench"
+        await app(scope, receive, send)
+    return wrapper
+
+
+async def _call(app, body: bytes):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chat",
+        "raw_path": b"/chat",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [ORIGIN_HEADER, (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    status = 0
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_variant(app, total: int, concurrency: int) -> float:
+    """concurrency개 워커가 total건을 나눠 호출한 요청 1건당 평균 µs."""
+    body = b'{"message": "hi"}'
+    per_worker = max(1, total // concurrency)
+
+    async def worker():
+        for _ in range(per_worker):
+            status = await _call(app, body)
+            if status != 200:
+                raise RuntimeError(f"unexpected status {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (time.perf_counter() - started) / (per_worker * concurrency) * 1e6
+
+
+def measure_origin_normalize(calls: int):
+    values = ["https://welcometodeviltown.com", "https://www.welcometodeviltown.com/schedule", "welcometodeviltown.com"]
+    samples = [values[i % len(values)] for i in range(calls)]
+    results = {}
+    for name, fn in (("urlparse", _legacy_normalize_origin), ("lru_cache", normalize_origin)):
+        started = time.perf_counter_ns()
+        for value in samples:
+            fn(value)
+        results[name] = (time.perf_counter_ns() - started) / calls
+    return results
+
+
+async def main_async(args):
+    levels = [int(item) for item in args.concurrency.split(",") if item.strip()]
+    apps = {variant: build_app(variant) for variant in ("none", "legacy", "asgi")}
+    for app in apps.values():
+        await run_variant(app, min(1000, args.requests), 10)  # 워밍업
+
+    logger.info(f"{'concurrency':>11} {'variant':>8} {'us_per_req':>10} {'overhead_us':>11}")
+    for level in levels:
+        base = await run_variant(apps["none"], args.requests, level)
+        logger.info(f"{level:>11} {'none':>8} {base:>10.1f} {0:>11.1f}")
+        for variant in ("legacy", "asgi"):
+            us = await run_variant(apps[variant], args.requests, level)
+            logger.info(f"{level:>11} {variant:>8} {us:>10.1f} {us - base:>11.1f}")
+
+    origin = measure_origin_normalize(args.origin_calls)
+    logger.info(
+        f"normalize_origin ns/call: urlparse={origin['urlparse']:.0f} lru_cache={origin['lru_cache']:.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request middleware overhead (BaseHTTPMiddleware vs pure ASGI)")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", default="1,50,200")
+    parser.add_argument("--origin-calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    app_logger.disabled = True
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
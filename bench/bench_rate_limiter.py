@@ -0,0 +1,112 @@
+"""
+Rate Limiter Benchmark (bench/bench_rate_limiter.py)
+역할: 추적 IP 수(1k ~ 1M)별 hit() 1회 비용을 측정해 키 수와 무관하게 일정한지 확인
+호출 관계: 개발자가 수동 실행 -> backend.rate_limiter.SlidingWindowRateLimiter
+수정 시 주의사항: 측정용 스크립트이며 서버 코드에서 import하지 않습니다.
+  --legacy 옵션은 1.3.0의 고정 윈도우 + 전체 스캔 정리 방식과 비교합니다 (상한 초과 시 매우 느림).
+
+실행 예시:
+    python bench/bench_rate_limiter.py
+    python bench/bench_rate_limiter.py --sizes 1000,100000 --calls 200000 --legacy
+"""
+
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rate_limiter import SlidingWindowRateLimiter  # noqa: E402
+
+logger = logging.getLogger("DevilTown.bench")
+
+WINDOW_SECONDS = 60
+LEGACY_MAX_KEYS = 10000
+
+
+class LegacyFixedWindowLimiter:
+    """1.3.0 enforce_rate_limit 로직 재현 (전역 락 + f-string 키 + O(n) 정리)."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def _cleanup(self, now_ts):
+        if len(self.store) <= self.max_keys:
+            return
+        stale_seconds = WINDOW_SECONDS * 2
+        for key, (window_start, _) in list(self.store.items()):
+            if now_ts - window_start > stale_seconds:
+                self.store.pop(key, None)
+        if len(self.store) > self.max_keys:
+            overflow = len(self.store) - self.max_keys
+            for key in list(self.store.keys())[:overflow]:
+                self.store.pop(key, None)
+
+    def hit(self, scope, client, limit):
+        key = f"{scope}:{client}"
+        now_ts = time.time()
+        with self.lock:
+            self._cleanup(now_ts)
+            window_start, count = self.store.get(key, (now_ts, 0))
+            if now_ts - window_start >= WINDOW_SECONDS:
+                window_start, count = now_ts, 0
+            if count >= limit:
+                return 1
+            self.store[key] = (window_start, count + 1)
+            return 0
+
+    def key_count(self):
+        return len(self.store)
+
+
+def _client_ips(count: int):
+    return [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in range(count)]
+
+
+def measure(limiter, prefill_ips, ips, calls: int) -> float:
+    """prefill_ips로 키를 채운 뒤 ips 중 무작위 IP로 calls회 호출한 1회당 평균 ns."""
+    for ip in prefill_ips:
+        limiter.hit("chat", ip, 1_000_000)
+    sample = [random.choice(ips) for _ in range(calls)]
+    hit = limiter.hit
+    started = time.perf_counter_ns()
+    for ip in sample:
+        hit("chat", ip, 1_000_000)
+    return (time.perf_counter_ns() - started) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter per-call cost vs tracked keys")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--legacy", action="store_true", help="1.3.0 구현과 비교 (상한 초과 구간은 호출 수 축소)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+
+    logger.info(f"{'tracked_keys':>12} {'engine':>10} {'calls':>8} {'ns_per_call':>12} {'keys_after':>10}")
+    for size in sizes:
+        ips = _client_ips(size)
+        limiter = SlidingWindowRateLimiter(WINDOW_SECONDS, max_keys=size * 2, shard_count=args.shards)
+        ns = measure(limiter, ips, ips, args.calls)
+        logger.info(f"{size:>12} {'sliding':>10} {args.calls:>8} {ns:>12.0f} {limiter.key_count():>10}")
+
+        if args.legacy:
+            # 레거시는 상한(10k)을 넘으면 호출마다 전체 스캔을 하므로 상한+1개만 채우고 호출 수를 줄임.
+            over_cap = size > LEGACY_MAX_KEYS
+            legacy_calls = min(args.calls, 2000) if over_cap else args.calls
+            legacy = LegacyFixedWindowLimiter(LEGACY_MAX_KEYS)
+            ns = measure(legacy, ips[:LEGACY_MAX_KEYS + 1], ips, legacy_calls)
+            logger.info(f"{size:>12} {'legacy':>10} {legacy_calls:>8} {ns:>12.0f} {legacy.key_count():>10}")
+
+
+if __name__ == "__main__":
+    main()
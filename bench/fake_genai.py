@@ -0,0 +1,112 @@
+"""
+Fake Gemini SDK (bench/fake_genai.py)
+역할: 부하 테스트용 google.generativeai 대역 - 지연/토큰 스트리밍/오류율을 환경 변수로 조절
+호출 관계: bench/run_server.py -> sys.modules["google.generativeai"] 주입 -> main.py가 실제 SDK 대신 사용
+수정 시 주의사항: main.py/backend.model_registry가 쓰는 API(configure, GenerativeModel, start_chat,
+  send_message(stream=True), generate_content)만 흉내 냅니다. 서버 코드에서 import하지 않습니다.
+
+환경 변수:
+    FAKE_GEMINI_LATENCY_MS      첫 응답까지 지연 (기본 300)
+    FAKE_GEMINI_TOKENS          응답 토큰(청크) 수 (기본 20)
+    FAKE_GEMINI_TOKEN_DELAY_MS  스트리밍 청크 간 지연 (기본 15)
+    FAKE_GEMINI_ERROR_RATE      호출 실패 확률 0.0 ~ 1.0 (기본 0)
+"""
+
+import os
+import random
+import time
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+LATENCY_SECONDS = _env_float("FAKE_GEMINI_LATENCY_MS", 300) / 1000
+TOKENS = max(1, int(_env_float("FAKE_GEMINI_TOKENS", 20)))
+TOKEN_DELAY_SECONDS = _env_float("FAKE_GEMINI_TOKEN_DELAY_MS", 15) / 1000
+ERROR_RATE = min(1.0, max(0.0, _env_float("FAKE_GEMINI_ERROR_RATE", 0.0)))
+
+_DICE_LINES = ["운 좋네 이 새끼", "지옥을 맛봐라", "다리 남아나나 보자", "숨 쉬는 것도 사치다"]
+
+
+class FakeGeminiError(RuntimeError):
+    pass
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _maybe_fail():
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        raise FakeGeminiError("fake upstream error")
+
+
+def _tokens(prefix: str):
+    return [f"{prefix}{i} " for i in range(TOKENS)]
+
+
+class _ChatSession:
+    def __init__(self, history):
+        self.history = list(history or [])
+
+    def send_message(self, message, stream: bool = False, request_options=None):
+        time.sleep(LATENCY_SECONDS)
+        _maybe_fail()
+        tokens = _tokens("tok")
+        if not stream:
+            return _Response("".join(tokens))
+        return self._stream(tokens)
+
+    @staticmethod
+    def _stream(tokens):
+        for token in tokens:
+            yield _Chunk(token)
+            time.sleep(TOKEN_DELAY_SECONDS)
+
+
+class GenerativeModel:
+    def __init__(self, model_name: str = "", generation_config=None, system_instruction=None, **_):
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.system_instruction = system_instruction
+
+    @classmethod
+    def from_cached_content(cls, cached_content, **kwargs):
+        return cls(getattr(cached_content, "model", ""), **kwargs)
+
+    def start_chat(self, history=None):
+        return _ChatSession(history)
+
+    def generate_content(self, prompt, request_options=None):
+        time.sleep(LATENCY_SECONDS)
+        _maybe_fail()
+        if "한 줄에 하나씩" in str(prompt):
+            return _Response("\n".join(random.sample(_DICE_LINES, len(_DICE_LINES)) * 3))
+        return _Response(random.choice(_DICE_LINES))
+
+
+class _CachedContent:
+    def __init__(self, model: str):
+        self.model = model
+
+    @classmethod
+    def create(cls, model: str = "", **_):
+        return cls(model)
+
+
+class caching:  # noqa: N801 - google.generativeai.caching 모듈 자리
+    CachedContent = _CachedContent
+
+
+def configure(api_key: str = None, **_):
+    return None
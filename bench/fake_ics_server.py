@@ -0,0 +1,125 @@
+"""
+Fake iCloud ICS Server (bench/fake_ics_server.py)
+역할: 부하 테스트용 로컬 HTTP 서버 - 이벤트 10 ~ 50k개짜리 합성 ICS를 ETag/304와 함께 제공
+호출 관계: bench/load_test.py -> start_fake_ics_server() (별도 스레드)
+          단독 실행: python bench/fake_ics_server.py --events 5000 --port 8765
+수정 시 주의사항: 같은 이벤트 수에는 항상 같은 ICS 본문(같은 ETag)을 돌려줍니다 (조건부 GET 경로 측정용).
+  URL: http://127.0.0.1:<port>/calendar.ics?events=<N>
+"""
+
+import argparse
+import hashlib
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("DevilTown.bench")
+
+MAX_EVENTS = 50000
+_BASE_TIME = datetime(2026, 1, 1, 6, 0, 0)
+
+
+def build_ics(event_count: int) -> bytes:
+    """시간/종일 일정이 섞인 결정적(deterministic) VCALENDAR 본문."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//DevilTown//Bench//KO", "X-WR-CALNAME:Bench"]
+    for i in range(event_count):
+        start = _BASE_TIME + timedelta(hours=7 * i)
+        lines.append("BEGIN:VEVENT")
+        lines.append(f"UID:bench-{i}@deviltown")
+        if i % 5 == 0:
+            lines.append(f"DTSTART;VALUE=DATE:{start:%Y%m%d}")
+            lines.append(f"DTEND;VALUE=DATE:{start + timedelta(days=1):%Y%m%d}")
+        else:
+            lines.append(f"DTSTART:{start:%Y%m%dT%H%M%S}Z")
+            lines.append(f"DTEND:{start + timedelta(minutes=90):%Y%m%dT%H%M%S}Z")
+        lines.append(f"SUMMARY:Bench run #{i} \\, interval {i % 7}km")
+        lines.append(f"LOCATION:Track {i % 3}")
+        # 75자 접힘(folding) 경로도 타도록 긴 설명은 접어서 기록.
+        lines.append("DESCRIPTION:" + "Long run description " * 3)
+        lines.append(" continued line for unfolding")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+class _IcsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bodies = {}
+
+    def get(self, event_count: int):
+        with self._lock:
+            cached = self._bodies.get(event_count)
+            if cached is None:
+                body = build_ics(event_count)
+                cached = (body, '"' + hashlib.sha256(body).hexdigest()[:16] + '"')
+                self._bodies[event_count] = cached
+            return cached
+
+
+def _make_handler(default_events: int, cache: _IcsCache, stats: dict):
+    class Handler(BaseHTTPRequestHandler):
+        # 실제 iCloud처럼 keep-alive 연결 재사용 (모든 응답에 Content-Length 또는 304).
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            try:
+                count = int(query.get("events", [default_events])[0])
+            except ValueError:
+                count = default_events
+            count = max(0, min(MAX_EVENTS, count))
+            body, etag = cache.get(count)
+            stats["requests"] = stats.get("requests", 0) + 1
+            if self.headers.get("If-None-Match") == etag:
+                stats["not_modified"] = stats.get("not_modified", 0) + 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/calendar; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            return
+
+    return Handler
+
+
+def start_fake_ics_server(port: int = 0, default_events: int = 1000):
+    """
+    Purpose: 백그라운드 스레드에서 ICS 서버 기동.
+    Output: (server, base_url, stats) - server.shutdown()으로 종료
+    """
+    stats = {}
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(default_events, _IcsCache(), stats))
+    thread = threading.Thread(target=server.serve_forever, name="fake-ics", daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/calendar.ics", stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic ICS calendars for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    server, url, _ = start_fake_ics_server(args.port, args.events)
+    logger.info(f"Fake ICS server: {url}?events={args.events}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
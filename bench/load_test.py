@@ -0,0 +1,364 @@
+"""
+Load Test Driver (bench/load_test.py)
+역할: 가짜 Gemini + 가짜 ICS 서버로 main.py를 띄우고, 라우트 혼합 부하를 걸어 p50/p95/p99, RPS, RSS를 측정
+호출 관계: 개발자가 수동 실행 -> bench/fake_ics_server.py (스레드), bench/run_server.py (서브프로세스)
+수정 시 주의사항: 외부 의존성 없이 asyncio 스트림으로 HTTP/1.1 keep-alive 요청을 보냅니다.
+  레이트 리밋은 측정을 방해하지 않도록 매우 큰 값으로 띄웁니다 (리밋 자체 비용은 그대로 측정됨).
+  --compare 결과가 기준선보다 나쁘면 종료 코드 1 (회귀 검출용).
+
+실행 예시:
+    python bench/load_test.py --duration 20 --concurrency 64 --ics-events 5000
+    python bench/load_test.py --duration 20 --concurrency 64 --ics-events 5000 --save-baseline bench/baselines/default.json
+    python bench/load_test.py --duration 20 --concurrency 64 --ics-events 5000 --compare bench/baselines/default.json
+    python bench/load_test.py --mix calendar=6,static=3,dice=1 --output /tmp/calendar_heavy.json
+  기준선 파일은 PC마다 다르므로 커밋하지 않습니다 (만들기/갱신 방법: bench/baselines/README.md).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_ics_server import start_fake_ics_server  # noqa: E402
+
+logger = logging.getLogger("DevilTown.bench")
+
+BENCH_ORIGIN = "http://bench.local"
+DEFAULT_MIX = "chat=1,chat_stream=1,dice=3,calendar=3,calendar_window=2,static=2,static_js=2"
+
+# 라우트 이름 -> (method, path, JSON body | None)
+ROUTES = {
+    "chat": ("POST", "/chat", {"message": "오늘 10km 뛰었는데 어때?", "history": []}),
+    "chat_stream": ("POST", "/chat/stream", {"message": "인터벌 훈련 추천해줘", "history": []}),
+    "dice": ("POST", "/dice-comment", {"distance": "10km"}),
+    "calendar": ("GET", "/calendar/events", None),
+    "calendar_window": ("GET", "/calendar/events?from=2026-03-01&limit=50", None),
+    "static": ("GET", "/", None),
+    "static_js": ("GET", "/js/visuals.js", None),
+}
+
+
+class HttpConnection:
+    """keep-alive를 유지하는 최소 HTTP/1.1 클라이언트 (Content-Length/chunked 지원)."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def _ensure(self):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: dict = None):
+        await self._ensure()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        size = 0
+        if status in (204, 304) or method == "HEAD":
+            pass
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                chunk_size = int((await self._reader.readline()).split(b";")[0], 16)
+                if chunk_size == 0:
+                    await self._reader.readline()
+                    break
+                size += len(await self._reader.readexactly(chunk_size))
+                await self._reader.readline()
+        elif "content-length" in response_headers:
+            size = len(await self._reader.readexactly(int(response_headers["content-length"])))
+        else:
+            size = len(await self._reader.read())
+            await self.close()
+        connection = response_headers.get("connection", "").lower()
+        if connection == "close" or (status_line.startswith(b"HTTP/1.0") and connection != "keep-alive"):
+            await self.close()
+        return status, size, response_headers
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank 방식 (보간 없음)
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(text: str):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if not name:
+            continue
+        if name not in ROUTES:
+            raise SystemExit(f"unknown route in --mix: {name} (choices: {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def read_rss_mb(pid: int):
+    try:
+        import psutil
+
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def wait_until_ready(host: str, port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        conn = HttpConnection(host, port)
+        try:
+            status, _, _ = await conn.request("GET", "/meta/version")
+            if status == 200:
+                return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            await conn.close()
+        await asyncio.sleep(0.3)
+    raise SystemExit("server did not become ready in time")
+
+
+async def run_load(host: str, port: int, mix: dict, concurrency: int, duration: float, warmup: float, pid: int):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    codes = {name: {} for name in names}
+    errors = {name: 0 for name in names}
+    rss_samples = []
+    base_headers = {"Origin": BENCH_ORIGIN, "Accept-Encoding": "gzip, br"}
+
+    async def worker(measure_from: float, stop_at: float):
+        conn = HttpConnection(host, port)
+        try:
+            while time.perf_counter() < stop_at:
+                name = random.choices(names, weights)[0]
+                method, path, payload = ROUTES[name]
+                headers = dict(base_headers)
+                body = b""
+                if payload is not None:
+                    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                    headers["Content-Type"] = "application/json"
+                started = time.perf_counter()
+                try:
+                    status, _, _ = await conn.request(method, path, body, headers)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+                    status = 0
+                    await conn.close()
+                elapsed = time.perf_counter() - started
+                if started < measure_from:
+                    continue
+                samples[name].append(elapsed)
+                codes[name][status] = codes[name].get(status, 0) + 1
+                if status == 0 or status >= 500:
+                    errors[name] += 1
+        finally:
+            await conn.close()
+
+    async def sample_rss(stop_at: float):
+        while time.perf_counter() < stop_at:
+            rss = read_rss_mb(pid)
+            if rss is not None:
+                rss_samples.append(rss)
+            await asyncio.sleep(0.5)
+
+    now = time.perf_counter()
+    measure_from = now + warmup
+    stop_at = measure_from + duration
+    await asyncio.gather(sample_rss(stop_at), *(worker(measure_from, stop_at) for _ in range(concurrency)))
+
+    routes = {}
+    total = 0
+    for name in names:
+        values = sorted(samples[name])
+        total += len(values)
+        routes[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "codes": {str(code): count for code, count in sorted(codes[name].items())},
+            "rps": round(len(values) / duration, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return {
+        "routes": routes,
+        "total_rps": round(total / duration, 2),
+        "rss_peak_mb": round(max(rss_samples), 1) if rss_samples else None,
+        "rss_final_mb": round(rss_samples[-1], 1) if rss_samples else None,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float):
+    """기준선 대비 p95 증가/RPS 감소/오류 증가가 tolerance를 넘으면 실패 사유 목록 반환."""
+    failures = []
+    base_rps = baseline.get("total_rps") or 0
+    if base_rps and result["total_rps"] < base_rps * (1 - tolerance):
+        failures.append(f"total_rps {result['total_rps']} < baseline {base_rps} (-{tolerance:.0%})")
+    for name, base in baseline.get("routes", {}).items():
+        current = result["routes"].get(name)
+        if current is None or not base.get("count"):
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name} p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms (+{tolerance:.0%})")
+        base_error_rate = base["errors"] / base["count"]
+        error_rate = current["errors"] / max(1, current["count"])
+        if error_rate > base_error_rate + 0.01:
+            failures.append(f"{name} error rate {error_rate:.2%} > baseline {base_error_rate:.2%}")
+    return failures
+
+
+def _server_env(args, ics_url: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "ICLOUD_CALENDAR_ICS_URL": f"{ics_url}?events={args.ics_events}",
+            "CORS_ALLOWED_ORIGINS": BENCH_ORIGIN,
+            "CHAT_RATE_LIMIT_PER_WINDOW": "1000000000",
+            "DICE_RATE_LIMIT_PER_WINDOW": "1000000000",
+            "CALENDAR_RATE_LIMIT_PER_WINDOW": "1000000000",
+            "FAKE_GEMINI_LATENCY_MS": str(args.gemini_latency_ms),
+            "FAKE_GEMINI_TOKENS": str(args.gemini_tokens),
+            "FAKE_GEMINI_TOKEN_DELAY_MS": str(args.gemini_token_delay_ms),
+            "FAKE_GEMINI_ERROR_RATE": str(args.gemini_error_rate),
+        }
+    )
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test main.py against local Gemini/iCloud stand-ins")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="측정 구간(초)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="측정 전 워밍업(초)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route=weight 목록 (routes: {', '.join(ROUTES)})")
+    parser.add_argument("--ics-events", type=int, default=1000, help="합성 ICS 이벤트 수 (10 ~ 50000)")
+    parser.add_argument("--gemini-latency-ms", type=float, default=300)
+    parser.add_argument("--gemini-tokens", type=int, default=20)
+    parser.add_argument("--gemini-token-delay-ms", type=float, default=15)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", help="결과를 기준선 JSON으로 저장")
+    parser.add_argument("--compare", help="기준선 JSON과 비교 (회귀 시 종료 코드 1)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 악화 비율 (기본 25%%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    args.ics_events = max(10, min(50000, args.ics_events))
+
+    ics_server, ics_url, ics_stats = start_fake_ics_server()
+    server = subprocess.Popen(
+        [sys.executable, str(BENCH_DIR / "run_server.py"), "--port", str(args.port)],
+        env=_server_env(args, ics_url),
+    )
+    try:
+        asyncio.run(wait_until_ready("127.0.0.1", args.port))
+        logger.info(
+            f"Running load: concurrency={args.concurrency} duration={args.duration}s "
+            f"mix={args.mix} ics_events={args.ics_events} gemini_latency_ms={args.gemini_latency_ms}"
+        )
+        result = asyncio.run(
+            run_load("127.0.0.1", args.port, mix, args.concurrency, args.duration, args.warmup, server.pid)
+        )
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        ics_server.shutdown()
+
+    result["config"] = {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": args.mix,
+        "ics_events": args.ics_events,
+        "gemini_latency_ms": args.gemini_latency_ms,
+        "gemini_tokens": args.gemini_tokens,
+        "gemini_error_rate": args.gemini_error_rate,
+    }
+    result["ics_upstream"] = dict(ics_stats)
+
+    logger.info(f"{'route':>16} {'count':>7} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'errors':>6}  codes")
+    for name, row in result["routes"].items():
+        logger.info(
+            f"{name:>16} {row['count']:>7} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+            f"{row['p99_ms']:>8} {row['errors']:>6}  {row['codes']}"
+        )
+    logger.info(f"total_rps={result['total_rps']} rss_peak_mb={result['rss_peak_mb']} ics_upstream={result['ics_upstream']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+            logger.info(f"Saved results to {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        for key, value in (baseline.get("config") or {}).items():
+            if result["config"].get(key) != value:
+                logger.warning(f"Baseline option differs: {key}={value} (now {result['config'].get(key)})")
+        failures = compare(result, baseline, args.tolerance)
+        if failures:
+            for failure in failures:
+                logger.error(f"REGRESSION {failure}")
+            sys.exit(1)
+        logger.info(f"No regression against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
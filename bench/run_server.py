@@ -0,0 +1,52 @@
+"""
+Bench App Launcher (bench/run_server.py)
+역할: 실제 Gemini SDK 대신 bench/fake_genai.py를 주입한 상태로 main.py 앱을 uvicorn으로 기동
+호출 관계: bench/load_test.py (서브프로세스) -> 이 스크립트 -> main:app
+수정 시 주의사항: 프로젝트 루트를 작업 디렉터리로 사용합니다 (index.html, Logs/ 경로 기준).
+  실제 GOOGLE_API_KEY가 없어도 되도록 가짜 키를 채웁니다. 운영 서버 실행에 사용하지 마세요.
+
+실행 예시:
+    python bench/run_server.py --port 8010
+"""
+
+import argparse
+import os
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def install_fake_genai():
+    import fake_genai
+
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+        sys.modules["google"] = google
+    google.generativeai = fake_genai
+    sys.modules["google.generativeai"] = fake_genai
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run main:app against the fake Gemini backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    os.environ.setdefault("GOOGLE_API_KEY", "bench-fake-key")
+    install_fake_genai()
+
+    import uvicorn
+
+    uvicorn.run("main:app", host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
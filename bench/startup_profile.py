@@ -0,0 +1,152 @@
+"""
+Startup Profile (bench/startup_profile.py)
+역할: `import main` 1회를 `python -X importtime` 하위 프로세스로 실행해 기동 단계별(BOOT_PROFILE) 시간과
+      최상위 패키지별 import 시간을 예산(budget) 대비 표로 출력
+호출 관계: 개발자/배포 전 수동 실행 -> 하위 프로세스에서 main import -> main.startup_timer.phases()
+수정 시 주의사항: 측정용 스크립트이며 서버 코드에서 import하지 않습니다. 서버를 띄우지는 않습니다 (포트 미사용).
+  전체 시간이 --budget-ms를 넘으면 종료 코드 1 (배포 전 회귀 확인용).
+  --with-genai는 지연 로드되는 Gemini SDK import 시간도 따로 잽니다 (첫 AI 요청/워밍업 스레드가 치르는 비용).
+
+실행 예시:
+    python bench/startup_profile.py
+    python bench/startup_profile.py --budget-ms 1500 --import-budget-ms 150 --with-genai
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+logger = logging.getLogger("DevilTown.bench")
+
+CHILD_CODE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+wall_ms = (time.perf_counter() - started) * 1000
+result = {"phases": main.startup_timer.phases(), "phase_total_ms": main.startup_timer.total_ms(), "wall_ms": wall_ms}
+if {with_genai}:
+    if main.GENAI_AVAILABLE:
+        main.genai.load()
+        result["genai_import_ms"] = main.genai.import_ms
+    else:
+        result["genai_import_ms"] = None
+main.log_queue_handler.stop()
+sys.stdout.write("STARTUP_PROFILE " + json.dumps(result) + "\\n")
+"""
+
+
+def parse_importtime(stderr_text: str, parent: str = "main"):
+    """
+    Purpose: -X importtime 출력에서 parent 모듈이 직접 import한 행만 골라 루트 패키지별 누적 시간(ms)으로 합산.
+             (parent 행이 없으면 최상위 행 기준)
+    Output: [(패키지, 누적 ms)] 내림차순
+    """
+    rows = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        name_field = parts[2].rstrip()
+        depth = len(name_field) - len(name_field.lstrip())
+        rows.append((depth, name_field.strip(), cumulative_us))
+
+    if not rows:
+        return []
+    top_depth = min(depth for depth, _, _ in rows)
+    selected = [row for row in rows if row[0] == top_depth]
+    parent_index = next((i for i, row in enumerate(rows) if row[0] == top_depth and row[1] == parent), None)
+    if parent_index is not None:
+        # importtime은 자식을 부모보다 먼저 출력하므로 parent 행 앞쪽으로 거슬러 올라가며 직계 자식만 수집.
+        selected = []
+        for depth, name, cumulative_us in reversed(rows[:parent_index]):
+            if depth <= top_depth:
+                break
+            selected.append((depth, name, cumulative_us))
+        child_depth = min(depth for depth, _, _ in selected) if selected else None
+        selected = [row for row in selected if row[0] == child_depth]
+
+    totals = {}
+    for _, name, cumulative_us in selected:
+        root = name.split(".", 1)[0]
+        totals[root] = totals.get(root, 0) + cumulative_us
+    return sorted(((name, us / 1000) for name, us in totals.items()), key=lambda item: item[1], reverse=True)
+
+
+def run_child(with_genai: bool):
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "startup-profile-fake-key")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE.replace("{with_genai}", str(bool(with_genai)))],
+        cwd=str(ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP_PROFILE "):
+            result = json.loads(line[len("STARTUP_PROFILE "):])
+    if proc.returncode != 0 or result is None:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"import main failed (exit={proc.returncode}):\n{tail}")
+    return result, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase and per-import startup time vs budget")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "2000")))
+    parser.add_argument("--import-budget-ms", type=float, default=200.0, help="패키지 1개 import 허용 시간")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--with-genai", action="store_true", help="지연 로드되는 Gemini SDK import 시간도 측정")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        result, imports = run_child(args.with_genai)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(2)
+
+    logger.info(f"{'phase':<12} {'ms':>9}")
+    for phase, ms in result["phases"]:
+        logger.info(f"{phase:<12} {ms:>9.1f}")
+    logger.info(f"{'(phases)':<12} {result['phase_total_ms']:>9.1f}")
+
+    logger.info("")
+    logger.info(f"{'package':<28} {'import_ms':>9}  budget={args.import_budget_ms:g}ms")
+    for name, ms in imports[: args.top]:
+        flag = "  OVER" if ms > args.import_budget_ms else ""
+        logger.info(f"{name:<28} {ms:>9.1f}{flag}")
+
+    if args.with_genai:
+        genai_ms = result.get("genai_import_ms")
+        logger.info("")
+        if genai_ms is None:
+            logger.info("google.generativeai: not installed")
+        else:
+            logger.info(f"google.generativeai (lazy, off the boot path): {genai_ms} ms")
+
+    wall_ms = result["wall_ms"]
+    verdict = "OK" if wall_ms <= args.budget_ms else "OVER BUDGET"
+    logger.info("")
+    logger.info(f"import main: {wall_ms:.1f} ms / budget {args.budget_ms:g} ms -> {verdict}")
+    if wall_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 /**
  * Devil Coach Chat Integration (devil_coach_chat.js)
  * 역할: AI 코치(Gemini)와의 실시간 채팅 인터페이스 및 메시지 처리 담당
- * 호출 관계: index.html에서 로드되어 Backend(/chat)와 통신함
+ * 호출 관계: index.html에서 로드되어 Backend(/chat/stream, 폴백 /chat)와 통신함
  * 수정 시 주의사항: 대화 히스토리 관리 논리 및 메시지 세척(sanitize) 규칙 준수
  */
 
@@ -13,6 +13,35 @@ const coachChatMessages = document.getElementById('coachChatMessages');
 const coachLoading = document.getElementById('coachLoading');
 
 let chatHistory = [];
+// 서버 측 세션: ''이면 새 세션 요청. 서버가 session_id를 돌려주지 않으면(비활성) 전체 history 전송으로 폴백.
+let chatSessionId = '';
+let chatSessionSupported = true;
+
+function buildChatBody(message) {
+    if (!chatSessionSupported) {
+        return { message: message, history: chatHistory };
+    }
+    // 세션이 있으면 새 메시지만 보낸다. 세션이 없을 때만 지금까지의 대화로 서버 세션을 채운다.
+    return {
+        message: message,
+        session_id: chatSessionId,
+        history: chatSessionId ? [] : chatHistory
+    };
+}
+
+function rememberChatSession(sessionId) {
+    if (sessionId && chatSessionId && sessionId !== chatSessionId) {
+        // 보낸 것과 다른 ID가 오면 서버 세션은 이번 턴만 안다. 다음 요청에 전체 history를 실어 다시 채운다.
+        chatSessionId = '';
+        return;
+    }
+    if (sessionId) {
+        chatSessionId = sessionId;
+    } else {
+        chatSessionSupported = false;
+        chatSessionId = '';
+    }
+}
 
 async function buildApiErrorMessage(response, defaultMessage) {
     const retryAfter = response.headers.get('Retry-After');
@@ -55,8 +84,117 @@ function addCoachMessage(content, isUser = false) {
 
     coachChatMessages.appendChild(messageDiv);
     coachChatMessages.scrollTop = coachChatMessages.scrollHeight;
+    return messageDiv;
+}
+
+// Strip markdown-style formatting patterns (if backend hasn't already)
+function stripCoachMarkdown(text) {
+    return String(text || '').replace(/\*\*/g, '')
+        .replace(/\*/g, '')
+        .replace(/__/g, '')
+        .replace(/_/g, '')
+        .replace(/#/g, '')
+        .replace(/`/g, '');
+}
+
+// SSE 블록(`event: x` + `data: {...}`)을 {event, data}로 파싱
+function parseSseBlock(block) {
+    let event = 'message';
+    const dataLines = [];
+    block.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    });
+    if (dataLines.length === 0) return null;
+    try {
+        return { event, data: JSON.parse(dataLines.join('\n')) };
+    } catch (_) {
+        return null;
+    }
+}
+
+function sendChatRequest(url, message) {
+    return fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(buildChatBody(message))
+    });
 }
 
+async function postChat(url, message) {
+    let response = await sendChatRequest(url, message);
+    if (response.status === 409 && chatSessionId) {
+        // 서버가 세션을 잃었다(만료/축출/재시작). 새 세션을 지금까지의 대화로 채우도록 1회만 재전송.
+        chatSessionId = '';
+        response = await sendChatRequest(url, message);
+    }
+
+    if (!response.ok) {
+        const errorMessage = await buildApiErrorMessage(
+            response,
+            `HTTP error! status: ${response.status}`
+        );
+        throw new Error(errorMessage);
+    }
+    return response;
+}
+
+// 스트리밍 응답을 받는 즉시 말풍선 하나에 이어 붙여 렌더링
+async function streamCoachReply(message) {
+    const response = await postChat('/chat/stream', message);
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let rawText = '';
+    let bubble = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            const frame = parseSseBlock(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+            if (!frame) continue;
+
+            if (frame.event === 'chunk') {
+                rawText += frame.data.text || '';
+                if (!bubble) {
+                    // 첫 청크가 오면 로딩 표시를 내리고 말풍선을 만든다.
+                    coachLoading.style.display = 'none';
+                    bubble = addCoachMessage('', false);
+                }
+                bubble.textContent = stripCoachMarkdown(rawText);
+                coachChatMessages.scrollTop = coachChatMessages.scrollHeight;
+            } else if (frame.event === 'error') {
+                if (bubble) bubble.remove();
+                throw new Error(frame.data.detail || '응답 생성 중 오류');
+            } else if (frame.event === 'done') {
+                rememberChatSession(frame.data.session_id);
+                await reader.cancel();
+                return { text: stripCoachMarkdown(rawText), rendered: Boolean(bubble) };
+            }
+        }
+    }
+    // done 프레임 없이 끊긴 스트림은 불완전한 응답이므로 실패로 처리
+    if (bubble) bubble.remove();
+    throw new Error('응답 스트림이 중간에 끊겼다');
+}
+
+async function fetchCoachReply(message) {
+    const response = await postChat('/chat', message);
+    const data = await response.json();
+    rememberChatSession(data.session_id);
+    return { text: stripCoachMarkdown(data.response), rendered: false };
+}
+
+const supportsStreaming = typeof TextDecoder !== 'undefined'
+    && typeof ReadableStream !== 'undefined'
+    && 'body' in Response.prototype;
+
 // Send message to Backend (FastAPI)
 async function sendCoachMessage() {
     const message = coachInput.value.trim();
@@ -71,40 +209,19 @@ async function sendCoachMessage() {
     coachLoading.style.display = 'block';
 
     try {
-        const response = await fetch('/chat', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                message: message,
-                history: chatHistory
-            })
-        });
-
-        if (!response.ok) {
-            const errorMessage = await buildApiErrorMessage(
-                response,
-                `HTTP error! status: ${response.status}`
-            );
-            throw new Error(errorMessage);
-        }
-
-        const data = await response.json();
-        let cleanResponse = data.response;
-
-        // Strip markdown-style formatting patterns (if backend hasn't already)
-        cleanResponse = cleanResponse.replace(/\*\*/g, '')
-            .replace(/\*/g, '')
-            .replace(/__/g, '')
-            .replace(/_/g, '')
-            .replace(/#/g, '')
-            .replace(/`/g, '');
+        const reply = supportsStreaming
+            ? await streamCoachReply(message)
+            : await fetchCoachReply(message);
+        const cleanResponse = reply.text;
 
         // Update history
         chatHistory.push({ role: 'user', content: message });
         chatHistory.push({ role: 'assistant', content: cleanResponse });
 
-        // Add bot response
-        addCoachMessage(cleanResponse, false);
+        // Add bot response (스트리밍이면 이미 렌더링됨)
+        if (!reply.rendered) {
+            addCoachMessage(cleanResponse, false);
+        }
 
     } catch (error) {
         console.error('Chat error:', error);
@@ -594,6 +594,56 @@ function renderScheduleFeed() {
   setFeedEmpty("schedule", false);
 }
 
+// 일정은 version 단위로 localStorage에 보관하고, 재방문 시 `since`로 바뀐 이벤트만 받아 병합합니다.
+const SCHEDULE_STORE_KEY = "deviltown.schedule.v1";
+
+function readScheduleStore() {
+  try {
+    const stored = JSON.parse(localStorage.getItem(SCHEDULE_STORE_KEY) || "null");
+    if (stored && Number.isInteger(stored.version) && stored.events && typeof stored.events === "object") {
+      return stored;
+    }
+  } catch (err) {
+    // 저장소 비활성(사생활 보호 모드)이거나 값이 깨졌으면 전체 목록부터 다시 받는다.
+  }
+  return null;
+}
+
+function writeScheduleStore(store) {
+  try {
+    localStorage.setItem(SCHEDULE_STORE_KEY, JSON.stringify(store));
+  } catch (err) {
+    // 용량 초과 등은 무시 (다음 방문에서 전체 재동기화).
+  }
+}
+
+async function fetchScheduleStore(stored) {
+  // display_date: 받은 반복 회차의 표시 기준일. 날짜가 바뀌면 서버가 구간 끝에서 빠지고 들어온 회차만 보내 준다.
+  const query = stored
+    ? `since=${stored.version}${stored.date ? `&since_date=${stored.date}` : ""}`
+    : "since=0";
+  const res = await fetch(`/calendar/events?${query}`, { headers: { Accept: "application/json" } });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const payload = await res.json();
+
+  let events;
+  if (payload.full || !stored) {
+    events = {};
+    (Array.isArray(payload.events) ? payload.events : []).forEach(ev => { events[ev.key] = ev; });
+  } else {
+    events = { ...stored.events };
+    // 내용이 바뀐 반복 일정은 회차 전체(`소스:uid`, `소스:uid#...`)를 지우고 다시 받은 회차로 채운다.
+    (payload.removed_series || []).forEach(prefix => {
+      Object.keys(events).forEach(key => {
+        if (key === prefix || key.startsWith(`${prefix}#`)) delete events[key];
+      });
+    });
+    (payload.removed || []).forEach(key => { delete events[key]; });
+    [...(payload.added || []), ...(payload.changed || [])].forEach(ev => { events[ev.key] = ev; });
+  }
+  return { version: payload.version, date: payload.display_date || null, count: payload.count, events };
+}
+
 async function loadScheduleEvents() {
   // 중복 요청 방지: 이미 로드했거나 로딩 중이면 즉시 반환
   if (FEED_STATE.schedule.loaded || FEED_STATE.schedule.loading) return;
@@ -602,12 +652,15 @@ async function loadScheduleEvents() {
   renderScheduleFeed();
 
   try {
-    const res = await fetch("/calendar/events", { headers: { Accept: "application/json" } });
-    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-    const payload = await res.json();
-    const events = Array.isArray(payload.events) ? payload.events : [];
+    let store = await fetchScheduleStore(readScheduleStore());
+    if (Object.keys(store.events).length !== store.count) {
+      // 병합 결과가 서버 전체 개수와 다르면 로컬 사본을 버리고 한 번만 전체 재동기화.
+      store = await fetchScheduleStore(null);
+    }
+    writeScheduleStore({ version: store.version, date: store.date, events: store.events });
 
-    FEED_DATA.schedule = events
+    // 지난 일정은 renderScheduleFeed가 걸러내므로 여기서는 전체를 시간순으로만 정리한다.
+    FEED_DATA.schedule = Object.values(store.events)
       .map((ev, idx) => mapScheduleEvent(ev, idx))
       .filter(Boolean)
       .sort((a, b) => a.start - b.start);
@@ -1,24 +1,57 @@
+from backend.startup import LazyModule, StartupTimer
+
+# 기동 단계별 소요 시간 (BOOT_PROFILE 로그 / bench/startup_profile.py). 다른 import보다 먼저 시작.
+startup_timer = StartupTimer()
+
 import os
+import asyncio
 import uvicorn
 import logging
 import time
 import uuid
-import threading
-from datetime import datetime, timezone
+import json
+from datetime import date, datetime, timezone
 from logging.handlers import RotatingFileHandler
-from urllib.parse import urlparse
-from urllib.request import Request as URLRequest, urlopen
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Optional
 from dotenv import load_dotenv
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from backend.llm_executor import LLMBusyError, LLMExecutor, LLMTimeoutError
+from backend.metrics import EventLoopLagMonitor, MetricsRegistry
+from backend.log_pipeline import BatchingQueueHandler, JsonLinesFormatter, ReceiveSampler, StructuredFormatter
+from backend.calendar_cache import (
+    CalendarCache,
+    CalendarUnavailableError,
+    FetchResult,
+    SourceState,
+    snapshot_from_events,
+)
+from backend.calendar_sources import CalendarSourceFetcher, merge_source_events, parse_calendar_sources
+from backend.chat_response_cache import ChatResponseCache
+from backend.chat_sessions import ChatSessionStore, trim_to_budget
+from backend.admission import LOW, NORMAL, SKIP_SAMPLE_STATE_KEY, AdaptiveConcurrencyLimit, AdmissionController
+from backend.profiling import LoopWatchdog, ProfileStore, ProfilingControl, sample_process, stats_text
+from backend.calendar_delta import CalendarVersions
+from backend.calendar_index import CalendarIndex, InvalidCalendarQueryError, parse_query_time
+from backend.ics_parser import parse_ics_events
+from backend.recurrence import RecurrenceExpander
+from backend.dice_comment_pool import DiceCommentPool
+from backend.model_registry import ModelRegistry, SystemPromptCache
+from backend.precompressed import etag_matches
+from backend.rate_limiter import SlidingWindowRateLimiter
+from backend.request_middleware import RequestContextMiddleware, client_ip_from_scope, normalize_origin
+from backend.static_assets import StaticAssetStore
+from backend.upstream_guard import CircuitBreaker, CircuitOpenError, UpstreamGuard
+from backend.shared_state import SharedCalendarCoordinator, SharedRateLimiter, SharedStateStore
+
+# Gemini SDK(protobuf/grpc 포함)는 import만 수 초가 걸리므로 첫 AI 호출(워커 스레드) 또는 기동 후 워밍업 스레드에서 로드합니다.
+genai = LazyModule("google.generativeai")
+GENAI_AVAILABLE = genai.available
+startup_timer.mark("imports")
 
 # Load .env before logger/config initialization so env-driven settings are applied at boot.
 load_dotenv()
@@ -47,21 +80,26 @@ LOG_DIR = os.path.join(os.getcwd(), "Logs")
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
-LOG_FILE = os.path.join(LOG_DIR, "server.log")
+# RotatingFileHandler는 프로세스 간 안전하지 않으므로(워커마다 따로 롤오버), 멀티 워커에서는 워커(PID)별 파일에 기록합니다.
+# tools/log_report.py는 server.log와 server.<pid>.log(+ 각각의 .N 백업)를 함께 읽습니다.
+LOG_FILE = os.path.join(
+    LOG_DIR, "server.log" if _env_int_early("SERVER_WORKERS", 1) == 1 else f"server.{os.getpid()}.log"
+)
 LOG_MAX_BYTES = _env_int_early("LOG_MAX_BYTES", 5 * 1024 * 1024, minimum=1024)
 LOG_BACKUP_COUNT = _env_int_early("LOG_BACKUP_COUNT", 10, minimum=1)
 
+LOG_QUEUE_MAX_SIZE = _env_int_early("LOG_QUEUE_MAX_SIZE", 10000, minimum=100)
+LOG_BATCH_SIZE = _env_int_early("LOG_BATCH_SIZE", 256, minimum=1)
+LOG_FLUSH_INTERVAL_MS = _env_int_early("LOG_FLUSH_INTERVAL_MS", 200, minimum=10)
+LOG_JSON_ENABLED = os.getenv("LOG_JSON_ENABLED", "0").strip().lower() in ("1", "true", "yes", "on")
+try:
+    LOG_RECEIVE_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("LOG_RECEIVE_SAMPLE_RATE", "1.0"))))
+except ValueError:
+    LOG_RECEIVE_SAMPLE_RATE = 1.0
+
 # Global Rules 기반 로그 포맷 표준화 (job_id, step, status 등 포함)
 LOG_FORMAT = '[%(levelname)s] job_id=%(job_id)s step=%(step)s %(message)s status=%(status)s duration_ms=%(duration_ms)s'
 
-class CustomFormatter(logging.Formatter):
-    def format(self, record):
-        if not hasattr(record, 'job_id'): record.job_id = "SYSTEM"
-        if not hasattr(record, 'step'): record.step = "CORE"
-        if not hasattr(record, 'status'): record.status = "SUCCESS"
-        if not hasattr(record, 'duration_ms'): record.duration_ms = 0
-        return super().format(record)
-
 # 로그 파일이 무한히 커지는 것을 방지하기 위해 용량 기준으로 롤링합니다.
 handler = RotatingFileHandler(
     LOG_FILE,
@@ -69,14 +107,24 @@ handler = RotatingFileHandler(
     backupCount=LOG_BACKUP_COUNT,
     encoding='utf-8'
 )
-handler.setFormatter(CustomFormatter(LOG_FORMAT))
+# 파일 로그는 선택적으로 JSON Lines(ts 포함)로 남겨 분석 도구가 바로 읽을 수 있게 합니다. 콘솔은 항상 텍스트.
+handler.setFormatter(JsonLinesFormatter() if LOG_JSON_ENABLED else StructuredFormatter(LOG_FORMAT))
 console = logging.StreamHandler()
-console.setFormatter(CustomFormatter(LOG_FORMAT))
+console.setFormatter(StructuredFormatter(LOG_FORMAT))
 
-logging.basicConfig(level=logging.INFO, handlers=[handler, console])
+# 요청 경로(이벤트 루프)에서는 큐 적재만 하고, 디스크/콘솔 기록과 롤오버는 writer 스레드가 묶어서 처리합니다.
+log_queue_handler = BatchingQueueHandler(
+    [handler, console],
+    max_queue=LOG_QUEUE_MAX_SIZE,
+    batch_size=LOG_BATCH_SIZE,
+    flush_interval_seconds=LOG_FLUSH_INTERVAL_MS / 1000,
+).start()
+
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
 logger = logging.getLogger("DevilTown")
 
 logger.info("Initializing Devil Town Backend...", extra={"step": "INIT", "status": "START"})
+startup_timer.mark("logging")
 
 app = FastAPI()
 
@@ -115,28 +163,12 @@ def _env_csv(name: str, default: str):
     return [item.strip() for item in raw.split(",") if item.strip()]
 
 
-def _normalize_origin(origin_like: str) -> str:
-    raw = (origin_like or "").strip()
-    if not raw:
-        return ""
-
-    parsed = urlparse(raw)
-    if not parsed.scheme or not parsed.netloc:
-        # 운영 중 오타로 스킴 없이 넣는 경우를 보정.
-        parsed = urlparse(f"https://{raw}")
-
-    if not parsed.scheme or not parsed.netloc:
-        return ""
-
-    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
-
-
 # 프로덕션 기본값은 공식 도메인 2개만 허용. (로컬 테스트는 .env에서 추가)
 CORS_ALLOWED_ORIGINS_RAW = _env_csv(
     "CORS_ALLOWED_ORIGINS",
     "https://welcometodeviltown.com,https://www.welcometodeviltown.com",
 )
-_normalized_origins = [_normalize_origin(item) for item in CORS_ALLOWED_ORIGINS_RAW]
+_normalized_origins = [normalize_origin(item) for item in CORS_ALLOWED_ORIGINS_RAW]
 CORS_ALLOWED_ORIGINS = list(dict.fromkeys([item for item in _normalized_origins if item]))
 if not CORS_ALLOWED_ORIGINS:
     CORS_ALLOWED_ORIGINS = [
@@ -144,7 +176,7 @@ if not CORS_ALLOWED_ORIGINS:
         "https://www.welcometodeviltown.com",
     ]
 ALLOWED_ORIGIN_SET = set(CORS_ALLOWED_ORIGINS)
-API_ORIGIN_RESTRICTED_PATHS = {"/chat", "/dice-comment", "/calendar/events"}
+API_ORIGIN_RESTRICTED_PATHS = {"/chat", "/chat/stream", "/dice-comment", "/calendar/events", "/metrics"}
 APP_VERSION = _load_app_version()
 
 logger.info(
@@ -161,43 +193,12 @@ app.add_middleware(
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
 )
+startup_timer.mark("config")
 
 
-def _is_allowed_site_request(request: Request) -> bool:
-    """
-    브라우저 기반 API 호출은 Origin/Referer를 검사해서
-    허용된 사이트에서 들어온 요청만 통과시킨다.
-    """
-    origin = _normalize_origin(request.headers.get("origin", ""))
-    if origin:
-        return origin in ALLOWED_ORIGIN_SET
-
-    referer = _normalize_origin(request.headers.get("referer", ""))
-    if referer:
-        return referer in ALLOWED_ORIGIN_SET
-
-    # Origin/Referer가 모두 없는 요청은 서버 간 직접 호출로 보고 차단.
-    return False
-
-
-@app.middleware("http")
-async def enforce_api_origin(request: Request, call_next):
-    if request.method != "OPTIONS" and request.url.path in API_ORIGIN_RESTRICTED_PATHS:
-        if not _is_allowed_site_request(request):
-            job_id = getattr(request.state, "job_id", "SYSTEM")
-            logger.warning(
-                f"Blocked API request by origin guard path={request.url.path}",
-                extra={"job_id": job_id, "step": "ORIGIN_GUARD", "status": "FAIL", "duration_ms": 0},
-            )
-            return JSONResponse(
-                status_code=403,
-                content={"detail": "Forbidden origin. This API is only available from the official site."},
-            )
-    return await call_next(request)
-
 # Configure Gemini API
 API_KEY = os.getenv("GOOGLE_API_KEY")
-if genai is None:
+if not GENAI_AVAILABLE:
     logger.warning("google-generativeai package is not installed. AI endpoints will run in fallback mode.",
                    extra={"step": "GEMINI_CONFIG", "status": "WARN"})
 elif not API_KEY:
@@ -232,49 +233,254 @@ def _env_int(name: str, default: int, minimum: int = 1) -> int:
     return parsed
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
 RATE_LIMIT_WINDOW_SECONDS = _env_int("RATE_LIMIT_WINDOW_SECONDS", 60)
 CHAT_RATE_LIMIT_PER_WINDOW = _env_int("CHAT_RATE_LIMIT_PER_WINDOW", 60)
 DICE_RATE_LIMIT_PER_WINDOW = _env_int("DICE_RATE_LIMIT_PER_WINDOW", 120)
 CALENDAR_RATE_LIMIT_PER_WINDOW = _env_int("CALENDAR_RATE_LIMIT_PER_WINDOW", 30)
 RATE_LIMIT_TRACKER_MAX_KEYS = _env_int("RATE_LIMIT_TRACKER_MAX_KEYS", 10000)
+RATE_LIMIT_SYNC_INTERVAL_MS = _env_int("RATE_LIMIT_SYNC_INTERVAL_MS", 500, minimum=50)
 MAX_CHAT_MESSAGE_LENGTH = _env_int("MAX_CHAT_MESSAGE_LENGTH", 500)
 MAX_CHAT_HISTORY_ITEMS = _env_int("MAX_CHAT_HISTORY_ITEMS", 24)
+CHAT_HISTORY_TOKEN_BUDGET = _env_int("CHAT_HISTORY_TOKEN_BUDGET", 1500, minimum=100)
+CHAT_SESSION_MAX = _env_int("CHAT_SESSION_MAX", 2000)
+CHAT_SESSION_TTL_SECONDS = _env_int("CHAT_SESSION_TTL_SECONDS", 1800, minimum=60)
+CHAT_SUMMARY_MAX_TOKENS = _env_int("CHAT_SUMMARY_MAX_TOKENS", 300, minimum=0)
+CHAT_RESPONSE_CACHE_ENABLED = _env_flag("CHAT_RESPONSE_CACHE_ENABLED", True)
+CHAT_RESPONSE_CACHE_MAX_ENTRIES = _env_int("CHAT_RESPONSE_CACHE_MAX_ENTRIES", 1000)
+CHAT_RESPONSE_CACHE_MAX_BYTES = _env_int("CHAT_RESPONSE_CACHE_MAX_BYTES", 4 * 1024 * 1024, minimum=4096)
+CHAT_RESPONSE_CACHE_TTL_SECONDS = _env_int("CHAT_RESPONSE_CACHE_TTL_SECONDS", 600)
+CHAT_RESPONSE_CACHE_VARIANTS = _env_int("CHAT_RESPONSE_CACHE_VARIANTS", 3)
 CALENDAR_CACHE_TTL_SECONDS = _env_int("CALENDAR_CACHE_TTL_SECONDS", 120)
+CALENDAR_FAILURE_RETRY_SECONDS = _env_int("CALENDAR_FAILURE_RETRY_SECONDS", 30)
+CALENDAR_FETCH_TIMEOUT_SECONDS = _env_int("CALENDAR_FETCH_TIMEOUT_SECONDS", 12)
+CALENDAR_FETCH_MAX_CONNECTIONS = _env_int("CALENDAR_FETCH_MAX_CONNECTIONS", 8)
+CALENDAR_QUERY_MAX_LIMIT = _env_int("CALENDAR_QUERY_MAX_LIMIT", 500)
+CALENDAR_RECURRENCE_HORIZON_DAYS = _env_int("CALENDAR_RECURRENCE_HORIZON_DAYS", 180)
+CALENDAR_RECURRENCE_PAST_DAYS = _env_int("CALENDAR_RECURRENCE_PAST_DAYS", 30, minimum=0)
+CALENDAR_RECURRENCE_MAX_SPAN_DAYS = _env_int("CALENDAR_RECURRENCE_MAX_SPAN_DAYS", 731)
+CALENDAR_RECURRENCE_MAX_INSTANCES = _env_int("CALENDAR_RECURRENCE_MAX_INSTANCES", 500)
+CALENDAR_DELTA_HISTORY_VERSIONS = _env_int("CALENDAR_DELTA_HISTORY_VERSIONS", 32, minimum=0)
+LLM_MAX_CONCURRENCY = _env_int("LLM_MAX_CONCURRENCY", 4)
+LLM_MAX_QUEUE = _env_int("LLM_MAX_QUEUE", 16, minimum=0)
+LLM_BUSY_RETRY_AFTER_SECONDS = _env_int("LLM_BUSY_RETRY_AFTER_SECONDS", 5)
+CHAT_LLM_TIMEOUT_SECONDS = _env_int("CHAT_LLM_TIMEOUT_SECONDS", 30)
+DICE_LLM_TIMEOUT_SECONDS = _env_int("DICE_LLM_TIMEOUT_SECONDS", 10)
+SYSTEM_PROMPT_RELOAD_CHECK_SECONDS = _env_int("SYSTEM_PROMPT_RELOAD_CHECK_SECONDS", 5, minimum=0)
+GEMINI_CONTEXT_CACHE_ENABLED = _env_flag("GEMINI_CONTEXT_CACHE_ENABLED", False)
+GEMINI_CONTEXT_CACHE_MODEL = os.getenv("GEMINI_CONTEXT_CACHE_MODEL", "models/gemini-2.0-flash-001").strip()
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = _env_int("GEMINI_CONTEXT_CACHE_TTL_SECONDS", 3600, minimum=300)
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+DICE_POOL_ENABLED = _env_flag("DICE_POOL_ENABLED", True)
+DICE_POOL_LOW_WATERMARK = _env_int("DICE_POOL_LOW_WATERMARK", 3, minimum=0)
+DICE_POOL_HIGH_WATERMARK = _env_int("DICE_POOL_HIGH_WATERMARK", 12, minimum=2)
+DICE_POOL_REFILL_INTERVAL_SECONDS = _env_int("DICE_POOL_REFILL_INTERVAL_SECONDS", 30)
+DICE_POOL_BATCH_TIMEOUT_SECONDS = _env_int("DICE_POOL_BATCH_TIMEOUT_SECONDS", 30)
+GEMINI_WARMUP_ENABLED = _env_flag("GEMINI_WARMUP_ENABLED", True)
+GEMINI_BREAKER_ENABLED = _env_flag("GEMINI_BREAKER_ENABLED", True)
+GEMINI_BREAKER_WINDOW_SECONDS = _env_int("GEMINI_BREAKER_WINDOW_SECONDS", 30)
+GEMINI_BREAKER_MIN_CALLS = _env_int("GEMINI_BREAKER_MIN_CALLS", 8)
+GEMINI_BREAKER_ERROR_RATE_PERCENT = _env_int("GEMINI_BREAKER_ERROR_RATE_PERCENT", 50)
+GEMINI_BREAKER_SLOW_CALL_SECONDS = _env_int("GEMINI_BREAKER_SLOW_CALL_SECONDS", 12)
+GEMINI_BREAKER_SLOW_RATE_PERCENT = _env_int("GEMINI_BREAKER_SLOW_RATE_PERCENT", 80)
+GEMINI_BREAKER_OPEN_SECONDS = _env_int("GEMINI_BREAKER_OPEN_SECONDS", 20)
+DICE_HEDGE_ENABLED = _env_flag("DICE_HEDGE_ENABLED", True)
+DICE_HEDGE_MIN_DELAY_MS = _env_int("DICE_HEDGE_MIN_DELAY_MS", 300, minimum=0)
+ADMISSION_ENABLED = _env_flag("ADMISSION_ENABLED", True)
+ADMISSION_INITIAL_LIMIT = _env_int("ADMISSION_INITIAL_LIMIT", 32)
+ADMISSION_MIN_LIMIT = _env_int("ADMISSION_MIN_LIMIT", 4)
+ADMISSION_MAX_LIMIT = _env_int("ADMISSION_MAX_LIMIT", 256)
+ADMISSION_LATENCY_TOLERANCE_PERCENT = _env_int("ADMISSION_LATENCY_TOLERANCE_PERCENT", 200, minimum=110)
+ADMISSION_LOW_PRIORITY_SHARE_PERCENT = _env_int("ADMISSION_LOW_PRIORITY_SHARE_PERCENT", 50)
+ADMISSION_PER_CLIENT_MAX_INFLIGHT = _env_int("ADMISSION_PER_CLIENT_MAX_INFLIGHT", 4, minimum=0)
+ADMISSION_RETRY_AFTER_SECONDS = _env_int("ADMISSION_RETRY_AFTER_SECONDS", 2)
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "").strip()
+PROFILE_DIR = os.getenv("PROFILE_DIR", "").strip() or os.path.join(LOG_DIR, "profiles")
+PROFILE_MAX_FILES = _env_int("PROFILE_MAX_FILES", 50)
+LOOP_WATCHDOG_THRESHOLD_MS = _env_int("LOOP_WATCHDOG_THRESHOLD_MS", 0, minimum=0)
+
+# Gemini SDK는 동기 호출이므로 이벤트 루프를 막지 않도록 제한된 워커 풀에서 실행합니다.
+llm_executor = LLMExecutor(max_concurrency=LLM_MAX_CONCURRENCY, max_queue=LLM_MAX_QUEUE)
+
+# 인사말/단골 질문처럼 히스토리까지 같은 요청은 Gemini 왕복 없이 응답합니다 (키당 여러 변형을 돌려 씀).
+chat_response_cache = None
+if CHAT_RESPONSE_CACHE_ENABLED:
+    chat_response_cache = ChatResponseCache(
+        max_entries=CHAT_RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=CHAT_RESPONSE_CACHE_MAX_BYTES,
+        ttl_seconds=CHAT_RESPONSE_CACHE_TTL_SECONDS,
+        variants=CHAT_RESPONSE_CACHE_VARIANTS,
+    )
 
-_rate_limit_store = {}
-_rate_limit_lock = threading.Lock()
+# 요청마다 디스크에서 프롬프트를 읽고 모델을 새로 만들지 않도록 프로세스 단위로 재사용합니다.
+system_prompt_cache = SystemPromptCache(
+    "system_prompt.md",
+    fallback="You are a helpful assistant.",
+    check_interval_seconds=SYSTEM_PROMPT_RELOAD_CHECK_SECONDS,
+)
+model_registry = None
+if GENAI_AVAILABLE and API_KEY:
+    model_registry = ModelRegistry(
+        genai,
+        API_KEY,
+        context_cache_enabled=GEMINI_CONTEXT_CACHE_ENABLED,
+        context_cache_model=GEMINI_CONTEXT_CACHE_MODEL,
+        context_cache_ttl_seconds=GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+    )
 
-_calendar_cache = {"payload": None, "expires_at": 0.0}
-_calendar_cache_lock = threading.Lock()
+RATE_LIMIT_SHARDS = _env_int("RATE_LIMIT_SHARDS", 16)
+SERVER_WORKERS = _env_int("SERVER_WORKERS", 1)
+# 워커가 2개 이상이면 프로세스별 메모리 상태로는 제한/캐시가 워커 수만큼 느슨해지므로 자동 활성화.
+SHARED_STATE_ENABLED = _env_flag("SHARED_STATE_ENABLED", SERVER_WORKERS > 1)
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "").strip() or os.path.join(
+    os.getcwd(), "state", "shared_state.sqlite3"
+)
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+# 대화 세션은 워커 프로세스 메모리에 있으므로 멀티 워커에서는 기본 비활성 (다른 워커로 가면 새 세션이 됨).
+CHAT_SESSIONS_ENABLED = _env_flag("CHAT_SESSIONS_ENABLED", SERVER_WORKERS == 1)
+chat_sessions = ChatSessionStore(
+    max_sessions=CHAT_SESSION_MAX,
+    ttl_seconds=CHAT_SESSION_TTL_SECONDS,
+    token_budget=CHAT_HISTORY_TOKEN_BUDGET,
+    summary_max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+)
 
+shared_state_store = None
+if SHARED_STATE_ENABLED:
+    try:
+        shared_state_store = SharedStateStore(SHARED_STATE_PATH)
+        logger.info(
+            f"Shared state enabled path={SHARED_STATE_PATH} worker_id={WORKER_ID}",
+            extra={"step": "SHARED_STATE", "status": "SUCCESS"},
+        )
+    except Exception as e:
+        logger.error(
+            f"Shared state unavailable, falling back to per-process state: {e}",
+            extra={"step": "SHARED_STATE", "status": "FAIL"},
+        )
 
-def _extract_client_ip(request: Request) -> str:
-    for header in ("cf-connecting-ip", "x-real-ip", "x-forwarded-for"):
-        raw = request.headers.get(header, "").strip()
-        if not raw:
-            continue
-        if header == "x-forwarded-for":
-            raw = raw.split(",")[0].strip()
-        if raw:
-            return raw
-    if request.client and request.client.host:
-        return request.client.host
-    return "unknown"
+if shared_state_store is not None:
+    # 요청 경로는 워커 메모리 카운터만 보고, 모든 워커의 합계는 백그라운드 sync가 SQLite(WAL)로 맞춥니다.
+    rate_limiter = SharedRateLimiter(
+        shared_state_store,
+        window_seconds=RATE_LIMIT_WINDOW_SECONDS,
+        max_keys=RATE_LIMIT_TRACKER_MAX_KEYS,
+    )
+else:
+    # 슬라이딩 윈도우 + 샤드별 락 + 타이밍 휠 만료로 키 수와 무관하게 호출 비용을 일정하게 유지합니다.
+    rate_limiter = SlidingWindowRateLimiter(
+        window_seconds=RATE_LIMIT_WINDOW_SECONDS,
+        max_keys=RATE_LIMIT_TRACKER_MAX_KEYS,
+        shard_count=RATE_LIMIT_SHARDS,
+    )
 
+# 요청/업스트림/캐시 지표. 기록은 스레드별 샤드에 락 없이 쌓고 /metrics 조회 시에만 합산합니다.
+metrics = MetricsRegistry()
+metrics.histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("route", "method"))
+metrics.counter("http_requests_total", "HTTP responses by route template and status code.", ("route", "method", "code"))
+metrics.histogram("upstream_duration_seconds", "Upstream call latency (Gemini, iCloud).", ("upstream", "operation"))
+metrics.counter("upstream_errors_total", "Upstream calls that raised.", ("upstream", "operation"))
+metrics.counter("llm_rejections_total", "LLM calls rejected before or during execution.", ("endpoint", "reason"))
+metrics.counter("upstream_hedges_total", "Hedged (duplicate) upstream calls fired and won.", ("operation", "outcome"))
+metrics.gauge(
+    "upstream_circuit_state",
+    "Gemini circuit breaker state (0=closed, 1=half_open, 2=open).",
+    callback=lambda: upstream_guard.circuit_state_value(),
+)
+metrics.gauge("llm_pending", "LLM calls running or queued.", callback=lambda: llm_executor.pending)
+metrics.counter("rate_limit_rejections_total", "Requests rejected by the rate limiter.", ("scope",))
+metrics.counter("admission_rejections_total", "Requests shed by admission control.", ("priority", "reason"))
+metrics.gauge(
+    "admission_limit",
+    "Adaptive concurrency limit for normal/low priority routes (0 if disabled).",
+    callback=lambda: int(admission_controller.limit.limit) if admission_controller else 0,
+)
+metrics.gauge(
+    "admission_inflight",
+    "Admitted normal/low priority requests in flight.",
+    callback=lambda: admission_controller.inflight if admission_controller else 0,
+)
+metrics.gauge(
+    "admission_latency_ratio",
+    "Smoothed latency divided by per-route baseline latency.",
+    callback=lambda: round(admission_controller.limit.latency_ratio, 3) if admission_controller else 0,
+)
+metrics.gauge("rate_limit_tracked_keys", "Keys currently tracked by the rate limiter.", callback=lambda: rate_limiter.key_count())
+metrics.counter("calendar_cache_requests_total", "Calendar cache lookups by result.", ("state",))
+metrics.counter("calendar_delta_requests_total", "Calendar since= lookups by result.", ("result",))
+metrics.counter("calendar_source_fetches_total", "Per-source ICS fetches by outcome.", ("source", "outcome"))
+metrics.gauge("calendar_cache_age_seconds", "Age of the served calendar snapshot (-1 if none).", callback=lambda: calendar_cache.age_seconds())
+metrics.gauge("event_loop_lag_seconds", "Most recent event loop scheduling lag.")
+metrics.histogram("event_loop_lag_histogram_seconds", "Event loop scheduling lag samples.")
+metrics.gauge("chat_sessions_active", "Server-side chat sessions held in memory.", callback=lambda: len(chat_sessions))
+metrics.counter("chat_response_cache_requests_total", "Chat response cache lookups by result.", ("result",))
+metrics.gauge("chat_response_cache_entries", "Chat response cache keys held.", callback=lambda: len(chat_response_cache) if chat_response_cache is not None else 0)
+metrics.gauge(
+    "chat_response_cache_bytes",
+    "Approximate memory held by the chat response cache.",
+    callback=lambda: chat_response_cache.bytes_used if chat_response_cache is not None else 0,
+)
+metrics.gauge("log_dropped_records", "Log records dropped because the log queue was full.", callback=lambda: log_queue_handler.dropped)
+event_loop_lag_monitor = EventLoopLagMonitor(metrics, "event_loop_lag_seconds", "event_loop_lag_histogram_seconds")
+
+# Gemini 장애 시 요청마다 타임아웃까지 기다리지 않도록 브레이커로 즉시 차단하고, 회복되면 half-open 탐침으로 복귀합니다.
+gemini_breaker = None
+if GEMINI_BREAKER_ENABLED:
+    gemini_breaker = CircuitBreaker(
+        "gemini",
+        window_seconds=GEMINI_BREAKER_WINDOW_SECONDS,
+        min_calls=GEMINI_BREAKER_MIN_CALLS,
+        error_rate_threshold=GEMINI_BREAKER_ERROR_RATE_PERCENT / 100,
+        slow_call_seconds=GEMINI_BREAKER_SLOW_CALL_SECONDS,
+        slow_rate_threshold=GEMINI_BREAKER_SLOW_RATE_PERCENT / 100,
+        open_seconds=GEMINI_BREAKER_OPEN_SECONDS,
+    )
+upstream_guard = UpstreamGuard(
+    llm_executor,
+    breaker=gemini_breaker,
+    registry=metrics,
+    hedge_min_delay_seconds=DICE_HEDGE_MIN_DELAY_MS / 1000,
+)
 
-def _cleanup_rate_limit_store(now_ts: float):
-    if len(_rate_limit_store) <= RATE_LIMIT_TRACKER_MAX_KEYS:
-        return
+# 폭주 시 비싼 /chat부터 먼저 거절하고, 정적 페이지/메타(HIGH)는 한도와 무관하게 항상 통과합니다.
+ADMISSION_ROUTE_PRIORITIES = {
+    "/chat": LOW,
+    "/chat/stream": LOW,
+    "/dice-comment": NORMAL,
+    "/calendar/events": NORMAL,
+}
+admission_controller = None
+if ADMISSION_ENABLED:
+    admission_controller = AdmissionController(
+        ADMISSION_ROUTE_PRIORITIES,
+        AdaptiveConcurrencyLimit(
+            initial=ADMISSION_INITIAL_LIMIT,
+            min_limit=ADMISSION_MIN_LIMIT,
+            max_limit=ADMISSION_MAX_LIMIT,
+            tolerance=ADMISSION_LATENCY_TOLERANCE_PERCENT / 100,
+        ),
+        low_priority_share=ADMISSION_LOW_PRIORITY_SHARE_PERCENT / 100,
+        per_client_max_inflight=ADMISSION_PER_CLIENT_MAX_INFLIGHT,
+        retry_after_seconds=ADMISSION_RETRY_AFTER_SECONDS,
+    )
 
-    stale_seconds = RATE_LIMIT_WINDOW_SECONDS * 2
-    for key, (window_start, _) in list(_rate_limit_store.items()):
-        if now_ts - window_start > stale_seconds:
-            _rate_limit_store.pop(key, None)
+# 토큰이 없으면 프로파일링 기능 전체(요청 프로파일 헤더, /admin/profile* 라우트)가 꺼진 상태로 기동합니다.
+profiling_control = None
+if PROFILING_ADMIN_TOKEN:
+    profiling_control = ProfilingControl(PROFILING_ADMIN_TOKEN, ProfileStore(PROFILE_DIR, PROFILE_MAX_FILES))
+loop_watchdog = None
+rate_limit_sync_task = None
+startup_timer.mark("services")
 
-    if len(_rate_limit_store) > RATE_LIMIT_TRACKER_MAX_KEYS:
-        overflow = len(_rate_limit_store) - RATE_LIMIT_TRACKER_MAX_KEYS
-        for key in list(_rate_limit_store.keys())[:overflow]:
-            _rate_limit_store.pop(key, None)
+
+def _extract_client_ip(request: Request) -> str:
+    return client_ip_from_scope(request.scope)
 
 
 def enforce_rate_limit(request: Request, scope: str, max_requests: int):
@@ -282,30 +488,19 @@ def enforce_rate_limit(request: Request, scope: str, max_requests: int):
         return
 
     ip = _extract_client_ip(request)
-    bucket_key = f"{scope}:{ip}"
-    now_ts = time.time()
-
-    with _rate_limit_lock:
-        _cleanup_rate_limit_store(now_ts)
-        window_start, count = _rate_limit_store.get(bucket_key, (now_ts, 0))
-
-        if now_ts - window_start >= RATE_LIMIT_WINDOW_SECONDS:
-            window_start, count = now_ts, 0
-
-        if count >= max_requests:
-            retry_after = max(1, int(RATE_LIMIT_WINDOW_SECONDS - (now_ts - window_start)))
-            job_id = getattr(request.state, "job_id", "SYSTEM")
-            logger.warning(
-                f"Rate limit exceeded scope={scope} ip={ip}",
-                extra={"job_id": job_id, "step": "RATE_LIMIT", "status": "FAIL", "duration_ms": 0},
-            )
-            raise HTTPException(
-                status_code=429,
-                detail=f"Too many requests. Retry in {retry_after} seconds.",
-                headers={"Retry-After": str(retry_after)},
-            )
-
-        _rate_limit_store[bucket_key] = (window_start, count + 1)
+    retry_after = rate_limiter.hit(scope, ip, max_requests)
+    if retry_after:
+        metrics.inc("rate_limit_rejections_total", (scope,))
+        job_id = getattr(request.state, "job_id", "SYSTEM")
+        logger.warning(
+            f"Rate limit exceeded scope={scope} ip={ip}",
+            extra={"job_id": job_id, "step": "RATE_LIMIT", "status": "FAIL", "duration_ms": 0},
+        )
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests. Retry in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
 
 def sanitize_chat_history(history):
@@ -327,17 +522,15 @@ def sanitize_chat_history(history):
     return normalized
 
 def get_system_prompt():
-    """system_prompt.md 파일을 읽어 AI 페르소나 정의를 반환함."""
-    try:
-        with open("system_prompt.md", "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception as e:
-        logger.warning(f"Failed to load system_prompt.md: {e}", extra={"step": "PROMPT_LOAD", "status": "WARN"})
-        return "You are a helpful assistant."
+    """system_prompt.md 기반 AI 페르소나 정의를 반환함 (메모리 캐시, mtime 변경 시에만 재로드)."""
+    text, _ = system_prompt_cache.get()
+    return text
 
 class ChatRequest(BaseModel):
     message: str
     history: list = []
+    # None이면 기존 방식(클라이언트가 history 전체 전송). ""이면 새 세션 발급, 값이 있으면 서버 측 세션 이어가기.
+    session_id: Optional[str] = None
 
 class DiceCommentRequest(BaseModel):
     distance: str
@@ -349,168 +542,172 @@ DEFAULT_ICLOUD_CALENDAR_URL = (
 )
 
 
-def _unfold_ics_lines(ics_text: str):
-    """Folded ICS 라인을 펼쳐 파싱하기 쉬운 형태로 반환."""
-    unfolded = []
-    for raw_line in ics_text.splitlines():
-        if raw_line.startswith((" ", "\t")) and unfolded:
-            unfolded[-1] += raw_line[1:]
-        else:
-            unfolded.append(raw_line.rstrip("\r"))
-    return unfolded
+# 성공 요청의 RECEIVE 줄은 비율 샘플링 (RESPONSE 줄과 실패 요청의 RECEIVE 줄은 항상 기록).
+receive_sampler = ReceiveSampler(LOG_RECEIVE_SAMPLE_RATE)
+
+STATIC_ROUTE_PREFIXES = ("/css", "/js")
+
+# 요청 ID/Origin 가드/요청 로그/메트릭/응답 헤더를 순수 ASGI 계층 1개에서 처리 (CORS보다 바깥).
+app.add_middleware(
+    RequestContextMiddleware,
+    allowed_origins=ALLOWED_ORIGIN_SET,
+    restricted_paths=API_ORIGIN_RESTRICTED_PATHS,
+    app_version=APP_VERSION,
+    metrics=metrics,
+    receive_sampler=receive_sampler,
+    static_prefixes=STATIC_ROUTE_PREFIXES,
+    admission=admission_controller,
+    profiler=profiling_control,
+)
+
+DICE_FALLBACK_COMMENT = "코치가 잠깐 숨 고르는 중이다. 조금 뒤에 다시 굴려."
 
 
-def _clean_ics_text(value: str) -> str:
+def _build_dice_prompt(distance_text: str) -> str:
     return (
-        (value or "")
-        .replace("\\n", "\n")
-        .replace("\\,", ",")
-        .replace("\\;", ";")
-        .replace("\\\\", "\\")
-        .strip()
+        f"너는 'Devil Coach'라는 아주 무례하고 독설을 내뱉는 방구석 여포 겸 코치다. "
+        f"사용자가 주사위를 굴려서 '{distance_text}'라는 거리가 나왔다. "
+        f"다음 규칙에 따라 아주 짧고 강렬한 한 마디를 반말로 내뱉어라:\n"
+        f"1. 마크다운 기호를 절대 사용하지 마라.\n"
+        f"2. 만약 거리가 짧으면 조롱(예: '운 좋네 이 새끼'), 길면 육체적 고통 예고(예: '지옥을 맛봐라').\n"
+        f"3. 30자 이내로 대답하라."
     )
 
 
-def _parse_ics_datetime(value: str):
-    raw = (value or "").strip()
-    if not raw:
-        return None, False
+def _start_chat_session(safe_history: list):
+    """Gemini 채팅 세션 생성 (모델은 레지스트리에서 재사용, 워커 스레드 전용)."""
+    model = model_registry.get_model(
+        GEMINI_MODEL_NAME,
+        generation_config=generation_config,
+        system_instruction=get_system_prompt(),
+    )
 
-    if len(raw) == 8 and raw.isdigit():
-        parsed = datetime.strptime(raw, "%Y%m%d")
-        return parsed, True
+    formatted_history = []
+    for msg in safe_history:
+        role = "user" if msg['role'] == 'user' else "model"
+        formatted_history.append({"role": role, "parts": [msg['content']]})
 
-    formats = [
-        ("%Y%m%dT%H%M%SZ", True),
-        ("%Y%m%dT%H%M%S", False),
-        ("%Y%m%dT%H%MZ", True),
-        ("%Y%m%dT%H%M", False),
-    ]
-    for fmt, is_utc in formats:
-        try:
-            parsed = datetime.strptime(raw, fmt)
-            if is_utc:
-                parsed = parsed.replace(tzinfo=timezone.utc)
-            return parsed, False
-        except ValueError:
-            continue
+    return model.start_chat(history=formatted_history)
 
-    return None, False
 
+def _generate_chat_reply(user_message: str, safe_history: list) -> str:
+    """
+    Purpose: Gemini 채팅 세션을 만들어 응답 텍스트를 생성 (블로킹, 워커 스레드 전용).
+    Input: 검증된 사용자 메시지, sanitize된 히스토리
+    Output: 모델 응답 텍스트
+    Side Effects: Gemini API 호출
+    """
+    with metrics.timed("upstream_duration_seconds", ("gemini", "chat"), "upstream_errors_total"):
+        chat_session = _start_chat_session(safe_history)
+        # SDK 타임아웃을 같은 deadline으로 걸어야 포기한 호출이 워커 스레드를 계속 붙잡지 않음.
+        response = chat_session.send_message(user_message, request_options={"timeout": CHAT_LLM_TIMEOUT_SECONDS})
+        return response.text
 
-def _event_to_payload(raw_event: dict, fallback_id: str):
-    summary = _clean_ics_text(raw_event.get("SUMMARY", "Untitled"))
-    location = _clean_ics_text(raw_event.get("LOCATION", ""))
-    notes = _clean_ics_text(raw_event.get("DESCRIPTION", ""))
 
-    start_raw = raw_event.get("DTSTART")
-    start_dt, all_day = _parse_ics_datetime(start_raw)
-    if start_dt is None:
-        return None
+def _stream_chat_reply(user_message: str, safe_history: list):
+    """
+    Purpose: Gemini 스트리밍 응답을 텍스트 청크 단위로 yield (블로킹, 워커 스레드 전용).
+    Side Effects: Gemini API 호출. 소비자가 중단하면 이터레이션을 멈춰 이후 청크를 받지 않음.
+    """
+    # 스트리밍은 첫 청크까지의 지연이 체감 속도를 결정하므로 응답 헤더 수신 시점까지를 기록.
+    with metrics.timed("upstream_duration_seconds", ("gemini", "chat_stream_open"), "upstream_errors_total"):
+        chat_session = _start_chat_session(safe_history)
+        response = chat_session.send_message(
+            user_message, stream=True, request_options={"timeout": CHAT_LLM_TIMEOUT_SECONDS}
+        )
+    for chunk in response:
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
 
-    end_raw = raw_event.get("DTEND")
-    end_dt, _ = _parse_ics_datetime(end_raw)
 
-    categories_raw = raw_event.get("CATEGORIES", "")
-    if isinstance(categories_raw, list):
-        categories_raw = ",".join(categories_raw)
-    categories = [
-        _clean_ics_text(tag).lower()
-        for tag in str(categories_raw).split(",")
-        if _clean_ics_text(tag)
-    ]
+def _clean_dice_comment(text: str) -> str:
+    return text.replace('*', '').replace('#', '').strip()
 
-    start_iso = start_dt.isoformat()
-    end_iso = end_dt.isoformat() if end_dt else None
 
-    return {
-        "id": raw_event.get("UID", fallback_id),
-        "title": summary,
-        "start": start_iso,
-        "end": end_iso,
-        "all_day": all_day,
-        "location": location,
-        "notes": notes,
-        "categories": categories,
-    }
+def _generate_dice_comment_batch(distance_text: str, count: int) -> list:
+    """
+    Purpose: 한 번의 Gemini 호출로 같은 거리용 코멘트 여러 개를 생성 (블로킹, 워커 스레드 전용).
+    Output: 정리된 코멘트 리스트 (번호/마크다운 제거, 40자 초과 항목 제외)
+    Side Effects: Gemini API 호출
+    """
+    prompt = (
+        _build_dice_prompt(distance_text)
+        + f"\n4. 서로 다른 문장을 정확히 {count}개, 한 줄에 하나씩만 출력하라. 번호는 붙이지 마라."
+    )
+    model = model_registry.get_model(GEMINI_MODEL_NAME)
+    with metrics.timed("upstream_duration_seconds", ("gemini", "dice_batch"), "upstream_errors_total"):
+        response = model.generate_content(prompt, request_options={"timeout": DICE_POOL_BATCH_TIMEOUT_SECONDS})
+    comments = []
+    for line in response.text.splitlines():
+        comment = _clean_dice_comment(line.lstrip("-•0123456789.) \t"))
+        if comment and len(comment) <= 40:
+            comments.append(comment)
+    return comments
+
+
+async def _generate_dice_pool_batch(distance_text: str, count: int) -> list:
+    return await upstream_guard.run(
+        _generate_dice_comment_batch, distance_text, count, timeout=DICE_POOL_BATCH_TIMEOUT_SECONDS
+    )
 
 
-def parse_ics_events(ics_text: str):
-    lines = _unfold_ics_lines(ics_text)
-    events = []
-    current = None
+# 주사위 결과는 거리 종류가 적으므로 미리 생성해 둔 코멘트를 O(1)로 꺼내 씁니다.
+dice_comment_pool = DiceCommentPool(
+    _generate_dice_pool_batch,
+    low_watermark=DICE_POOL_LOW_WATERMARK,
+    high_watermark=DICE_POOL_HIGH_WATERMARK,
+    refill_interval_seconds=DICE_POOL_REFILL_INTERVAL_SECONDS,
+)
 
-    for line in lines:
-        if line == "BEGIN:VEVENT":
-            current = {}
-            continue
-        if line == "END:VEVENT":
-            if current is not None:
-                payload = _event_to_payload(current, f"event-{len(events) + 1}")
-                if payload:
-                    events.append(payload)
-            current = None
-            continue
-        if current is None or ":" not in line:
-            continue
 
-        key_part, value = line.split(":", 1)
-        prop = key_part.split(";", 1)[0].upper()
+def _generate_dice_comment(distance_text: str) -> str:
+    """
+    Purpose: 주사위 거리별 독설 코멘트 1개 생성 (블로킹, 워커 스레드 전용).
+    Side Effects: Gemini API 호출
+    """
+    model = model_registry.get_model(GEMINI_MODEL_NAME)
+    with metrics.timed("upstream_duration_seconds", ("gemini", "dice"), "upstream_errors_total"):
+        response = model.generate_content(
+            _build_dice_prompt(distance_text), request_options={"timeout": DICE_LLM_TIMEOUT_SECONDS}
+        )
+    return _clean_dice_comment(response.text)
 
-        if prop in current:
-            if isinstance(current[prop], list):
-                current[prop].append(value)
-            else:
-                current[prop] = [current[prop], value]
-        else:
-            current[prop] = value
 
-    events.sort(key=lambda ev: ev.get("start", ""))
-    return events
+CHAT_MODULE_MISSING_TEXT = "AI 모듈이 설치되지 않아 채팅을 사용할 수 없습니다. (google-generativeai 누락)"
+SESSION_EXPIRED_DETAIL = "session_expired"
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """모든 HTTP 요청에 대해 job_id를 생성하고 처리 시간을 로깅함 (Global Rules 준수)."""
-    job_id = str(uuid.uuid4())[:8]
-    start_time = time.time()
-    
-    # 요청 컨텍스트에 job_id 주입
-    request.state.job_id = job_id
-    
-    logger.info(f"Incoming {request.method} to {request.url.path}", 
-                extra={"job_id": job_id, "step": "REQUEST", "status": "RECEIVE"})
-    
-    try:
-        response = await call_next(request)
-    except Exception:
-        duration = int((time.time() - start_time) * 1000)
-        logger.exception(
-            f"Unhandled exception on {request.url.path}",
-            extra={"job_id": job_id, "step": "RESPONSE", "status": "FAIL", "duration_ms": duration},
-        )
-        raise
 
-    duration = int((time.time() - start_time) * 1000)
-    status = "SUCCESS" if response.status_code < 500 else "FAIL"
-    logger.info(
-        f"Completed {request.url.path} code={response.status_code}",
-        extra={"job_id": job_id, "step": "RESPONSE", "status": status, "duration_ms": duration},
-    )
+def _set_admission_sample(request: Request, sampled: bool):
+    """업스트림을 거치지 않은 빠른 응답(캐시 hit/풀/폴백)은 sampled=False로 admission 지연 표본에서 뺌.
+
+    이런 응답이 표본에 섞이면 라우트 기준 지연이 수 ms로 고정돼 정상 Gemini 호출이 모두 과부하로 읽힘.
+    """
+    setattr(request.state, SKIP_SAMPLE_STATE_KEY, not sampled)
 
-    # 클라이언트/운영툴에서 추적하기 쉽도록 요청 ID와 서버 버전을 응답 헤더에 붙입니다.
-    response.headers["X-Request-ID"] = job_id
-    response.headers["X-App-Version"] = APP_VERSION
-    return response
 
-@app.post("/chat")
-async def chat_endpoint(request_data: Request, chat_req: ChatRequest):
+def _resolve_chat_session(session_id: str, history):
+    session = chat_sessions.get(session_id) if session_id else None
+    if session is not None:
+        return session
+    if session_id and not history:
+        # TTL 만료/LRU 축출/재시작으로 잃은 세션을 빈 세션으로 조용히 바꾸면 맥락이 사라진다.
+        # 409로 알려 클라이언트가 가진 history로 한 번 다시 보내게 한다.
+        raise HTTPException(status_code=409, detail=SESSION_EXPIRED_DETAIL)
+    session = chat_sessions.create()
+    if history:
+        # 첫 세션 요청(또는 session_expired 후 재전송)에 실려 온 기존 대화로 세션을 채움.
+        session.seed(sanitize_chat_history(history))
+    return session
+
+
+def _prepare_chat_request(request_data: Request, chat_req: ChatRequest):
     """
-    AI 코치와 채팅을 수행하는 엔드포인트.
-    사용자 메시지와 대화 기록을 받아 Gemini API를 호출함.
+    Purpose: /chat, /chat/stream 공통 검증 (레이트 리밋, 입력 길이, API 키) + 모델에 보낼 히스토리 결정.
+    Output: (user_message, safe_history, session) - session은 세션 모드가 아니면 None
+    Exceptions: HTTPException(400/413/429/500), HTTPException(409, "session_expired") - 모르는 session_id에 history 없음
     """
     job_id = request_data.state.job_id
-    start_time = time.time()
-
     enforce_rate_limit(request_data, "chat", CHAT_RATE_LIMIT_PER_WINDOW)
 
     user_message = str(chat_req.message or "").strip()
@@ -522,141 +719,654 @@ async def chat_endpoint(request_data: Request, chat_req: ChatRequest):
             detail=f"Message too long. max={MAX_CHAT_MESSAGE_LENGTH} chars.",
         )
 
-    safe_history = sanitize_chat_history(chat_req.history)
+    session = None
+    if CHAT_SESSIONS_ENABLED and chat_req.session_id is not None:
+        session = _resolve_chat_session(str(chat_req.session_id).strip(), chat_req.history)
+        safe_history = session.model_history()
+    else:
+        safe_history = trim_to_budget(sanitize_chat_history(chat_req.history), CHAT_HISTORY_TOKEN_BUDGET)
 
-    if genai is None:
+    if not GENAI_AVAILABLE:
         logger.warning("Chat requested but google-generativeai is missing", extra={"job_id": job_id, "step": "CHAT_API", "status": "WARN"})
-        return {"response": "AI 모듈이 설치되지 않아 채팅을 사용할 수 없습니다. (google-generativeai 누락)"}
+        return user_message, safe_history, session
 
     if not API_KEY:
         logger.error("Chat requested but API Key is missing", extra={"job_id": job_id, "step": "CHAT_API", "status": "FAIL"})
         raise HTTPException(status_code=500, detail="API Key not configured")
-    
-    try:
-        logger.info(
-            f"Chat request accepted (chars={len(user_message)} history={len(safe_history)})",
-            extra={"job_id": job_id, "step": "CHAT_PROCESS", "status": "SUCCESS"},
-        )
-        genai.configure(api_key=API_KEY)
-        
-        system_instruction = get_system_prompt()
-        model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash",
-            generation_config=generation_config,
-            system_instruction=system_instruction,
-        )
 
-        formatted_history = []
-        for msg in safe_history:
-            role = "user" if msg['role'] == 'user' else "model"
-            formatted_history.append({"role": role, "parts": [msg['content']]})
+    logger.info(
+        f"Chat request accepted (chars={len(user_message)} history={len(safe_history)} session={session is not None})",
+        extra={"job_id": job_id, "step": "CHAT_PROCESS", "status": "SUCCESS"},
+    )
+    return user_message, safe_history, session
+
+
+def _record_chat_turn(session, user_message: str, reply_text: str):
+    # 빈 응답은 Gemini 히스토리에 넣을 수 없으므로 턴 전체를 건너뜀.
+    if session is not None and reply_text.strip():
+        session.append("user", user_message)
+        session.append("assistant", reply_text)
+
+
+def _chat_cache_key(user_message: str, safe_history: list):
+    """응답 캐시 키 (캐시 비활성이면 None). 프롬프트 해시가 바뀌면 이전 응답은 자연히 miss."""
+    if chat_response_cache is None:
+        return None
+    _, digest = system_prompt_cache.get()
+    return ChatResponseCache.make_key(digest, GEMINI_MODEL_NAME, safe_history, user_message)
+
+
+def _chat_payload(session, payload: dict) -> dict:
+    if session is not None:
+        payload["session_id"] = session.session_id
+    return payload
+
+
+def _raise_chat_busy(job_id: str):
+    metrics.inc("llm_rejections_total", ("chat", "busy"))
+    logger.warning(
+        f"Chat rejected: LLM pool saturated pending={llm_executor.pending}",
+        extra={"job_id": job_id, "step": "CHAT_QUEUE", "status": "FAIL"},
+    )
+    raise HTTPException(
+        status_code=503,
+        detail="Coach is busy right now. Please retry shortly.",
+        headers={"Retry-After": str(LLM_BUSY_RETRY_AFTER_SECONDS)},
+    )
+
+
+def _raise_chat_circuit_open(job_id: str, exc: CircuitOpenError):
+    metrics.inc("llm_rejections_total", ("chat", "circuit_open"))
+    logger.warning(
+        f"Chat rejected: Gemini circuit open retry_after_s={exc.retry_after}",
+        extra={"job_id": job_id, "step": "CHAT_CIRCUIT", "status": "FAIL", "duration_ms": 0},
+    )
+    raise HTTPException(
+        status_code=503,
+        detail="Coach is unavailable right now. Please retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _sse_frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """
+    Purpose: 업스트림 스트림(GuardedStream)을 응답 단위로 정리하는 StreamingResponse.
+    Input: content(async generator), upstream(cancel()/멱등 aclose()를 가진 스트림)
+    Side Effects: 클라이언트 disconnect를 직접 감시해 즉시 upstream.cancel() + 전송 중단 (첫 청크를 기다리는 중에도).
+                  본문 이터레이션이 시작되지 않았거나 전송 중 예외/취소로 끝나도 upstream.aclose()를 호출
+                  (브레이커 탐침 반납 + 워커의 업스트림 생성 중단). 본문 generator의 finally에만 두면
+                  첫 이터레이션 전에 연결이 끊긴 경우 실행되지 않음.
+    """
+
+    def __init__(self, content, upstream, **kwargs):
+        super().__init__(content, **kwargs)
+        self._upstream = upstream
+
+    async def __call__(self, scope, receive, send):
+        streaming = asyncio.ensure_future(super().__call__(scope, receive, send))
+        watcher = asyncio.ensure_future(self._watch_disconnect(scope, receive, streaming))
+        try:
+            await streaming
+        except asyncio.CancelledError:
+            # 클라이언트 disconnect로 전송을 멈춘 경우는 정상 종료 (서버 종료 등 그 외 취소는 그대로 전파).
+            if not watcher.done() or watcher.cancelled():
+                raise
+        finally:
+            watcher.cancel()
+            # 전송 실패로 멈춘 본문 generator도 닫아 finally(로그)를 실행한 뒤 업스트림 정리.
+            await self.body_iterator.aclose()
+            await self._upstream.aclose()
+
+    async def _watch_disconnect(self, scope, receive, streaming):
+        # Starlette는 ASGI spec 2.4+ 서버에서 disconnect를 감시하지 않고 다음 send 실패로만 알아챔.
+        # 업스트림이 첫 청크를 만드는 수 초 동안에도 토큰 생성을 멈추도록 receive를 직접 기다림.
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+        # 중간에 끊긴 응답의 처리 시간은 업스트림 지연이 아니므로 admission 표본에서 뺌.
+        scope.setdefault("state", {})[SKIP_SAMPLE_STATE_KEY] = True
+        self._upstream.cancel()
+        streaming.cancel()
+
+
+@app.post("/chat")
+async def chat_endpoint(request_data: Request, chat_req: ChatRequest):
+    """
+    AI 코치와 채팅을 수행하는 엔드포인트.
+    사용자 메시지와 대화 기록을 받아 Gemini API를 호출함.
+    """
+    job_id = request_data.state.job_id
+    start_time = time.time()
+
+    user_message, safe_history, session = _prepare_chat_request(request_data, chat_req)
+    if not GENAI_AVAILABLE:
+        _set_admission_sample(request_data, False)
+        return _chat_payload(session, {"response": CHAT_MODULE_MISSING_TEXT})
 
-        chat_session = model.start_chat(history=formatted_history)
-        response = chat_session.send_message(user_message)
-        
+    async def generate():
+        return await upstream_guard.run(
+            _generate_chat_reply, user_message, safe_history, timeout=CHAT_LLM_TIMEOUT_SECONDS
+        )
+
+    cache_key = _chat_cache_key(user_message, safe_history)
+    cache_result = "bypass"
+    try:
+        if cache_key is None:
+            reply_text = await generate()
+        else:
+            # 같은 키의 동시 요청은 첫 요청의 업스트림 호출 결과를 함께 받음.
+            reply_text, cache_result = await chat_response_cache.get_or_compute(cache_key, generate)
+            metrics.inc("chat_response_cache_requests_total", (cache_result,))
+            if cache_result == "hit":
+                _set_admission_sample(request_data, False)
+    except LLMBusyError:
+        _raise_chat_busy(job_id)
+    except CircuitOpenError as e:
+        _raise_chat_circuit_open(job_id, e)
+    except LLMTimeoutError:
+        metrics.inc("llm_rejections_total", ("chat", "timeout"))
         duration = int((time.time() - start_time) * 1000)
-        logger.info("AI response generated", extra={"job_id": job_id, "step": "CHAT_SUCCESS", "duration_ms": duration})
-        return {"response": response.text}
+        logger.error(
+            f"Chat upstream deadline exceeded timeout_s={CHAT_LLM_TIMEOUT_SECONDS}",
+            extra={"job_id": job_id, "step": "CHAT_API", "status": "FAIL", "duration_ms": duration},
+        )
+        raise HTTPException(status_code=504, detail="Chat response timed out. Please retry.")
     except Exception as e:
         logger.error(f"Error in chat_endpoint: {str(e)}", extra={"job_id": job_id, "step": "CHAT_API", "status": "FAIL"}, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process chat request. Please retry.")
 
-@app.post("/dice-comment")
-async def dice_comment_endpoint(request_data: Request, dice_req: DiceCommentRequest):
+    duration = int((time.time() - start_time) * 1000)
+    logger.info(
+        f"AI response generated cache={cache_result}",
+        extra={"job_id": job_id, "step": "CHAT_SUCCESS", "duration_ms": duration},
+    )
+    _record_chat_turn(session, user_message, reply_text)
+    return _chat_payload(session, {"response": reply_text})
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _lookup_stream_cache(cache_key):
+    # 스트림은 coalescing하지 않으므로 get()만 사용 (끝까지 받은 응답은 _upstream_chat_events가 put).
+    if cache_key is None:
+        return None
+    cached_reply = chat_response_cache.get(cache_key)
+    metrics.inc("chat_response_cache_requests_total", ("hit" if cached_reply is not None else "miss",))
+    return cached_reply
+
+
+async def _missing_module_events(session):
+    yield _sse_frame("chunk", {"text": CHAT_MODULE_MISSING_TEXT})
+    yield _sse_frame("done", _chat_payload(session, {"chars": len(CHAT_MODULE_MISSING_TEXT)}))
+
+
+async def _cached_chat_events(session, cached_reply: str, job_id: str, start_time: float):
+    yield _sse_frame("chunk", {"text": cached_reply})
+    yield _sse_frame("done", _chat_payload(session, {"chars": len(cached_reply)}))
+    duration = int((time.time() - start_time) * 1000)
+    logger.info(
+        f"Chat stream finished chars={len(cached_reply)} cache=hit",
+        extra={"job_id": job_id, "step": "CHAT_STREAM", "status": "SUCCESS", "duration_ms": duration},
+    )
+
+
+def _chat_stream_error_detail(exc: Exception, job_id: str) -> str:
+    """스트림 중 예외를 로그/지표로 남기고 error 프레임에 실을 문구를 반환."""
+    if isinstance(exc, LLMTimeoutError):
+        metrics.inc("llm_rejections_total", ("chat_stream", "timeout"))
+        logger.error(
+            f"Chat stream deadline exceeded timeout_s={CHAT_LLM_TIMEOUT_SECONDS}",
+            extra={"job_id": job_id, "step": "CHAT_STREAM", "status": "FAIL"},
+        )
+        return "Chat response timed out. Please retry."
+    logger.error(
+        f"Error in chat_stream_endpoint: {str(exc)}",
+        extra={"job_id": job_id, "step": "CHAT_STREAM", "status": "FAIL"},
+        exc_info=exc,
+    )
+    return "Failed to process chat request. Please retry."
+
+
+async def _upstream_chat_events(chunks, session, user_message: str, cache_key, job_id: str, start_time: float):
+    """업스트림 청크를 SSE chunk 프레임으로 중계하고, 끝까지 전달된 응답만 세션/캐시에 기록."""
+    sent_parts = []
+    status = "SUCCESS"
+    try:
+        async for text in chunks:
+            sent_parts.append(text)
+            yield _sse_frame("chunk", {"text": text})
+        # 끝까지 전달된 응답만 세션에 기록 (중단/오류 턴은 다음 요청 히스토리에 넣지 않음).
+        reply_text = "".join(sent_parts)
+        _record_chat_turn(session, user_message, reply_text)
+        if cache_key is not None:
+            chat_response_cache.put(cache_key, reply_text)
+        yield _sse_frame("done", _chat_payload(session, {"chars": len(reply_text)}))
+    except (asyncio.CancelledError, GeneratorExit):
+        # disconnect 감시로 취소됐거나, 전송 실패 후 응답이 본문 generator를 닫은 경우.
+        status = "CANCELLED"
+        raise
+    except Exception as e:
+        status = "FAIL"
+        yield _sse_frame("error", {"detail": _chat_stream_error_detail(e, job_id)})
+    finally:
+        await chunks.aclose()
+        duration = int((time.time() - start_time) * 1000)
+        logger.info(
+            f"Chat stream finished chars={sum(map(len, sent_parts))}",
+            extra={"job_id": job_id, "step": "CHAT_STREAM", "status": status, "duration_ms": duration},
+        )
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request_data: Request, chat_req: ChatRequest):
     """
-    주사위 결과에 대해 AI 코치의 독설 코멘트를 생성하는 엔드포인트.
+    /chat의 스트리밍 버전 (Server-Sent Events).
+    Gemini가 생성하는 청크를 즉시 전달해 첫 바이트까지의 시간을 줄임.
+    프레임: `event: chunk` {"text"} -> `event: done` {"chars", "session_id"?} | `event: error` {"detail"}
+    클라이언트 연결이 끊기면(첫 청크 전 포함) UpstreamStreamingResponse가 업스트림 이터레이션도 중단해 불필요한 토큰 소비를 막음.
+    응답 캐시 hit이면 chunk 1개 + done으로 즉시 응답 (스트림은 coalescing하지 않고, 끝까지 받은 응답만 캐시에 추가).
     """
     job_id = request_data.state.job_id
     start_time = time.time()
 
-    enforce_rate_limit(request_data, "dice-comment", DICE_RATE_LIMIT_PER_WINDOW)
+    user_message, safe_history, session = _prepare_chat_request(request_data, chat_req)
+    if not GENAI_AVAILABLE:
+        _set_admission_sample(request_data, False)
+        return StreamingResponse(_missing_module_events(session), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    cache_key = _chat_cache_key(user_message, safe_history)
+    cached_reply = _lookup_stream_cache(cache_key)
+    if cached_reply is not None:
+        _set_admission_sample(request_data, False)
+        _record_chat_turn(session, user_message, cached_reply)
+        events = _cached_chat_events(session, cached_reply, job_id, start_time)
+        return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+    try:
+        chunks = upstream_guard.stream(
+            _stream_chat_reply, user_message, safe_history, timeout=CHAT_LLM_TIMEOUT_SECONDS
+        )
+    except LLMBusyError:
+        _raise_chat_busy(job_id)
+    except CircuitOpenError as e:
+        _raise_chat_circuit_open(job_id, e)
+
+    events = _upstream_chat_events(chunks, session, user_message, cache_key, job_id, start_time)
+    return UpstreamStreamingResponse(events, upstream=chunks, media_type="text/event-stream", headers=SSE_HEADERS)
+
 
-    distance_text = str(dice_req.distance or "").strip()
+def _validated_dice_distance(distance) -> str:
+    distance_text = str(distance or "").strip()
     if not distance_text:
         raise HTTPException(status_code=400, detail="Distance is empty.")
     if len(distance_text) > 40:
         raise HTTPException(status_code=413, detail="Distance is too long.")
+    return distance_text
 
-    if genai is None:
-        return {"comment": f"{distance_text} 뛰어라. (AI 모듈 누락)"}
 
+def _local_dice_comment(distance_text: str):
+    """업스트림 없이 줄 수 있는 코멘트 (AI 모듈/API 키 없음 안내, 미리 생성한 풀). 없으면 None."""
+    if not GENAI_AVAILABLE:
+        return f"{distance_text} 뛰어라. (AI 모듈 누락)"
     if not API_KEY:
-        return {"comment": f"{distance_text} 당장 뛰어라! (API 키 없음)"}
-    
-    try:
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        prompt = (
-            f"너는 'Devil Coach'라는 아주 무례하고 독설을 내뱉는 방구석 여포 겸 코치다. "
-            f"사용자가 주사위를 굴려서 '{distance_text}'라는 거리가 나왔다. "
-            f"다음 규칙에 따라 아주 짧고 강렬한 한 마디를 반말로 내뱉어라:\n"
-            f"1. 마크다운 기호를 절대 사용하지 마라.\n"
-            f"2. 만약 거리가 짧으면 조롱(예: '운 좋네 이 새끼'), 길면 육체적 고통 예고(예: '지옥을 맛봐라').\n"
-            f"3. 30자 이내로 대답하라."
+        return f"{distance_text} 당장 뛰어라! (API 키 없음)"
+    return dice_comment_pool.pop(distance_text)
+
+
+def _dice_fallback_comment(distance_text: str, exc: Exception, job_id: str) -> str:
+    """업스트림 실패 사유를 지표/로그로 남기고 최근 문구 재사용, 없으면 고정 폴백 문구."""
+    if isinstance(exc, LLMBusyError):
+        metrics.inc("llm_rejections_total", ("dice", "busy"))
+        # 주사위는 부가 기능이므로 대기열이 가득 차면 업스트림 호출 없이 폴백 문구로 즉시 응답.
+        logger.warning(
+            f"Dice comment skipped: LLM pool saturated pending={llm_executor.pending}",
+            extra={"job_id": job_id, "step": "DICE_QUEUE", "status": "WARN"},
         )
-        
-        response = model.generate_content(prompt)
-        comment = response.text.replace('*', '').replace('#', '').strip()
-        
-        duration = int((time.time() - start_time) * 1000)
-        logger.info(f"Dice comment generated for {distance_text}", extra={"job_id": job_id, "step": "DICE_SUCCESS", "duration_ms": duration})
-        return {"comment": comment}
-    except Exception as e:
-        logger.error(f"Error in dice_comment: {str(e)}", extra={"job_id": job_id, "step": "DICE_API", "status": "FAIL"})
-        return {"comment": "코치가 잠깐 숨 고르는 중이다. 조금 뒤에 다시 굴려."}
+    elif isinstance(exc, CircuitOpenError):
+        metrics.inc("llm_rejections_total", ("dice", "circuit_open"))
+        logger.warning(
+            "Dice comment skipped: Gemini circuit open",
+            extra={"job_id": job_id, "step": "DICE_CIRCUIT", "status": "WARN", "duration_ms": 0},
+        )
+    else:
+        if isinstance(exc, LLMTimeoutError):
+            metrics.inc("llm_rejections_total", ("dice", "timeout"))
+        logger.error(f"Error in dice_comment: {str(exc)}", extra={"job_id": job_id, "step": "DICE_API", "status": "FAIL"})
+    return dice_comment_pool.recycle(distance_text) or DICE_FALLBACK_COMMENT
 
 
-@app.get("/calendar/events")
-async def calendar_events_endpoint(request_data: Request):
+@app.post("/dice-comment")
+async def dice_comment_endpoint(request_data: Request, dice_req: DiceCommentRequest):
     """
-    iCloud 공개 ICS 캘린더를 서버에서 파싱해 이벤트 목록을 반환.
-    클라이언트는 ICS URL/자격정보를 직접 다루지 않음.
+    주사위 결과에 대해 AI 코치의 독설 코멘트를 생성하는 엔드포인트.
     """
     job_id = request_data.state.job_id
     start_time = time.time()
 
-    enforce_rate_limit(request_data, "calendar-events", CALENDAR_RATE_LIMIT_PER_WINDOW)
-
-    now_ts = time.time()
-    with _calendar_cache_lock:
-        cached_payload = _calendar_cache.get("payload")
-        cache_expires_at = _calendar_cache.get("expires_at", 0.0)
-        if cached_payload is not None and cache_expires_at > now_ts:
-            return cached_payload
+    enforce_rate_limit(request_data, "dice-comment", DICE_RATE_LIMIT_PER_WINDOW)
+    distance_text = _validated_dice_distance(dice_req.distance)
 
-    raw_url = os.getenv("ICLOUD_CALENDAR_ICS_URL", DEFAULT_ICLOUD_CALENDAR_URL).strip()
-    if raw_url.startswith("webcal://"):
-        raw_url = "https://" + raw_url[len("webcal://"):]
+    # 풀/폴백 응답은 업스트림을 거치지 않으므로 지연 표본에서 빼고, Gemini가 직접 생성한 경우만 표본으로 씀.
+    _set_admission_sample(request_data, False)
+    local_comment = _local_dice_comment(distance_text)
+    if local_comment:
+        return {"comment": local_comment}
 
     try:
-        req = URLRequest(raw_url, headers={"User-Agent": "DevilTown/1.0"})
-        with urlopen(req, timeout=12) as res:
-            ics_text = res.read().decode("utf-8", errors="ignore")
+        # 짧은 프롬프트라 p95를 넘기면 두 번째 요청을 보내 꼬리 지연을 줄임.
+        comment = await upstream_guard.run(
+            _generate_dice_comment,
+            distance_text,
+            timeout=DICE_LLM_TIMEOUT_SECONDS,
+            hedge_operation="dice" if DICE_HEDGE_ENABLED else None,
+        )
+    except Exception as e:
+        return {"comment": _dice_fallback_comment(distance_text, e, job_id)}
 
-        events = parse_ics_events(ics_text)
-        duration = int((time.time() - start_time) * 1000)
-        payload = {"source": "icloud", "count": len(events), "events": events}
-        with _calendar_cache_lock:
-            _calendar_cache["payload"] = payload
-            _calendar_cache["expires_at"] = time.time() + CALENDAR_CACHE_TTL_SECONDS
+    duration = int((time.time() - start_time) * 1000)
+    logger.info(f"Dice comment generated for {distance_text}", extra={"job_id": job_id, "step": "DICE_SUCCESS", "duration_ms": duration})
+    _set_admission_sample(request_data, True)
+    return {"comment": comment}
 
-        logger.info(
-            f"Calendar events fetched ({len(events)})",
-            extra={"job_id": job_id, "step": "CALENDAR_FETCH", "duration_ms": duration},
+
+# ICLOUD_CALENDAR_ICS_URLS(쉼표 구분, `이름=URL`)가 있으면 여러 캘린더를 합쳐 제공, 없으면 기존 단일 URL.
+calendar_sources = parse_calendar_sources(
+    os.getenv("ICLOUD_CALENDAR_ICS_URLS", "").strip()
+    or os.getenv("ICLOUD_CALENDAR_ICS_URL", DEFAULT_ICLOUD_CALENDAR_URL).strip()
+)
+# 모든 소스가 연결 풀 1개를 공유하고, 유휴 연결은 다음 갱신(TTL)까지 유지해 TLS 핸드셰이크를 재사용.
+calendar_fetcher = CalendarSourceFetcher(
+    calendar_sources,
+    timeout_seconds=CALENDAR_FETCH_TIMEOUT_SECONDS,
+    user_agent="DevilTown/1.0",
+    max_connections=CALENDAR_FETCH_MAX_CONNECTIONS,
+    keepalive_seconds=CALENDAR_CACHE_TTL_SECONDS * 2,
+)
+SOURCE_OUTCOMES = {200: "ok", 304: "not_modified", 0: "error"}
+
+
+async def _fetch_calendar_sources(previous):
+    """
+    Purpose: 모든 캘린더 소스를 동시에 조건부 GET (소스별 deadline, 실패는 소스 단위로 격리).
+    Output: FetchResult(304) - 모든 소스 변경 없음 / FetchResult(200, sources=[SourceResult])
+    Exceptions: RuntimeError - 모든 소스가 실패 (캐시가 직전 스냅샷을 stale로 제공)
+    """
+    results = await calendar_fetcher.fetch_all(previous.validators() if previous is not None else None)
+    for result in results:
+        metrics.inc("calendar_source_fetches_total", (result.name, SOURCE_OUTCOMES.get(result.status, "error")))
+        metrics.observe("upstream_duration_seconds", result.duration_ms / 1000, ("icloud", "fetch_ics"))
+        if result.status == 0:
+            metrics.inc("upstream_errors_total", ("icloud", "fetch_ics"))
+
+    if all(result.status == 0 for result in results):
+        raise RuntimeError("all calendar sources failed: " + "; ".join(f"{r.name}={r.error}" for r in results))
+    if (
+        previous is not None
+        and not previous.has_source_errors()
+        and previous.sources.keys() == {result.name for result in results}
+        and all(result.status == 304 for result in results)
+    ):
+        return FetchResult(status=304)
+    return FetchResult(status=200, sources=results)
+
+
+def _build_calendar_snapshot(result, previous):
+    """소스별로 파싱(또는 304/실패 시 직전 이벤트 재사용)한 뒤, 이미 정렬된 목록들을 k-way 병합."""
+    previous_sources = previous.sources if previous is not None else {}
+    states = {}
+    streams = []
+    for source_result in result.sources:
+        name = source_result.name
+        old = previous_sources.get(name)
+        if source_result.status == 200:
+            events = parse_ics_events(source_result.body.decode("utf-8", errors="ignore"))
+            for event in events:
+                event["source"] = name
+            state = SourceState(source_result.etag, source_result.last_modified, events, fetched_at=time.time())
+        elif source_result.status == 304 and old is not None:
+            state = SourceState(old.etag, old.last_modified, old.events, fetched_at=time.time())
+        elif old is not None:
+            # 이 소스만 실패: 직전 정상 이벤트를 그대로 두고 sources[].stale로 표시 (다른 소스는 새 값).
+            state = SourceState(old.etag, old.last_modified, old.events, old.fetched_at, source_result.error or "failed")
+        else:
+            state = SourceState(error=source_result.error or "failed")
+        states[name] = state
+        streams.append((name, state.events))
+    return _indexed_calendar_snapshot(merge_source_events(streams), states, previous)
+
+
+def _restore_calendar_snapshot(data: dict, previous=None):
+    """다른 워커가 게시한 이벤트 목록으로 이 워커의 인덱스/응답 본문을 재구성 (iCloud 조회 없음, version은 게시자 값)."""
+    events = data.get("events") or []
+    grouped = {}
+    for event in events:
+        grouped.setdefault(event.get("source", ""), []).append(event)
+    states = {
+        name: SourceState(
+            etag=info.get("etag", ""),
+            last_modified=info.get("last_modified", ""),
+            events=grouped.get(name, []),
+            fetched_at=info.get("fetched_at", 0.0),
+            error=info.get("error", ""),
         )
-        return payload
-    except Exception as e:
-        duration = int((time.time() - start_time) * 1000)
-        logger.error(
-            f"Calendar fetch failed: {e}",
-            extra={"job_id": job_id, "step": "CALENDAR_FETCH", "status": "FAIL", "duration_ms": duration},
+        for name, info in (data.get("sources") or {}).items()
+    }
+    return _indexed_calendar_snapshot(events, states, previous, version=data.get("version"))
+
+
+def _indexed_calendar_snapshot(events, sources: dict, previous=None, version: int = None):
+    # 반복 일정은 표시 구간(오늘 - PAST ~ 오늘 + HORIZON)만 펼치고, 그 밖의 범위 조회는 요청 시 구간별로 확장.
+    recurrence = RecurrenceExpander(
+        events,
+        horizon_days=CALENDAR_RECURRENCE_HORIZON_DAYS,
+        past_days=CALENDAR_RECURRENCE_PAST_DAYS,
+        max_span_days=CALENDAR_RECURRENCE_MAX_SPAN_DAYS,
+        max_instances=CALENDAR_RECURRENCE_MAX_INSTANCES,
+    )
+    display_events = recurrence.display_events()
+    snapshot = snapshot_from_events(display_events, sources)
+    # 원본 내용 해시를 직전 스냅샷과 비교해, 바뀐 경우에만 version을 올리고 since 변경분 계산용 이력을 이어감.
+    # (날짜만 바뀐 재확장은 같은 version - 구간 끝 회차는 since_date로 따로 계산)
+    snapshot.versions = CalendarVersions.advance(
+        previous.versions if previous is not None else None,
+        display_events,
+        events,
+        recurrence,
+        max_history=CALENDAR_DELTA_HISTORY_VERSIONS,
+        version=version,
+    )
+    snapshot.payload["version"] = snapshot.versions.version
+    snapshot.payload["display_date"] = (
+        recurrence.display_date.isoformat() if recurrence.display_date is not None else None
+    )
+    # 공유 게시/복원은 원본(마스터 포함) 목록으로 해야 다른 워커도 같은 규칙으로 확장할 수 있음.
+    snapshot.events = events
+    snapshot.recurrence = recurrence
+    snapshot.display_date = recurrence.display_date
+    # 범위 조회가 매번 전체를 훑지 않도록 갱신 시점에 인덱스를 1회 구성.
+    snapshot.index = CalendarIndex(display_events)
+    # 캐시 히트마다 재직렬화하지 않도록 응답 본문(gzip/br 포함)도 워커 스레드에서 미리 생성.
+    snapshot.encoded_body()
+    return snapshot
+
+
+def _reexpand_calendar_snapshot(previous):
+    """날짜가 바뀌었지만 원본 ICS는 그대로일 때(304): 같은 원본 이벤트를 오늘 기준 표시 구간으로 다시 펼침."""
+    return _indexed_calendar_snapshot(previous.events, previous.sources, previous)
+
+
+def _precompressed_response(request: Request, body, cache_control: str) -> Response:
+    """
+    Purpose: 미리 계산된 본문 중 Accept-Encoding에 맞는 변형을 그대로 전송 (If-None-Match 일치 시 304, HEAD는 헤더만).
+    Output: starlette Response (본문 재직렬화 없음)
+    """
+    headers = {"ETag": body.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match", ""), body.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding, content = body.select(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if request.method == "HEAD":
+        # GET과 같은 헤더(본문 길이 포함)만 보내고 본문은 생략.
+        headers["Content-Length"] = str(len(content))
+        return Response(media_type=body.media_type, headers=headers)
+    return Response(content=content, media_type=body.media_type, headers=headers)
+
+
+# 브라우저/Cloudflare가 매번 ETag로 재검증하도록 해 변경이 없으면 304만 오가게 함.
+CALENDAR_CACHE_CONTROL = "no-cache"
+
+# 동시 미스가 각각 iCloud를 조회하지 않도록 갱신은 1개만 수행하고, 만료된 값은 갱신 중에도 바로 제공합니다.
+calendar_cache = CalendarCache(
+    _fetch_calendar_sources,
+    _build_calendar_snapshot,
+    ttl_seconds=CALENDAR_CACHE_TTL_SECONDS,
+    failure_retry_seconds=CALENDAR_FAILURE_RETRY_SECONDS,
+    # 멀티 워커 모드에서는 lease를 가진 워커 1개만 iCloud를 조회하고 결과를 공유합니다.
+    coordinator=(
+        SharedCalendarCoordinator(
+            shared_state_store,
+            worker_id=WORKER_ID,
+            lease_seconds=CALENDAR_CACHE_TTL_SECONDS * 2 + CALENDAR_FETCH_TIMEOUT_SECONDS,
+        )
+        if shared_state_store is not None
+        else None
+    ),
+    restore_snapshot=_restore_calendar_snapshot,
+    expand_snapshot=_reexpand_calendar_snapshot,
+    follower_wait_seconds=CALENDAR_FETCH_TIMEOUT_SECONDS + 3,
+)
+
+
+def _query_calendar_window(snapshot, from_text, to_text, limit, cursor):
+    """
+    Purpose: 스냅샷 인덱스에서 [from, to) 구간 이벤트를 페이지 단위로 조회.
+    Output: 응답 payload dict
+    Exceptions: InvalidCalendarQueryError - 형식 오류
+    """
+    page_size = min(limit, CALENDAR_QUERY_MAX_LIMIT) if limit else 0
+    start_key = parse_query_time(from_text)
+    end_key = parse_query_time(to_text)
+    index = snapshot.index
+    if snapshot.recurrence is not None and snapshot.recurrence.has_series:
+        # 표시 구간 밖(예: 내년 일정)도 반복 규칙대로 보이도록 요청 구간 전용 인덱스 사용 (구간별 memo).
+        index = snapshot.recurrence.window_index(start_key, end_key)
+    page, next_cursor = index.query(start_key=start_key, end_key=end_key, limit=page_size, cursor=cursor)
+
+    payload = {key: value for key, value in snapshot.payload.items() if key != "events"}
+    payload.update(
+        {
+            "count": len(page),
+            "events": page,
+            "window": {"from": from_text or None, "to": to_text or None},
+            "next_cursor": next_cursor,
+        }
+    )
+    return payload
+
+
+def _calendar_delta_payload(snapshot, since: int, since_date):
+    """
+    Purpose: since version(+ 클라이언트가 받은 표시 기준일) 이후 변경분 응답. 이력에 없는 version이면 전체 재동기화(full=true).
+    Output: 응답 payload dict (이벤트마다 클라이언트 저장소용 key 필드 포함)
+    """
+    versions = snapshot.versions
+    payload = {key: value for key, value in snapshot.payload.items() if key != "events"}
+    delta = versions.delta(since, since_date)
+    if delta is None:
+        payload.update({"full": True, "events": versions.keyed_events()})
+    else:
+        payload["full"] = False
+        payload.update(delta)
+    return payload
+
+
+def _calendar_delta_body(snapshot, since: int, since_date: str) -> bytes:
+    """since 변경분 응답 본문 (스냅샷 수명 동안 (since, since_date)별 캐시)."""
+    try:
+        since_day = date.fromisoformat(since_date) if since_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid calendar query. Invalid since_date: {since_date}")
+    result = snapshot.versions.classify(since, since_day)
+    metrics.inc("calendar_delta_requests_total", (result,))
+    # 이력에 없는 since는 값이 제각각이어도 같은 전체 재동기화 본문 1개를 재사용.
+    return snapshot.encoded_query_body(
+        ("since", since, since_day) if result != "full" else ("since", "full"),
+        lambda: _calendar_delta_payload(snapshot, since, since_day),
+    )
+
+
+def _calendar_window_body(snapshot, from_: str, to: str, limit: int, cursor: str) -> bytes:
+    """from/to/limit/cursor 구간 응답 본문 (스냅샷 수명 동안 쿼리별 캐시)."""
+    try:
+        return snapshot.encoded_query_body(
+            (from_, to, limit, cursor),
+            lambda: _query_calendar_window(snapshot, from_, to, limit, cursor),
         )
+    except InvalidCalendarQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid calendar query. {e}")
+
+
+@app.get("/calendar/events")
+async def calendar_events_endpoint(
+    request_data: Request,
+    from_: str = Query("", alias="from", max_length=40),
+    to: str = Query("", max_length=40),
+    limit: int = Query(0, ge=0),
+    cursor: str = Query("", max_length=512),
+    since: Optional[int] = Query(None, ge=0),
+    since_date: str = Query("", max_length=10),
+):
+    """
+    iCloud 공개 ICS 캘린더를 서버에서 파싱해 이벤트 목록을 반환.
+    클라이언트는 ICS URL/자격정보를 직접 다루지 않음.
+    캐시 만료 후에도 이전 값을 즉시 반환하고 갱신은 백그라운드에서 1회만 수행함.
+    갱신 실패 시 마지막 정상 값을 `stale: true`와 함께 반환함.
+    from/to/limit/cursor가 있으면 시간 인덱스로 해당 구간만 잘라 반환함 (`next_cursor`로 다음 페이지).
+    since가 있으면 그 version 이후 바뀐 이벤트만 반환함 (이력에 없으면 `full: true` 전체 목록).
+    version은 원본 내용이 바뀔 때만 올라가고, 날짜가 바뀌어 표시 구간 끝에서 빠지거나 들어온 반복 회차는
+    since_date(이전 응답의 display_date)와 현재 구간을 비교해 같은 version에서도 added/removed로 반환함.
+    """
+    job_id = request_data.state.job_id
+
+    enforce_rate_limit(request_data, "calendar-events", CALENDAR_RATE_LIMIT_PER_WINDOW)
+
+    try:
+        snapshot, cache_state = await calendar_cache.get(job_id)
+        metrics.inc("calendar_cache_requests_total", (cache_state,))
+    except CalendarUnavailableError:
+        metrics.inc("calendar_cache_requests_total", ("unavailable",))
         return JSONResponse(
             status_code=503,
             content={"source": "icloud", "count": 0, "events": [], "error": "calendar_unavailable"},
         )
 
+    window_query = bool(from_ or to or limit or cursor)
+    if since is not None:
+        if window_query:
+            raise HTTPException(status_code=400, detail="Invalid calendar query. since cannot be combined with from/to/limit/cursor")
+        body = _calendar_delta_body(snapshot, since, since_date)
+    elif window_query:
+        body = _calendar_window_body(snapshot, from_, to, limit, cursor)
+    else:
+        body = snapshot.encoded_body()
+    return _precompressed_response(request_data, body, CALENDAR_CACHE_CONTROL)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Prometheus text 형식 운영 지표 (워커 프로세스 단위).
+    다른 API와 같은 Origin 가드가 적용되므로 수집기는 허용된 Origin 헤더를 붙여 호출해야 함.
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 @app.get("/meta/version")
 async def meta_version():
@@ -671,23 +1381,188 @@ async def meta_version():
     }
 
 
-@app.get("/")
-async def read_root():
+def _require_profiling_token(request: Request):
+    if not profiling_control.token_matches(request.headers.get("x-profile-token", "")):
+        logger.warning(
+            f"Profiling admin request rejected path={request.url.path} ip={_extract_client_ip(request)}",
+            extra={"job_id": request.state.job_id, "step": "PROFILING", "status": "FAIL", "duration_ms": 0},
+        )
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+async def admin_list_profiles(request: Request):
+    """저장된 프로파일 목록 (최신순)."""
+    _require_profiling_token(request)
+    return {"profiles": await asyncio.to_thread(profiling_control.store.list_profiles)}
+
+
+async def admin_get_profile(request: Request, name: str, view: str = Query("raw", alias="format", max_length=8)):
+    """
+    프로파일 파일 다운로드. request-*.prof는 `?format=text`이면 누적 시간 상위 함수 표(pstats)로 반환.
+    """
+    _require_profiling_token(request)
+    path = profiling_control.store.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if view == "text" and name.endswith(".prof"):
+        text = await asyncio.to_thread(stats_text, path)
+        return Response(content=text, media_type="text/plain; charset=utf-8")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
+
+
+async def admin_sampling_profile(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: int = Query(10, ge=1, le=1000),
+):
+    """
+    프로세스 전체 샘플링 프로파일 (seconds 동안 모든 스레드 스택 샘플링, 워커 스레드 1개 점유).
+    응답/저장 형식은 folded stack (flamegraph.pl, speedscope에 바로 입력).
+    """
+    _require_profiling_token(request)
+    if profiling_control.sampling_active:
+        raise HTTPException(status_code=409, detail="Sampling profile already running")
+    profiling_control.sampling_active = True
+    try:
+        text = await asyncio.to_thread(sample_process, seconds, interval_ms / 1000)
+    finally:
+        profiling_control.sampling_active = False
+    name = await asyncio.to_thread(
+        profiling_control.store.save_text, f"sampling-{request.state.job_id}.folded", text
+    )
+    return Response(content=text, media_type="text/plain; charset=utf-8", headers={"X-Profile": name})
+
+
+async def admin_loop_watchdog(
+    request: Request,
+    seconds: int = Query(60, ge=1, le=3600),
+    threshold_ms: int = Query(100, ge=10, le=10000),
+):
+    """
+    이벤트 루프 watchdog을 seconds 동안 실행 (threshold_ms 이상 루프를 막은 콜백의 스택을 LOOP_WATCHDOG 로그로 기록).
+    """
+    global loop_watchdog
+    _require_profiling_token(request)
+    if loop_watchdog is not None and loop_watchdog.running:
+        raise HTTPException(status_code=409, detail="Loop watchdog already running")
+    loop_watchdog = LoopWatchdog(threshold_ms / 1000, duration_seconds=seconds)
+    loop_watchdog.start()
+    return {"status": "started", "seconds": seconds, "threshold_ms": threshold_ms}
+
+
+if profiling_control is not None:
+    app.add_api_route("/admin/profiles", admin_list_profiles, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/admin/profiles/{name}", admin_get_profile, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/admin/profile/sampling", admin_sampling_profile, methods=["POST"], include_in_schema=False)
+    app.add_api_route("/admin/profile/loop-watchdog", admin_loop_watchdog, methods=["POST"], include_in_schema=False)
+
+startup_timer.mark("routes")
+
+STATIC_ASSETS_IN_MEMORY = _env_flag("STATIC_ASSETS_IN_MEMORY", True)
+STATIC_ASSETS_FINGERPRINT = _env_flag("STATIC_ASSETS_FINGERPRINT", True)
+
+# index.html/css/js를 메모리에 올려 요청마다 디스크 stat/read 없이 미리 압축된 본문과 ETag로 응답합니다.
+static_assets = None
+if STATIC_ASSETS_IN_MEMORY:
+    try:
+        static_assets = StaticAssetStore(os.getcwd(), fingerprint=STATIC_ASSETS_FINGERPRINT).load()
+        logger.info(
+            f"Static assets loaded in memory files={len(static_assets)} fingerprint={STATIC_ASSETS_FINGERPRINT}",
+            extra={"step": "STATIC_MOUNT", "status": "SUCCESS"},
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to load static assets in memory, falling back to disk: {e}",
+            extra={"step": "STATIC_MOUNT", "status": "FAIL"},
+        )
+
+
+async def serve_static_asset(request: Request, asset_path: str = ""):
+    asset = static_assets.lookup(request.url.path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return _precompressed_response(request, asset.body, asset.cache_control)
+
+
+@app.api_route("/", methods=["GET", "HEAD"])
+async def read_root(request: Request):
     """루트 경로 요청 시 메인 사이트(index.html)를 반환함."""
+    if static_assets is not None:
+        return await serve_static_asset(request)
     logger.info("Serving index.html", extra={"step": "ROOT_PATH"})
     return FileResponse("index.html")
 
 # Static files mapping
-try:
-    app.mount("/css", StaticFiles(directory="css"), name="css")
-    app.mount("/js", StaticFiles(directory="js"), name="js")
-    logger.info("Static directories mounted", extra={"step": "STATIC_MOUNT"})
-except Exception as e:
-    logger.error(f"Failed to mount static: {e}", extra={"step": "STATIC_MOUNT", "status": "FAIL"})
+if static_assets is not None:
+    for prefix in STATIC_ROUTE_PREFIXES:
+        # StaticFiles 마운트와 같이 HEAD도 응답 (헬스 체크/링크 검사기가 HEAD를 씀).
+        app.add_api_route(
+            f"{prefix}/{{asset_path:path}}", serve_static_asset, methods=["GET", "HEAD"], include_in_schema=False
+        )
+else:
+    try:
+        app.mount("/css", StaticFiles(directory="css"), name="css")
+        app.mount("/js", StaticFiles(directory="js"), name="js")
+        logger.info("Static directories mounted", extra={"step": "STATIC_MOUNT"})
+    except Exception as e:
+        logger.error(f"Failed to mount static: {e}", extra={"step": "STATIC_MOUNT", "status": "FAIL"})
+startup_timer.mark("static")
+startup_timer.log_summary()
+
+
+def _warmup_gemini_model():
+    model_registry.get_model(
+        GEMINI_MODEL_NAME,
+        generation_config=generation_config,
+        system_instruction=get_system_prompt(),
+    )
+
+async def _sync_shared_rate_limits():
+    """멀티 워커 레이트 리밋 카운터를 주기적으로 공유 SQLite와 합산 (busy_timeout 대기는 워커 스레드에서)."""
+    while True:
+        await asyncio.sleep(RATE_LIMIT_SYNC_INTERVAL_MS / 1000)
+        try:
+            await asyncio.to_thread(rate_limiter.sync)
+        except Exception as e:
+            logger.warning(f"Shared rate limit sync error: {e}", extra={"step": "RATE_LIMIT", "status": "WARN"})
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    global loop_watchdog, rate_limit_sync_task
+    event_loop_lag_monitor.start()
+    if isinstance(rate_limiter, SharedRateLimiter):
+        rate_limit_sync_task = asyncio.create_task(_sync_shared_rate_limits())
+    if LOOP_WATCHDOG_THRESHOLD_MS > 0:
+        loop_watchdog = LoopWatchdog(LOOP_WATCHDOG_THRESHOLD_MS / 1000)
+        loop_watchdog.start()
+    if GEMINI_WARMUP_ENABLED and model_registry is not None:
+        # 포트는 이미 열린 상태라 정적 페이지는 바로 응답하고, SDK import/모델 생성은 백그라운드에서 끝냄.
+        genai.warmup(then=_warmup_gemini_model)
+    if DICE_POOL_ENABLED and model_registry is not None:
+        dice_comment_pool.start()
+        logger.info("Dice comment pool refill started", extra={"step": "DICE_POOL_REFILL"})
+
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    await event_loop_lag_monitor.stop()
+    if rate_limit_sync_task is not None:
+        rate_limit_sync_task.cancel()
+        # 종료 직전 증가분까지 반영해 다른 워커의 한도 계산에 남김.
+        await asyncio.to_thread(rate_limiter.sync)
+    if loop_watchdog is not None:
+        loop_watchdog.stop()
+    await dice_comment_pool.stop()
+    await calendar_fetcher.aclose()
+    llm_executor.shutdown()
+
 
 if __name__ == "__main__":
     logger.info(
-        f"Backend server starting at http://0.0.0.0:8000 version={APP_VERSION}",
+        f"Backend server starting at http://0.0.0.0:8000 version={APP_VERSION} workers={SERVER_WORKERS}",
         extra={"step": "STARTUP"},
     )
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False)
+    # workers > 1이면 uvicorn이 워커 프로세스마다 main을 다시 import하며, 각 워커는 같은 SHARED_STATE_PATH를 엽니다.
+    # 단일 워커는 이미 만든 app 객체를 넘겨 "main:app" 문자열로 모듈 전체를 한 번 더 import하지 않게 함.
+    uvicorn.run(app if SERVER_WORKERS == 1 else "main:app", host="0.0.0.0", port=8000, reload=False, workers=SERVER_WORKERS)
@@ -0,0 +1,26 @@
+"""
+Test Configuration (tests/conftest.py)
+역할: 저장소 루트와 bench/를 import 경로에 추가하고 공용 fixture 경로 제공
+호출 관계: pytest -> tests/test_*.py
+수정 시 주의사항: 테스트는 fastapi/google-generativeai 없이 돌 수 있는 backend 순수 모듈만 import합니다.
+  main.py는 import하지 않습니다 (기동 시 환경 변수/외부 패키지 필요).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture
+def fixture_text():
+    def read(name: str) -> str:
+        return (FIXTURES / name).read_text(encoding="utf-8")
+
+    return read
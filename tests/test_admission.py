@@ -0,0 +1,137 @@
+"""
+Admission Control Tests (tests/test_admission.py)
+역할: AIMD 한도 증감, 라우트별 기준 지연/비율, 표본 제외(비 2xx, 업스트림을 거치지 않은 응답), 우선순위별 거절 확인
+호출 관계: pytest -> backend.admission.AdaptiveConcurrencyLimit, AdmissionController (가짜 시계 주입)
+수정 시 주의사항: AdmissionController.release()는 perf_counter로 지연을 재므로 ticket.started를 과거로 옮겨 지연을 흉내 냅니다.
+"""
+
+import time
+
+import pytest
+
+from backend.admission import HIGH, LOW, NORMAL, AdaptiveConcurrencyLimit, AdmissionController
+
+PRIORITIES = {"/chat": LOW, "/dice-comment": NORMAL, "/calendar/events": NORMAL}
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_controller(clock: FakeClock, initial: int = 32, per_client: int = 0) -> AdmissionController:
+    limit = AdaptiveConcurrencyLimit(initial=initial, min_limit=4, max_limit=256, clock=clock)
+    return AdmissionController(PRIORITIES, limit, low_priority_share=0.5, per_client_max_inflight=per_client)
+
+
+def complete(controller: AdmissionController, path: str, latency: float, status_code: int = 200, sampled=True):
+    ticket, rejection = controller.admit(path, "1.2.3.4")
+    assert rejection is None
+    ticket.started = time.perf_counter() - latency
+    return controller.release(ticket, status_code, sampled=sampled)
+
+
+def test_fast_cache_hits_do_not_pin_chat_baseline():
+    # 리뷰 시나리오: /chat 50건 중 1건은 2ms 캐시 hit, 나머지는 3초 Gemini 호출, 동시 처리 5.
+    clock = FakeClock()
+    controller = make_controller(clock)
+    for index in range(2000):
+        clock.now = index * 0.1
+        tickets = [controller.admit("/chat", f"client-{slot}")[0] for slot in range(5)]
+        for slot, ticket in enumerate(tickets):
+            hit = (index * 5 + slot) % 50 == 0
+            ticket.started = time.perf_counter() - (0.002 if hit else 3.0)
+            controller.release(ticket, 200, sampled=not hit)
+
+    assert controller.limit.limit >= 32
+    assert controller.limit.latency_ratio < 2.0
+
+
+def test_unsampled_fast_response_would_have_shrunk_limit():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    # 표본에 넣으면 기준 지연이 하한 50ms로 고정돼 정상 3초 호출이 비율 60으로 읽힘.
+    complete(controller, "/chat", 0.002)
+    for _ in range(1000):
+        complete(controller, "/chat", 3.0)
+
+    assert controller.limit.limit == 4
+
+
+def test_non_2xx_is_not_sampled():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    for status_code in (400, 413, 429, 500, 503, None):
+        assert complete(controller, "/chat", 0.001, status_code) is False
+    complete(controller, "/chat", 3.0)
+
+    assert controller.limit.baselines() == {"/chat": pytest.approx(3.0, abs=0.01)}
+
+
+def test_fast_route_does_not_mask_slow_route():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    complete(controller, "/chat", 3.0)
+    complete(controller, "/calendar/events", 0.004)
+    decreased = False
+    for _ in range(30):
+        complete(controller, "/calendar/events", 0.004)
+        decreased |= complete(controller, "/chat", 12.0)
+
+    assert decreased
+    assert controller.limit.limit < 32
+    assert controller.limit.latency_ratio > 2.0
+
+
+def test_limit_grows_when_busy_and_healthy():
+    clock = FakeClock()
+    controller = make_controller(clock, initial=8)
+    for _ in range(200):
+        tickets = [controller.admit("/calendar/events", f"c{slot}")[0] for slot in range(6)]
+        for ticket in tickets:
+            ticket.started = time.perf_counter() - 0.01
+            controller.release(ticket, 200)
+
+    assert controller.limit.limit > 8
+
+
+def test_baseline_forgets_old_minimum_after_two_windows():
+    clock = FakeClock()
+    limit = AdaptiveConcurrencyLimit(initial=32, min_limit=4, max_limit=256, clock=clock)
+    limit.on_sample("/chat", 1.0, 1)
+    clock.now = 61
+    limit.on_sample("/chat", 3.0, 1)
+
+    assert limit.baselines() == {"/chat": 3.0}
+
+
+def test_low_priority_shed_before_normal():
+    clock = FakeClock()
+    controller = make_controller(clock, initial=8)
+    for index in range(4):
+        assert controller.admit("/chat", f"c{index}")[1] is None
+
+    _, rejected = controller.admit("/chat", "c9")
+    assert (rejected.priority, rejected.reason, rejected.status_code) == (LOW, "shed", 503)
+    for index in range(4):
+        assert controller.admit("/calendar/events", f"n{index}")[1] is None
+    _, rejected = controller.admit("/dice-comment", "n9")
+    assert (rejected.priority, rejected.status_code) == (NORMAL, 503)
+    assert controller.admit("/", "anyone") == (None, None)
+    assert controller.priority_for("/") == HIGH
+
+
+def test_per_client_limit_returns_429():
+    clock = FakeClock()
+    controller = make_controller(clock, per_client=2)
+    controller.admit("/calendar/events", "1.2.3.4")
+    ticket, _ = controller.admit("/calendar/events", "1.2.3.4")
+
+    _, rejected = controller.admit("/calendar/events", "1.2.3.4")
+    assert (rejected.reason, rejected.status_code, rejected.retry_after) == ("client_limit", 429, 1)
+    controller.release(ticket, 200)
+    assert controller.admit("/calendar/events", "1.2.3.4")[1] is None
+    assert controller.tracked_clients() == 1
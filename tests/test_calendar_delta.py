@@ -0,0 +1,105 @@
+"""
+Calendar Delta Tests (tests/test_calendar_delta.py)
+역할: CalendarVersions.advance()/delta()가 일반 일정의 added/changed/removed, 바뀐 시리즈의 removed_series,
+      since_date 이동 시 표시 구간 끝 회차, 이력 밖 since의 전체 재동기화(None)를 맞게 계산하는지 확인
+호출 관계: pytest -> backend.recurrence.RecurrenceExpander -> backend.calendar_delta.CalendarVersions
+수정 시 주의사항: 이벤트는 parse_ics_events 결과와 같은 모양의 dict를 직접 만들고, 오늘 날짜는 now 인자로 고정합니다.
+"""
+
+from datetime import date, datetime
+
+from backend.calendar_delta import CalendarVersions
+from backend.recurrence import RecurrenceExpander
+
+TODAY = datetime(2025, 3, 3)
+
+
+def event(uid: str, start: str, title: str = "일정", rrule: str = None) -> dict:
+    item = {"id": uid, "title": title, "start": start, "end": None, "all_day": False, "source": "main"}
+    if rrule:
+        item["recurrence"] = {"rrule": rrule, "rdates": [], "exdates": [], "tzid": ""}
+    return item
+
+
+def advance(previous, events: list, today: datetime = TODAY, max_history: int = 4) -> CalendarVersions:
+    recurrence = RecurrenceExpander(events, horizon_days=14, past_days=0, now=lambda: today)
+    return CalendarVersions.advance(previous, recurrence.display_events(), events, recurrence, max_history)
+
+
+def keys(items: list) -> list:
+    return [item["key"] for item in items]
+
+
+def test_unchanged_content_keeps_version_and_empty_delta():
+    events = [event("a", "2025-03-04T19:00:00"), event("run", "2025-03-03T06:00:00", rrule="FREQ=WEEKLY")]
+    first = advance(None, events)
+    second = advance(first, [dict(item) for item in events])
+
+    assert second.version == first.version
+    assert second.classify(first.version, first.display_date) == "current"
+    assert second.delta(first.version, first.display_date) == {
+        "added": [], "changed": [], "removed": [], "removed_series": [],
+    }
+
+
+def test_added_changed_removed_base_events():
+    first = advance(None, [event("a", "2025-03-04T19:00:00"), event("b", "2025-03-05T19:00:00")])
+    second = advance(first, [
+        event("a", "2025-03-04T19:00:00", title="장소 변경"),
+        event("c", "2025-03-06T19:00:00"),
+    ])
+
+    delta = second.delta(first.version, first.display_date)
+
+    assert second.version > first.version
+    assert keys(delta["added"]) == ["main:c"]
+    assert keys(delta["changed"]) == ["main:a"]
+    assert delta["changed"][0]["title"] == "장소 변경"
+    assert delta["removed"] == ["main:b"]
+    assert delta["removed_series"] == []
+
+
+def test_changed_series_is_resent_whole():
+    first = advance(None, [event("run", "2025-03-03T06:00:00", rrule="FREQ=WEEKLY")])
+    second = advance(first, [event("run", "2025-03-03T06:00:00", title="템포런", rrule="FREQ=WEEKLY")])
+
+    delta = second.delta(first.version, first.display_date)
+
+    assert delta["removed_series"] == ["main:run"]
+    assert keys(delta["added"]) == ["main:run#20250303T060000", "main:run#20250310T060000"]
+    assert delta["removed"] == [] and delta["changed"] == []
+
+
+def test_since_date_move_sends_window_edges_only():
+    events = [event("run", "2025-03-03T06:00:00", rrule="FREQ=WEEKLY")]
+    first = advance(None, events)
+    later = advance(first, events, today=datetime(2025, 3, 10))
+
+    delta = later.delta(first.version, first.display_date)
+
+    assert later.version == first.version
+    assert later.classify(first.version, first.display_date) == "delta"
+    assert keys(delta["added"]) == ["main:run#20250317T060000"]
+    assert delta["removed"] == ["main:run#20250303T060000"]
+    assert delta["removed_series"] == []
+
+
+def test_missing_since_date_resends_all_series():
+    events = [event("a", "2025-03-04T19:00:00"), event("run", "2025-03-03T06:00:00", rrule="FREQ=WEEKLY")]
+    current = advance(None, events)
+
+    delta = current.delta(current.version, None)
+
+    assert delta["removed_series"] == ["main:run"]
+    assert keys(delta["added"]) == ["main:run#20250303T060000", "main:run#20250310T060000"]
+
+
+def test_since_outside_history_needs_full_resync():
+    first = advance(None, [event("a", "2025-03-04T19:00:00")], max_history=1)
+    second = advance(first, [event("a", "2025-03-04T19:00:00", title="2")], max_history=1)
+    third = advance(second, [event("a", "2025-03-04T19:00:00", title="3")], max_history=1)
+
+    assert third.delta(second.version, date(2025, 3, 3)) is not None
+    assert third.delta(first.version, date(2025, 3, 3)) is None
+    assert third.classify(first.version, date(2025, 3, 3)) == "full"
+    assert third.delta(12345, date(2025, 3, 3)) is None
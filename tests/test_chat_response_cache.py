@@ -0,0 +1,160 @@
+"""
+Chat Response Cache Tests (tests/test_chat_response_cache.py)
+역할: get_or_compute()의 동시 요청 합치기(coalescing), 예외 공유(캐시 안 함), 선행 요청 취소 시 대기자 승계, 변형 순환, TTL 확인
+호출 관계: pytest -> backend.chat_response_cache.ChatResponseCache (asyncio.run으로 직접 실행)
+수정 시 주의사항: compute는 asyncio.Event로 멈춰 두어 대기자가 모두 붙은 뒤에 끝나게 합니다.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.chat_response_cache import ChatResponseCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_cache(clock=None, variants: int = 1) -> ChatResponseCache:
+    return ChatResponseCache(max_entries=100, max_bytes=1_000_000, ttl_seconds=60, variants=variants,
+                             clock=clock or FakeClock())
+
+
+def gated_compute(release: asyncio.Event, calls: list, result="10km 잘 뛰었네!"):
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return compute
+
+
+def test_concurrent_requests_share_one_compute():
+    cache = make_cache()
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+        compute = gated_compute(release, calls)
+        tasks = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        after = await cache.get_or_compute("k", compute)
+        return results, after
+
+    results, after = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+    assert {text for text, _ in results} == {"10km 잘 뛰었네!"}
+    assert after == ("10km 잘 뛰었네!", "hit")
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_exception_is_shared_and_not_cached():
+    cache = make_cache()
+    calls = []
+    error = RuntimeError("upstream 503")
+
+    async def scenario():
+        release = asyncio.Event()
+        compute = gated_compute(release, calls, result=error)
+        tasks = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        retry = await cache.get_or_compute("k", gated_compute(release, calls, result="다시 성공"))
+        return outcomes, retry
+
+    outcomes, retry = asyncio.run(scenario())
+
+    assert all(outcome is error for outcome in outcomes)
+    assert retry == ("다시 성공", "miss")
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_compute():
+    cache = make_cache()
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+        compute = gated_compute(release, calls)
+        leader = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        release.set()
+        return await leader
+
+    assert asyncio.run(scenario()) == ("10km 잘 뛰었네!", "miss")
+    assert len(calls) == 1
+
+
+def test_cancelled_leader_hands_off_to_waiter():
+    cache = make_cache()
+    calls = []
+
+    async def scenario():
+        leader_gate, waiter_gate = asyncio.Event(), asyncio.Event()
+        leader = asyncio.create_task(cache.get_or_compute("k", gated_compute(leader_gate, calls, result="선행 답")))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(cache.get_or_compute("k", gated_compute(waiter_gate, calls, result="승계한 답")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await asyncio.sleep(0)
+        waiter_gate.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert sorted(source for _, source in results) == ["coalesced", "coalesced", "miss"]
+    assert {text for text, _ in results} == {"승계한 답"}
+    assert cache.get("k") == "승계한 답"
+    assert cache.stats()["coalesced"] == 2
+
+
+def test_variants_rotate_after_collected():
+    cache = make_cache(variants=2)
+    replies = iter(["첫 번째 답", "두 번째 답"])
+
+    async def compute():
+        return next(replies)
+
+    async def scenario():
+        return [await cache.get_or_compute("k", compute) for _ in range(4)]
+
+    assert asyncio.run(scenario()) == [
+        ("첫 번째 답", "miss"),
+        ("두 번째 답", "miss"),
+        ("첫 번째 답", "hit"),
+        ("두 번째 답", "hit"),
+    ]
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    cache.put("k", "저장된 답")
+
+    assert cache.get("k") == "저장된 답"
+    clock.now = 60
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,133 @@
+"""
+Chat Session Tests (tests/test_chat_sessions.py)
+역할: ChatSession._compact()가 예산 초과 시 user/assistant 쌍 단위로 밀어내 히스토리가 항상 user 턴으로 시작하는지,
+      밀려난 턴이 롤링 요약으로 접히는지, 만료/축출된 session_id를 ChatSessionStore가 새 세션으로 바꿔치지 않는지 확인
+호출 관계: pytest -> backend.chat_sessions.ChatSession, ChatSessionStore, trim_to_budget
+수정 시 주의사항: 토큰 수는 estimate_tokens 근사치이므로 예산은 턴 몇 개가 넘치는 정도로만 잡습니다.
+"""
+
+import random
+
+from backend import chat_sessions
+from backend.chat_sessions import SUMMARY_ACK, SUMMARY_USER_PREFIX, ChatSession, ChatSessionStore, estimate_tokens, trim_to_budget
+
+
+def assert_user_first(session: ChatSession):
+    assert session.turns[0].role == "user"
+    assert session.turn_tokens == sum(turn.tokens for turn in session.turns)
+    history = session.model_history()
+    assert history[0]["role"] == "user"
+    if session.summary_lines:
+        assert history[0]["content"].startswith(SUMMARY_USER_PREFIX)
+        assert history[1] == {"role": "assistant", "content": SUMMARY_ACK}
+
+
+def test_alternating_turns_stay_user_first():
+    session = ChatSession("s", token_budget=60, summary_max_tokens=200)
+
+    for index in range(10):
+        session.append("user", f"{index}번째 질문입니다. 오늘 훈련은?")
+        assert_user_first(session)
+        session.append("assistant", f"{index}번째 답. 쉬어라.")
+        assert_user_first(session)
+
+    assert session.turn_tokens <= session.token_budget
+    assert [turn.role for turn in session.turns] == ["user", "assistant"] * (len(session.turns) // 2)
+    assert "- 사용자: 0번째 질문입니다." in session.model_history()[0]["content"]
+
+
+def test_unanswered_user_turn_is_evicted_alone():
+    # 업스트림 오류로 답이 없는 user 턴 다음에 다시 user 턴이 오는 경우.
+    session = ChatSession("s", token_budget=30, summary_max_tokens=200)
+    session.append("user", "첫 질문 (응답 실패)")
+    session.append("user", "다시 묻는다. 인터벌 추천?")
+    session.append("assistant", "400m 10개.")
+    session.append("user", "회복은 얼마나 걸리나?")
+
+    assert_user_first(session)
+    assert [line for line, _ in session.summary_lines][0] == "- 사용자: 첫 질문 (응답 실패)"
+
+
+def test_last_pair_kept_even_over_budget():
+    session = ChatSession("s", token_budget=5, summary_max_tokens=0)
+    session.append("user", "아주 긴 질문 " * 20)
+    session.append("assistant", "아주 긴 답 " * 20)
+
+    assert [turn.role for turn in session.turns] == ["user", "assistant"]
+    assert session.turn_tokens > session.token_budget
+    assert session.model_history()[0]["role"] == "user"
+
+
+def test_summary_is_capped():
+    session = ChatSession("s", token_budget=20, summary_max_tokens=30)
+    for index in range(20):
+        session.append("user", f"질문 {index}")
+        session.append("assistant", f"답 {index}")
+
+    assert 0 < session.summary_tokens <= 30
+    assert session.summary_tokens == sum(tokens for _, tokens in session.summary_lines)
+    assert_user_first(session)
+
+
+def test_random_sequences_keep_user_first():
+    rng = random.Random(7)
+    for _ in range(50):
+        session = ChatSession("s", token_budget=rng.randint(10, 80), summary_max_tokens=rng.randint(0, 50))
+        session.append("user", "시작")
+        for _ in range(40):
+            role = rng.choice(["user", "assistant", "assistant"])
+            session.append(role, "가" * rng.randint(1, 30))
+            assert_user_first(session)
+
+
+def test_trim_to_budget_drops_leading_assistant():
+    history = [
+        {"role": "user", "content": "질문 하나"},
+        {"role": "assistant", "content": "답 하나"},
+        {"role": "user", "content": "질문 둘"},
+        {"role": "assistant", "content": "답 둘"},
+    ]
+    budget = estimate_tokens("답 하나") + estimate_tokens("질문 둘") + estimate_tokens("답 둘")
+
+    assert trim_to_budget(history, budget) == history[2:]
+
+
+def test_seed_skips_leading_assistant_and_consecutive_replies():
+    session = ChatSession("s", token_budget=25, summary_max_tokens=200)
+    session.seed(
+        [
+            {"role": "assistant", "content": "잘린 앞부분의 답"},
+            {"role": "user", "content": "질문 하나"},
+            {"role": "assistant", "content": "답 하나"},
+            {"role": "assistant", "content": "덧붙인 답"},
+            {"role": "user", "content": "질문 둘"},
+            {"role": "assistant", "content": "답 둘"},
+        ]
+    )
+
+    assert_user_first(session)
+    assert [turn.content for turn in session.turns] == ["질문 둘", "답 둘"]
+    assert "잘린 앞부분의 답" not in session.model_history()[0]["content"]
+
+
+def test_store_get_does_not_replace_expired_or_evicted_ids(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(chat_sessions.time, "monotonic", lambda: clock[0])
+    store = ChatSessionStore(max_sessions=2, ttl_seconds=60, token_budget=100, summary_max_tokens=50)
+    first = store.create()
+    first.append("user", "기억해라")
+
+    assert store.get(first.session_id) is first
+    assert store.get("") is None
+    assert store.get("unknown-session-id-0000") is None
+    assert len(store) == 1
+
+    clock[0] += 61
+    assert store.get(first.session_id) is None
+    assert len(store) == 0
+
+    kept, evicted = store.create(), store.create()
+    store.get(kept.session_id)
+    store.create()
+    assert store.get(evicted.session_id) is None
+    assert store.get(kept.session_id) is kept
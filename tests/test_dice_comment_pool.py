@@ -0,0 +1,123 @@
+"""
+Dice Comment Pool Tests (tests/test_dice_comment_pool.py)
+역할: DiceCommentPool 워터마크 동작 확인 - low 미만인 거리만 가장 빈 것부터 high까지 보충, pop이 low 아래로 내려가면
+      즉시 보충, 최근 사용/중복 문구 제외, 보충 실패 후 backoff, 빈 풀의 None/recycle
+호출 관계: pytest -> backend.dice_comment_pool.DiceCommentPool (start()로 실제 refill 루프 실행)
+수정 시 주의사항: generate_batch 대역은 호출 기록만 남기는 코루틴입니다. 루프를 기다리는 곳은 wait_until으로 상한을 둡니다.
+"""
+
+import asyncio
+import time
+
+from backend.dice_comment_pool import DiceCommentPool
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class FakeGenerator:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+        self.serial = 0
+
+    async def __call__(self, distance: str, count: int) -> list:
+        self.calls.append((distance, count))
+        if self.fail:
+            raise RuntimeError("upstream 503")
+        batch = []
+        for _ in range(count):
+            self.serial += 1
+            batch.append(f"{distance} 코멘트 {self.serial}")
+        return batch
+
+
+def make_pool(generate, **kwargs) -> DiceCommentPool:
+    return DiceCommentPool(generate, distances=("3km", "5km", "10km"), low_watermark=2, high_watermark=4, **kwargs)
+
+
+def test_refill_fills_low_pools_to_high_watermark_emptiest_first():
+    generate = FakeGenerator()
+    pool = make_pool(generate)
+    pool._pools["5km"].extend(["5km 기존 1"])
+    pool._pools["10km"].extend(["10km 기존 1", "10km 기존 2"])
+
+    async def scenario():
+        pool.start()
+        await wait_until(lambda: len(generate.calls) == 2)
+        await pool.stop()
+
+    asyncio.run(scenario())
+
+    assert generate.calls == [("3km", 4), ("5km", 3)]
+    assert [pool.size(distance) for distance in ("3km", "5km", "10km")] == [4, 4, 2]
+
+
+def test_pop_below_low_watermark_triggers_refill():
+    generate = FakeGenerator()
+    pool = make_pool(generate, refill_interval_seconds=60)
+
+    async def scenario():
+        pool.start()
+        await wait_until(lambda: pool.size("3km") == 4)
+        generate.calls.clear()
+        popped = [pool.pop("3km"), pool.pop("3km")]
+        assert generate.calls == []
+        popped.append(pool.pop("3km"))
+        await wait_until(lambda: pool.size("3km") == 4)
+        await pool.stop()
+        return popped
+
+    popped = asyncio.run(scenario())
+
+    assert generate.calls == [("3km", 3)]
+    assert len(set(popped)) == 3
+
+
+def test_refill_skips_recent_and_duplicate_comments():
+    batches = iter([["같은 말", "같은 말", "다른 말"], ["같은 말", "새 말", ""]])
+    calls = []
+
+    async def generate(distance, count):
+        calls.append(count)
+        return next(batches)
+
+    pool = DiceCommentPool(generate, distances=("3km",), low_watermark=1, high_watermark=3)
+
+    async def scenario():
+        pool.start()
+        await wait_until(lambda: len(calls) == 1)
+        while pool.size("3km"):
+            pool.pop("3km")
+        await wait_until(lambda: len(calls) == 2)
+        await pool.stop()
+
+    asyncio.run(scenario())
+
+    assert list(pool._pools["3km"]) == ["새 말"]
+    assert sorted(pool._recent["3km"]) == ["같은 말", "다른 말"]
+
+
+def test_failure_backs_off_and_empty_pool_recycles():
+    generate = FakeGenerator(fail=True)
+    pool = make_pool(generate, refill_interval_seconds=60, failure_backoff_seconds=60)
+
+    async def scenario():
+        pool.start()
+        await wait_until(lambda: len(generate.calls) == 1)
+        # 실패 직후에는 pop이 보충을 깨워도 backoff 동안 업스트림을 다시 부르지 않음.
+        assert pool.pop("3km") is None
+        await asyncio.sleep(0.05)
+        await pool.stop()
+
+    asyncio.run(scenario())
+
+    assert generate.calls == [("3km", 4)]
+    assert pool.recycle("3km") is None
+    pool._recent["3km"].append("예전 코멘트")
+    assert pool.recycle("3km") == "예전 코멘트"
+    assert not pool.supports("99km")
@@ -0,0 +1,39 @@
+"""
+ICS Parser Tests (tests/test_ics_parser.py)
+역할: 스트리밍 파서(backend.ics_parser)가 TZID/반복 정보가 없는 캘린더에서 기존 main.py 파서와 같은 결과를 내는지 확인
+호출 관계: pytest -> backend.ics_parser.parse_ics_events, bench.bench_ics_parser.legacy_parse_ics_events (비교 기준)
+수정 시 주의사항: 기존 파서는 TZID를 버리고 'YYYYMMDDTHHMM'을 잘못 읽으므로 fixture에는 두 파서가 같게 다루는 입력만 둡니다.
+"""
+
+from backend.ics_parser import parse_ics_events
+from bench_ics_parser import legacy_parse_ics_events
+
+
+def test_matches_legacy_parser(fixture_text):
+    text = fixture_text("basic_calendar.ics")
+
+    events = parse_ics_events(text)
+
+    assert events == legacy_parse_ics_events(text)
+    assert [event["id"] for event in events] == [
+        "event-4",
+        "run-1@example.com",
+        "folded-1@example.com",
+        "untitled@example.com",
+        "race-1@example.com",
+    ]
+
+
+def test_line_iterable_matches_text(fixture_text):
+    text = fixture_text("basic_calendar.ics")
+
+    assert parse_ics_events(text.splitlines(keepends=True)) == parse_ics_events(text)
+
+
+def test_unfolds_and_unescapes(fixture_text):
+    events = {event["id"]: event for event in parse_ics_events(fixture_text("basic_calendar.ics"))}
+
+    assert events["folded-1@example.com"]["title"] == "인터벌 400m x 10 (접힌 줄)"
+    assert events["folded-1@example.com"]["notes"] == "세미콜론; 백슬래시\\ 그리고탭으로 접힌 설명"
+    assert events["run-1@example.com"]["location"] == "여의도, 한강공원"
+    assert events["race-1@example.com"]["all_day"] is True
@@ -0,0 +1,133 @@
+"""
+LLM Executor Tests (tests/test_llm_executor.py)
+역할: LLMExecutor의 용량 초과(LLMBusyError), 호출 deadline(LLMTimeoutError), 슬롯 반환 시점 확인
+      (대기열에서 포기한 작업은 즉시 반환, 실행 중인 작업은 워커 스레드가 끝날 때 반환)
+호출 관계: pytest -> backend.llm_executor.LLMExecutor (실제 스레드 풀)
+수정 시 주의사항: 업스트림 대역은 threading.Event로 멈춰 두는 평범한 함수입니다. 스레드를 기다리는 곳은 wait_until으로 상한을 둡니다.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.llm_executor import LLMBusyError, LLMExecutor, LLMTimeoutError
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def blocking_call(gate: threading.Event, result="ok"):
+    def call():
+        gate.wait(2.0)
+        return result
+
+    return call
+
+
+def test_busy_when_workers_and_queue_are_full():
+    executor = LLMExecutor(max_concurrency=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(blocking_call(gate, "첫째")))
+        queued = asyncio.ensure_future(executor.run(blocking_call(gate, "둘째")))
+        await asyncio.sleep(0)
+        assert executor.pending == 2
+        with pytest.raises(LLMBusyError):
+            await executor.run(blocking_call(gate))
+        with pytest.raises(LLMBusyError):
+            executor.stream(lambda: iter(()))
+        gate.set()
+        results = await asyncio.gather(running, queued)
+        await wait_until(lambda: executor.pending == 0)
+        return results
+
+    try:
+        assert asyncio.run(scenario()) == ["첫째", "둘째"]
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_timeout_keeps_slot_until_worker_finishes():
+    executor = LLMExecutor(max_concurrency=1, max_queue=0)
+    gate = threading.Event()
+
+    async def scenario():
+        with pytest.raises(LLMTimeoutError):
+            await executor.run(blocking_call(gate), timeout=0.05)
+        # 응답은 포기했지만 스레드는 아직 업스트림을 기다리는 중 - 용량을 계속 점유.
+        assert executor.pending == 1
+        with pytest.raises(LLMBusyError):
+            await executor.run(blocking_call(gate))
+        gate.set()
+        await wait_until(lambda: executor.pending == 0)
+        return await executor.run(blocking_call(gate, "다시 성공"), timeout=1)
+
+    try:
+        assert asyncio.run(scenario()) == "다시 성공"
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_timeout_while_queued_releases_slot_immediately():
+    executor = LLMExecutor(max_concurrency=1, max_queue=1)
+    gate = threading.Event()
+    calls = []
+
+    def queued_call():
+        calls.append(1)
+        return "실행되면 안 됨"
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(blocking_call(gate)))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMTimeoutError):
+            await executor.run(queued_call, timeout=0.05)
+        pending_after_timeout = executor.pending
+        gate.set()
+        await running
+        await wait_until(lambda: executor.pending == 0)
+        return pending_after_timeout
+
+    try:
+        assert asyncio.run(scenario()) == 1
+        assert calls == []
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_stream_deadline_stops_worker():
+    executor = LLMExecutor(max_concurrency=1, max_queue=0)
+    produced = []
+
+    def slow_chunks():
+        for index in range(50):
+            produced.append(index)
+            time.sleep(0.02)
+            yield f"청크{index} "
+
+    async def scenario():
+        stream = executor.stream(slow_chunks, timeout=0.1)
+        received = []
+        with pytest.raises(LLMTimeoutError):
+            async for chunk in stream:
+                received.append(chunk)
+        await stream.aclose()
+        await wait_until(lambda: executor.pending == 0)
+        return received
+
+    try:
+        received = asyncio.run(scenario())
+        assert 0 < len(received) < 50
+        assert len(produced) < 50
+    finally:
+        executor.shutdown()
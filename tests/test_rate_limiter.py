@@ -0,0 +1,126 @@
+"""
+Rate Limiter Tests (tests/test_rate_limiter.py)
+역할: 슬라이딩 윈도우 경계(이전 윈도우 가중), Retry-After 값, 키 만료/상한 확인
+호출 관계: pytest -> backend.rate_limiter.SlidingWindowRateLimiter (가짜 시계 주입)
+수정 시 주의사항: 윈도우는 60초, 시각은 윈도우 0의 시작(t=0)부터 셉니다.
+"""
+
+from backend.rate_limiter import SlidingWindowRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_limiter(clock: FakeClock, max_keys: int = 1000, shard_count: int = 16) -> SlidingWindowRateLimiter:
+    return SlidingWindowRateLimiter(60, max_keys, shard_count=shard_count, clock=clock)
+
+
+def fill(limiter: SlidingWindowRateLimiter, count: int, client: str = "1.2.3.4", limit: int = 10) -> list:
+    return [limiter.hit("chat", client, limit) for _ in range(count)]
+
+
+def test_allows_limit_then_rejects():
+    clock = FakeClock(10)
+    limiter = make_limiter(clock)
+
+    assert fill(limiter, 10) == [0] * 10
+    assert limiter.hit("chat", "1.2.3.4", 10) > 0
+
+
+def test_no_double_burst_at_window_boundary():
+    clock = FakeClock(59)
+    limiter = make_limiter(clock)
+    fill(limiter, 10)
+
+    # 고정 윈도우라면 t=60에 다시 10건이 허용되지만, 이전 윈도우 10건이 그대로 가중됨.
+    clock.now = 60
+    assert limiter.hit("chat", "1.2.3.4", 10) > 0
+
+    # 윈도우 절반이 지나면 이전 카운트의 절반(5건)만 남음.
+    clock.now = 90
+    assert fill(limiter, 5) == [0] * 5
+    assert limiter.hit("chat", "1.2.3.4", 10) > 0
+
+
+def test_retry_after_when_current_window_full():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock)
+    fill(limiter, 10)
+
+    clock.now = 30
+    retry_after = limiter.hit("chat", "1.2.3.4", 10)
+
+    assert retry_after == 36
+    clock.now = 30 + retry_after - 1
+    assert limiter.hit("chat", "1.2.3.4", 10) > 0
+    clock.now = 30 + retry_after
+    assert limiter.hit("chat", "1.2.3.4", 10) == 0
+
+
+def test_retry_after_while_previous_window_decays():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock)
+    fill(limiter, 10)
+    clock.now = 90
+    fill(limiter, 5)
+
+    retry_after = limiter.hit("chat", "1.2.3.4", 10)
+
+    assert retry_after == 6
+    clock.now = 90 + retry_after - 1
+    assert limiter.hit("chat", "1.2.3.4", 10) > 0
+    clock.now = 90 + retry_after
+    assert limiter.hit("chat", "1.2.3.4", 10) == 0
+
+
+def test_retry_after_is_at_least_one_second():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock)
+    fill(limiter, 10)
+
+    # t=66에 허용되므로 남은 대기는 0.5초 -> 1초로 올림.
+    clock.now = 65.5
+    assert limiter.hit("chat", "1.2.3.4", 10) == 1
+    clock.now = 66
+    assert limiter.hit("chat", "1.2.3.4", 10) == 0
+
+
+def test_scopes_and_clients_are_independent():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock)
+    fill(limiter, 10)
+
+    assert limiter.hit("calendar", "1.2.3.4", 10) == 0
+    assert limiter.hit("chat", "5.6.7.8", 10) == 0
+    assert limiter.hit("chat", "1.2.3.4", 0) == 0
+
+
+def test_idle_keys_expire_after_two_windows():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock, shard_count=1)
+    fill(limiter, 3, client="idle")
+
+    clock.now = 60
+    limiter.hit("chat", "active", 10)
+    assert limiter.key_count() == 2
+
+    clock.now = 120
+    limiter.hit("chat", "active", 10)
+    assert limiter.key_count() == 1
+
+
+def test_max_keys_evicts_oldest():
+    clock = FakeClock(0)
+    limiter = make_limiter(clock, max_keys=2, shard_count=1)
+    fill(limiter, 10, client="first")
+    limiter.hit("chat", "second", 10)
+    limiter.hit("chat", "third", 10)
+
+    assert limiter.key_count() == 2
+    # 밀려난 키는 새 키로 다시 시작.
+    assert limiter.hit("chat", "first", 10) == 0
@@ -0,0 +1,191 @@
+"""
+Recurrence Tests (tests/test_recurrence.py)
+역할: RRULE 확장(BYDAY, BYDAY=-1FR, COUNT, 수년에 걸친 COUNT, 2월 29일 YEARLY, EXDATE)과 RECURRENCE-ID 개별 수정본 병합 확인
+호출 관계: pytest -> backend.ics_parser.parse_ics_events -> backend.recurrence.RecurrenceExpander
+수정 시 주의사항: 시간은 모두 떠 있는(floating) 벽시계 시각이라 실행 환경의 시간대와 무관합니다.
+"""
+
+from datetime import datetime
+
+from backend.ics_parser import parse_ics_events
+from backend.recurrence import RecurrenceExpander
+
+
+def calendar_text(*events: str) -> str:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for body in events:
+        lines.append("BEGIN:VEVENT")
+        lines.extend(line.strip() for line in body.strip().splitlines())
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def expand(text: str, start: datetime, end: datetime, now=None) -> tuple:
+    """(확장기, [start, end) 인스턴스). now를 주지 않으면 구간 시작일을 오늘로 봄."""
+    expander = RecurrenceExpander(parse_ics_events(text), now=now or (lambda: start))
+    return expander, expander.occurrences(start, end)
+
+
+def starts(instances: list) -> list:
+    return [event["start"] for event in instances]
+
+
+def test_weekly_byday():
+    text = calendar_text(
+        """
+        UID:track
+        DTSTART:20250303T190000
+        DTEND:20250303T200000
+        RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR
+        SUMMARY:트랙 훈련
+        """
+    )
+
+    _, instances = expand(text, datetime(2025, 3, 10), datetime(2025, 3, 17))
+
+    assert starts(instances) == ["2025-03-10T19:00:00", "2025-03-12T19:00:00", "2025-03-14T19:00:00"]
+    assert instances[0]["id"] == "track#20250310T190000"
+    assert instances[0]["end"] == "2025-03-10T20:00:00"
+    assert "recurrence" not in instances[0]
+
+
+def test_monthly_last_friday():
+    text = calendar_text(
+        """
+        UID:long-run
+        DTSTART:20250131T070000
+        RRULE:FREQ=MONTHLY;BYDAY=-1FR
+        SUMMARY:월말 장거리
+        """
+    )
+
+    _, instances = expand(text, datetime(2025, 1, 1), datetime(2025, 6, 1))
+
+    assert starts(instances) == [
+        "2025-01-31T07:00:00",
+        "2025-02-28T07:00:00",
+        "2025-03-28T07:00:00",
+        "2025-04-25T07:00:00",
+        "2025-05-30T07:00:00",
+    ]
+
+
+def test_count_limits_instances_across_windows():
+    text = calendar_text(
+        """
+        UID:taper
+        DTSTART:20250301T060000
+        RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3
+        SUMMARY:테이퍼링
+        """
+    )
+
+    _, instances = expand(text, datetime(2025, 3, 1), datetime(2025, 4, 1))
+    _, later = expand(text, datetime(2025, 3, 4), datetime(2025, 4, 1))
+
+    assert starts(instances) == ["2025-03-01T06:00:00", "2025-03-03T06:00:00", "2025-03-05T06:00:00"]
+    assert starts(later) == ["2025-03-05T06:00:00"]
+
+
+def test_sparse_count_rule_reaches_late_instances():
+    # 200회가 16년 넘게 이어지므로 빈 주기까지 세는 스캔 상한(max_instances * SCAN_FACTOR 주기)이면 뒤쪽 회차가 사라짐.
+    text = calendar_text(
+        """
+        UID:monthly-test
+        DTSTART:20250101T070000
+        RRULE:FREQ=DAILY;BYMONTHDAY=1;COUNT=200
+        SUMMARY:월례 기록측정
+        """
+    )
+
+    _, instances = expand(text, datetime(2040, 1, 1), datetime(2041, 12, 31))
+
+    assert len(instances) == 20
+    assert starts(instances)[0] == "2040-01-01T07:00:00"
+    assert starts(instances)[-1] == "2041-08-01T07:00:00"
+
+
+def test_dense_count_rule_skips_to_window():
+    text = calendar_text(
+        """
+        UID:streak
+        DTSTART:20250101T060000
+        RRULE:FREQ=DAILY;COUNT=5000
+        SUMMARY:매일 달리기
+        """
+    )
+
+    _, instances = expand(text, datetime(2038, 9, 1), datetime(2038, 10, 1))
+
+    # 5000번째 회차 = DTSTART + 4999일 = 2038-09-09.
+    assert starts(instances) == [f"2038-09-0{day}T06:00:00" for day in range(1, 10)]
+
+
+def test_yearly_feb_29_only_in_leap_years():
+    text = calendar_text(
+        """
+        UID:leap
+        DTSTART;VALUE=DATE:20240229
+        DTEND;VALUE=DATE:20240301
+        RRULE:FREQ=YEARLY
+        SUMMARY:윤년 기념 달리기
+        """
+    )
+
+    # 한 구간은 max_span_days(기본 731일)까지만 확장하므로 2년 단위로 나눠 봄.
+    _, first = expand(text, datetime(2024, 1, 1), datetime(2025, 12, 31))
+    _, skipped = expand(text, datetime(2025, 1, 1), datetime(2026, 12, 31))
+    _, leap = expand(text, datetime(2027, 1, 1), datetime(2028, 12, 31))
+
+    assert starts(first) == ["2024-02-29T00:00:00"]
+    assert skipped == []
+    assert starts(leap) == ["2028-02-29T00:00:00"]
+    assert leap[0]["id"] == "leap#20280229"
+    assert leap[0]["all_day"] is True
+
+
+def test_exdate_removes_instance():
+    text = calendar_text(
+        """
+        UID:easy
+        DTSTART:20250310T070000
+        RRULE:FREQ=DAILY;COUNT=4
+        EXDATE:20250311T070000,20250312T070000
+        SUMMARY:회복 조깅
+        """
+    )
+
+    _, instances = expand(text, datetime(2025, 3, 1), datetime(2025, 4, 1))
+
+    assert starts(instances) == ["2025-03-10T07:00:00", "2025-03-13T07:00:00"]
+
+
+def test_override_replaces_instance():
+    text = calendar_text(
+        """
+        UID:club
+        DTSTART:20250304T190000
+        DTEND:20250304T200000
+        RRULE:FREQ=WEEKLY;COUNT=3
+        SUMMARY:클럽 러닝
+        """,
+        """
+        UID:club
+        RECURRENCE-ID:20250311T190000
+        DTSTART:20250312T063000
+        DTEND:20250312T073000
+        SUMMARY:클럽 러닝 (아침으로 변경)
+        """,
+    )
+
+    expander, instances = expand(text, datetime(2025, 3, 1), datetime(2025, 4, 1))
+    events = expander.display_events()
+
+    assert starts(instances) == ["2025-03-04T19:00:00", "2025-03-18T19:00:00"]
+    assert [(event["id"], event["start"], event["title"]) for event in events] == [
+        ("club#20250304T190000", "2025-03-04T19:00:00", "클럽 러닝"),
+        ("club#20250311T190000", "2025-03-12T06:30:00", "클럽 러닝 (아침으로 변경)"),
+        ("club#20250318T190000", "2025-03-18T19:00:00", "클럽 러닝"),
+    ]
+    assert all("recurrence_id" not in event and "recurrence" not in event for event in events)
@@ -0,0 +1,215 @@
+"""
+Upstream Guard Tests (tests/test_upstream_guard.py)
+역할: 서킷 브레이커 상태 전이(closed -> open -> half-open -> closed/open), 주사위 헤징, 스트림 정리(시작 전 aclose 포함) 확인
+호출 관계: pytest -> backend.upstream_guard.CircuitBreaker/UpstreamGuard -> backend.llm_executor.LLMExecutor (실제 스레드 풀)
+수정 시 주의사항: 업스트림 대역은 time.sleep 하는 평범한 함수입니다. 스레드가 끝나길 기다리는 곳은 wait_until으로 상한을 둡니다.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.llm_executor import LLMExecutor
+from backend.upstream_guard import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, LatencyWindow, UpstreamGuard
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingRegistry:
+    def __init__(self):
+        self.counts = {}
+
+    def inc(self, name, labels):
+        self.counts[(name, labels)] = self.counts.get((name, labels), 0) + 1
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker("gemini", window_seconds=30, min_calls=4, error_rate_threshold=0.5,
+                          slow_call_seconds=10, slow_rate_threshold=0.8, open_seconds=20, clock=clock)
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_breaker_opens_on_error_rate_after_min_calls():
+    breaker = make_breaker(FakeClock())
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+    breaker.record(True, 0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    assert breaker.retry_after() == 20
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = make_breaker(FakeClock())
+    for _ in range(4):
+        breaker.record(True, 11.0)
+
+    assert breaker.state == OPEN
+
+
+def test_old_failures_leave_the_window():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    clock.now = 31
+    breaker.record(False, 0.1)
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_one_probe_then_closes_on_success():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(breaker)
+    clock.now = 20
+
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+    breaker.record(True, 0.5)
+
+    assert breaker.state == CLOSED
+    assert breaker.allow() is True
+
+
+def test_half_open_reopens_on_failure_and_release_returns_probe():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(breaker)
+    clock.now = 20
+    assert breaker.allow() is True
+    breaker.release()
+    assert breaker.allow() is True
+
+    breaker.record(False, 0.5)
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 20
+
+
+def test_guard_raises_circuit_open_without_calling_upstream():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(breaker)
+    executor = LLMExecutor(max_concurrency=1, max_queue=0)
+    calls = []
+    guard = UpstreamGuard(executor, breaker=breaker)
+
+    with pytest.raises(CircuitOpenError) as error:
+        asyncio.run(guard.run(calls.append, 1, timeout=1))
+
+    assert error.value.retry_after == 20
+    assert calls == []
+    executor.shutdown()
+
+
+def test_hedge_fires_after_p95_and_backup_wins():
+    executor = LLMExecutor(max_concurrency=4, max_queue=0)
+    registry = CountingRegistry()
+    guard = UpstreamGuard(executor, registry=registry, hedge_min_delay_seconds=0.05)
+    window = LatencyWindow(min_samples=1)
+    window.add(0.05)
+    guard._latency["dice"] = window
+    calls = []
+
+    def comment():
+        calls.append(1)
+        # 첫 호출만 꼬리 지연.
+        time.sleep(1.0 if len(calls) == 1 else 0.0)
+        return f"call-{len(calls)}"
+
+    started = time.monotonic()
+    result = asyncio.run(guard.run(comment, timeout=3, hedge_operation="dice"))
+
+    assert result == "call-2"
+    assert time.monotonic() - started < 0.9
+    assert registry.counts[("upstream_hedges_total", ("dice", "fired"))] == 1
+    assert registry.counts[("upstream_hedges_total", ("dice", "won"))] == 1
+    executor.shutdown()
+
+
+def test_hedge_skipped_without_latency_samples():
+    executor = LLMExecutor(max_concurrency=4, max_queue=0)
+    registry = CountingRegistry()
+    guard = UpstreamGuard(executor, registry=registry)
+
+    assert asyncio.run(guard.run(lambda: "ok", timeout=1, hedge_operation="dice")) == "ok"
+    assert registry.counts == {}
+    executor.shutdown()
+
+
+def slow_chunks(produced: list, stop: threading.Event, total: int = 200):
+    for index in range(total):
+        produced.append(index)
+        time.sleep(0.01)
+        yield f"chunk-{index}"
+    stop.set()
+
+
+def test_stream_closed_before_first_iteration_releases_probe_and_stops_worker():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(breaker)
+    clock.now = 20
+    executor = LLMExecutor(max_concurrency=1, max_queue=0)
+    guard = UpstreamGuard(executor, breaker=breaker)
+    produced = []
+    finished = threading.Event()
+
+    async def scenario():
+        chunks = guard.stream(slow_chunks, produced, finished, timeout=5)
+        assert breaker.state == HALF_OPEN and breaker.allow() is False
+        # 응답 본문 이터레이션이 한 번도 시작되지 않은 채 연결이 끊긴 경우.
+        await asyncio.sleep(0.05)
+        await chunks.aclose()
+        await wait_until(lambda: executor.pending == 0)
+
+    asyncio.run(scenario())
+
+    assert breaker.allow() is True
+    assert not finished.is_set()
+    assert len(produced) < 200
+    executor.shutdown()
+
+
+def test_stream_success_records_and_closes_breaker():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(breaker)
+    clock.now = 20
+    executor = LLMExecutor(max_concurrency=1, max_queue=0)
+    guard = UpstreamGuard(executor, breaker=breaker)
+
+    async def scenario():
+        chunks = guard.stream(lambda: iter(["a", "b"]), timeout=5)
+        received = [chunk async for chunk in chunks]
+        await chunks.aclose()
+        return received
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert breaker.state == CLOSED
+    executor.shutdown()
@@ -0,0 +1,580 @@
+"""
+Log Report (tools/log_report.py)
+역할: Logs/server.log(멀티 워커는 server.<pid>.log)와 롤링 백업(.N)을 mmap으로 스트리밍해 라우트별/단계별 지연 백분위(p50/p95/p99),
+      오류율, 레이트 리밋/admission 거절 수, 가장 느린 요청을 표로 출력
+호출 관계: 운영자 수동 실행 (서버 코드에서 import하지 않음, 표준 라이브러리만 사용)
+수정 시 주의사항: 텍스트(LOG_FORMAT)와 JSON Lines(LOG_JSON_ENABLED=1) 줄을 모두 읽습니다 (한 파일 안에 섞여 있어도 됨).
+  메시지 문구(Incoming/Completed/Unhandled, Rate limit exceeded, Admission rejected)는
+  backend/request_middleware.py, main.py의 로그 문구와 맞춰야 합니다.
+  메모리는 로그 크기와 무관합니다: 지연은 로그 버킷 히스토그램(상대 오차 2% 이내), 경로는 MAX_PATHS개까지,
+  RESPONSE를 기다리는 job은 최대 MAX_PENDING_JOBS개만 보관합니다 (RECEIVE 줄의 method, 단계별 duration 조인용).
+  텍스트 로그에는 시각이 없어 --since/--until을 파일 단위(롤링 파일의 수정 시각 구간)로만 적용합니다.
+  줄 단위 구간이 필요하면 서버를 LOG_JSON_ENABLED=1로 운영하세요 (JSON 파일은 이진 탐색으로 시작 위치를 찾음).
+  Windows에서는 파일을 연 동안 서버의 롤오버(rename)가 실패할 수 있어, 파일은 읽는 동안만 엽니다.
+
+실행 예시:
+    python tools/log_report.py
+    python tools/log_report.py --since 2h --top 20
+    python tools/log_report.py --since 2026-10-18T09:00 --until 2026-10-18T10:00 --json report.json
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger("DevilTown.tools")
+
+# 텍스트 줄: "[LEVEL] job_id=J step=S <message> status=X duration_ms=N" (message에는 공백이 있을 수 있음).
+# chunk 단위 findall로 C에서 한 번에 분해 (줄마다 split/rsplit하는 것보다 약 30% 빠름).
+TEXT_LINE = re.compile(rb"^\[[A-Z]+\] job_id=(\S*) step=(\S*) (.*) status=(\S*) duration_ms=(\d+)\r?$", re.MULTILINE)
+JSON_TS_PREFIX = b'{"ts": "'
+RELATIVE_TIME = re.compile(r"^(\d+)([smhd])$")
+TIME_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+MAX_PATHS = 200
+MAX_PENDING_JOBS = 50000
+MAX_STEPS_PER_JOB = 8
+SYSTEM_JOB_ID = b"SYSTEM"
+# 이진 탐색을 멈추고 순차 스캔으로 넘어가는 구간 크기.
+SEEK_GRANULARITY = 64 * 1024
+# 한 번에 복사해 분해하는 크기 (chunk 1개만 메모리에 있음).
+CHUNK_BYTES = 8 * 1024 * 1024
+# (경로+코드, 지연)별 RESPONSE 개수 버퍼 상한. 넘으면 경로별 통계로 합산 후 비움.
+RESPONSE_BUFFER = 50000
+
+
+class LatencyHistogram:
+    """
+    Purpose: 상수 메모리 지연 분포. 128ms 미만은 1ms 단위, 이상은 2진 지수당 64칸 (상대 오차 1/64 이내).
+    Output: percentile(pct) -> 해당 버킷 상한(ms, 실제 최대값으로 제한) / nearest-rank
+    """
+
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def add(self, ms: int, count: int = 1):
+        if ms >= 128:
+            shift = ms.bit_length() - 7
+            bucket = (ms >> shift) << shift
+        else:
+            bucket = ms
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, pct: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * pct // 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                upper = bucket if bucket < 128 else bucket + (1 << (bucket.bit_length() - 7)) - 1
+                return min(upper, self.max)
+        return self.max
+
+
+class PathStats:
+    __slots__ = ("count", "client_errors", "server_errors", "throttled", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.client_errors = 0
+        self.server_errors = 0
+        self.throttled = 0
+        self.latency = LatencyHistogram()
+
+
+class StepStats:
+    __slots__ = ("count", "failures", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+
+
+def _field(message: bytes, name: bytes) -> bytes:
+    """`name=value` 형식 메시지에서 value (공백 전까지)."""
+    index = message.find(name)
+    if index < 0:
+        return b"-"
+    return message[index + len(name):].split(b" ", 1)[0] or b"-"
+
+
+def _chunks(mm, start: int):
+    """mmap을 CHUNK_BYTES 근처의 줄 경계에서 잘라 bytes로 순서대로 반환 (한 번에 chunk 1개만 메모리에 있음)."""
+    size = len(mm)
+    while start < size:
+        end = mm.find(b"\n", min(size, start + CHUNK_BYTES))
+        end = size if end < 0 else end + 1
+        yield mm[start:end]
+        start = end
+
+
+def _json_ts_key(mm, start: int):
+    head = mm[start:start + len(JSON_TS_PREFIX) + 19]
+    if not head.startswith(JSON_TS_PREFIX):
+        return None
+    return head[len(JSON_TS_PREFIX):].decode("ascii", "replace")
+
+
+def _seek_since(mm, since_key: str) -> int:
+    """
+    JSON Lines 파일에서 ts < since인 마지막 줄 근처의 줄 시작 위치 (이진 탐색, 텍스트 줄을 만나면 중단).
+    로그는 writer 스레드가 기록 순서대로 쓰므로 ts가 거의 단조 증가한다고 봄 (경계 근처는 줄 단위 필터가 처리).
+    """
+    lo, hi = 0, len(mm)
+    while hi - lo > SEEK_GRANULARITY:
+        mid = (lo + hi) // 2
+        start = mm.find(b"\n", mid, hi)
+        if start < 0:
+            break
+        start += 1
+        key = _json_ts_key(mm, start)
+        if key is None:
+            break
+        if key < since_key:
+            lo = start
+        else:
+            hi = mid
+    return lo
+
+
+class LogReport:
+    """
+    Purpose: 로그 줄을 한 번씩만 보고 집계 (RECEIVE/단계 줄과 RESPONSE 줄을 job_id로 조인).
+    Input: top(가장 느린 요청 보관 수), since/until(epoch 초, None이면 제한 없음)
+    Output: scan_file() 반복 후 to_dict()
+    """
+
+    def __init__(self, top: int = 10, since: float = None, until: float = None):
+        self.top = max(1, int(top))
+        self.since = since
+        self.until = until
+        self.since_key = _utc_key(since)
+        self.until_key = _utc_key(until)
+        self.paths = {}
+        self.steps = {}
+        self.rate_limited = {}
+        self.admission_rejected = {}
+        self.files = []
+        self.bytes_scanned = 0
+        self.lines = 0
+        self.requests = 0
+        self.joined = 0
+        self.untimed_lines = 0
+        self.malformed = 0
+        self.unmatched_receive = 0
+        self._responses = {}
+        self._pending = OrderedDict()
+        self._slowest = []
+        self._seq = 0
+
+    def scan_files(self, files):
+        """
+        오래된 파일부터 스캔. 텍스트 로그는 파일의 시간 구간(직전 파일 수정 시각 ~ 자기 수정 시각)으로만 구간 필터.
+        직전 파일은 같은 롤링 묶음(server.log.N -> server.log, 워커별 server.<pid>.log.N -> server.<pid>.log) 안에서만 봄.
+        """
+        previous_mtime = None
+        previous_chain = None
+        for path in files:
+            base, _, suffix = path.name.rpartition(".")
+            chain = base if suffix.isdigit() else path.name
+            if chain != previous_chain:
+                previous_mtime = None
+                previous_chain = chain
+            mtime = path.stat().st_mtime
+            skip = (self.since is not None and mtime < self.since) or (
+                self.until is not None and previous_mtime is not None and previous_mtime > self.until
+            )
+            previous_mtime = mtime
+            if not skip:
+                self.scan_file(path)
+
+    def scan_file(self, path: Path):
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 빈 파일 (롤오버 직후)
+                return
+            with mm:
+                start = _seek_since(mm, self.since_key) if self.since_key else 0
+                self.files.append(str(path))
+                self._scan(mm, start)
+
+    def _scan(self, mm, start: int):
+        # 줄 대부분인 "Completed" RESPONSE는 (경로+코드, 지연)별 개수만 세고, 경로별 통계/히스토그램에는 chunk마다 합산.
+        lines = 0
+        for chunk in _chunks(mm, start):
+            if self.until_key is not None:
+                first_key = _json_ts_key(chunk, 0)
+                if first_key is not None and first_key > self.until_key:
+                    # 이후 chunk는 모두 --until 이후 (ts는 거의 단조 증가)
+                    break
+            self.bytes_scanned += len(chunk)
+            if chunk[:1] == b"{" or b"\n{" in chunk:
+                self._scan_json_chunk(chunk)
+            lines += self._scan_text_chunk(chunk)
+            if len(self._responses) > RESPONSE_BUFFER:
+                self._fold_responses()
+        self._fold_responses()
+        self.lines += lines
+        if self.since_key is not None or self.until_key is not None:
+            self.untimed_lines += lines
+
+    def _scan_json_chunk(self, chunk: bytes):
+        # JSON Lines (LOG_JSON_ENABLED=1) - 설정을 바꾼 직후 파일에는 텍스트 줄과 섞여 있을 수 있음.
+        for line in chunk.split(b"\n"):
+            if line[:1] == b"{":
+                self._feed_json(line)
+
+    def _scan_text_chunk(self, chunk: bytes) -> int:
+        """chunk의 텍스트 로그 줄 처리. 반환: 처리한 줄 수. 메서드는 루프 밖에서 한 번만 바인딩."""
+        feed = self._feed
+        finish = self._finish
+        pending = self._pending
+        matches = TEXT_LINE.findall(chunk)
+        for job, step, message, status, duration in matches:
+            if step == b"RESPONSE" and message[:10] == b"Completed ":
+                finish(job, message[10:], int(duration))
+            elif step == b"REQUEST" and message[:9] == b"Incoming ":
+                # 성공 요청도 RECEIVE를 모두 남기는 기본 설정(LOG_RECEIVE_SAMPLE_RATE=1.0)에서는 RESPONSE만큼 많음.
+                entry = pending.get(job)
+                if entry is None:
+                    entry = self._pending_entry(job)
+                entry[0] = message[9:].partition(b" to ")[0]
+            else:
+                feed(job, step, message, status, int(duration))
+        return len(matches)
+
+    def _feed_json(self, line: bytes):
+        try:
+            record = json.loads(line)
+            ts = record["ts"][:19]
+        except (ValueError, KeyError, TypeError):
+            self.malformed += 1
+            return
+        if (self.since_key and ts < self.since_key) or (self.until_key and ts > self.until_key):
+            return
+        try:
+            duration_ms = int(record.get("duration_ms") or 0)
+        except (TypeError, ValueError):
+            duration_ms = 0
+        self.lines += 1
+        self._feed(
+            str(record.get("job_id", "")).encode(),
+            str(record.get("step", "")).encode(),
+            str(record.get("message", "")).split("\n", 1)[0].encode(),
+            str(record.get("status", "")).encode(),
+            duration_ms,
+        )
+
+    def _feed(self, job: bytes, step: bytes, message: bytes, status: bytes, duration: int):
+        if step == b"RESPONSE":
+            if message.startswith(b"Completed "):
+                self._finish(job, message[10:], duration)
+            elif message.startswith(b"Unhandled exception on "):
+                self._finish(job, message[23:] + b" code=500", duration)
+            return
+        if step == b"REQUEST":
+            if message.startswith(b"Incoming ") and job != SYSTEM_JOB_ID:
+                self._pending_entry(job)[0] = message[9:].partition(b" to ")[0]
+            return
+
+        stats = self.steps.get(step)
+        if stats is None:
+            stats = self.steps[step] = StepStats()
+        stats.count += 1
+        if status == b"FAIL":
+            stats.failures += 1
+            if step == b"RATE_LIMIT":
+                scope = _field(message, b"scope=")
+                self.rate_limited[scope] = self.rate_limited.get(scope, 0) + 1
+            elif step == b"ADMISSION":
+                reason = _field(message, b"reason=")
+                self.admission_rejected[reason] = self.admission_rejected.get(reason, 0) + 1
+        if duration:
+            stats.latency.add(duration)
+            if job != SYSTEM_JOB_ID:
+                steps = self._pending_entry(job)[1]
+                if len(steps) < MAX_STEPS_PER_JOB:
+                    steps.append((step, duration))
+
+    def _pending_entry(self, job: bytes) -> list:
+        entry = self._pending.get(job)
+        if entry is None:
+            entry = self._pending[job] = [None, []]
+            if len(self._pending) > MAX_PENDING_JOBS:
+                _, evicted = self._pending.popitem(last=False)
+                if evicted[0] is not None:
+                    self.unmatched_receive += 1
+        return entry
+
+    def _path_key(self, path: bytes) -> bytes:
+        if path in self.paths:
+            return path
+        # 지문이 붙은 정적 파일(/js/name.<hash>.js)은 디렉터리 단위로 묶어 경로 수가 늘지 않게 함.
+        parts = path.split(b"/")
+        if len(parts) > 2 and b"." in parts[-1]:
+            path = b"/" + parts[1] + b"/*"
+            if path in self.paths:
+                return path
+        if len(self.paths) >= MAX_PATHS:
+            return b"(other)"
+        return path
+
+    def _finish(self, job: bytes, path_code: bytes, duration: int):
+        """RESPONSE 1건 (텍스트/JSON의 Completed 줄, Unhandled 줄 공통)."""
+        key = (path_code, duration)
+        self._responses[key] = self._responses.get(key, 0) + 1
+        entry = self._pending.pop(job, None) if self._pending else None
+        if entry is not None and entry[0] is not None:
+            self.joined += 1
+        if len(self._slowest) < self.top or duration > self._slowest[0][0]:
+            self._remember_slowest(job, entry, path_code, duration)
+
+    def _remember_slowest(self, job: bytes, entry, path_code: bytes, duration: int):
+        method, steps = (entry[0] or b"", tuple(entry[1])) if entry is not None else (b"", ())
+        self._seq += 1
+        item = (duration, self._seq, job, method, path_code, steps)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        else:
+            heapq.heapreplace(self._slowest, item)
+
+    def _fold_responses(self):
+        for (path_code, duration), count in self._responses.items():
+            path, _, code = path_code.rpartition(b" code=")
+            code = int(code) if code.isdigit() else 0
+            key = self._path_key(path)
+            stats = self.paths.get(key)
+            if stats is None:
+                stats = self.paths[key] = PathStats()
+            stats.count += count
+            if code >= 500:
+                stats.server_errors += count
+            elif code >= 400:
+                stats.client_errors += count
+                if code == 429:
+                    stats.throttled += count
+            stats.latency.add(duration, count)
+            self.requests += count
+        self._responses.clear()
+
+    def to_dict(self) -> dict:
+        def text(value: bytes) -> str:
+            return value.decode("utf-8", "replace")
+
+        paths = [
+            {
+                "path": text(path),
+                "count": stats.count,
+                "p50_ms": stats.latency.percentile(50),
+                "p95_ms": stats.latency.percentile(95),
+                "p99_ms": stats.latency.percentile(99),
+                "max_ms": stats.latency.max,
+                "error_rate_4xx": round(stats.client_errors / stats.count, 4),
+                "error_rate_5xx": round(stats.server_errors / stats.count, 4),
+                "throttled_429": stats.throttled,
+            }
+            for path, stats in sorted(self.paths.items(), key=lambda item: item[1].count, reverse=True)
+        ]
+        steps = [
+            {
+                "step": text(step),
+                "count": stats.count,
+                "timed": stats.latency.total,
+                "p50_ms": stats.latency.percentile(50),
+                "p95_ms": stats.latency.percentile(95),
+                "p99_ms": stats.latency.percentile(99),
+                "fail_rate": round(stats.failures / stats.count, 4),
+            }
+            for step, stats in sorted(self.steps.items(), key=lambda item: item[1].count, reverse=True)
+        ]
+        slowest = []
+        for duration, _, job, method, path_code, job_steps in sorted(self._slowest, reverse=True):
+            path, _, code = path_code.rpartition(b" code=")
+            slowest.append(
+                {
+                    "duration_ms": duration,
+                    "job_id": text(job),
+                    "method": text(method),
+                    "path": text(path),
+                    "code": int(code) if code.isdigit() else 0,
+                    "steps": [{"step": text(step), "duration_ms": ms} for step, ms in job_steps],
+                }
+            )
+        in_flight = sum(1 for entry in self._pending.values() if entry[0] is not None)
+        return {
+            "files": self.files,
+            "bytes_scanned": self.bytes_scanned,
+            "window": {"since": _iso(self.since), "until": _iso(self.until)},
+            "lines": self.lines,
+            "requests": self.requests,
+            "joined_with_receive": self.joined,
+            "receive_without_response": self.unmatched_receive + in_flight,
+            "untimed_lines": self.untimed_lines,
+            "malformed_lines": self.malformed,
+            "paths": paths,
+            "steps": steps,
+            "rate_limit_rejections": {text(k): v for k, v in sorted(self.rate_limited.items())},
+            "admission_rejections": {text(k): v for k, v in sorted(self.admission_rejected.items())},
+            "slowest": slowest,
+        }
+
+
+def _utc_key(epoch):
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _iso(epoch):
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch).astimezone().isoformat(timespec="seconds")
+
+
+def parse_time_arg(raw: str, now: float) -> float:
+    """`30m`/`2h`/`1d`(현재 기준 상대) 또는 ISO 8601 (시간대가 없으면 로컬 시각) -> epoch 초."""
+    relative = RELATIVE_TIME.match(raw.strip())
+    if relative:
+        delta = timedelta(**{TIME_UNITS[relative.group(2)]: int(relative.group(1))})
+        return now - delta.total_seconds()
+    parsed = datetime.fromisoformat(raw.strip())
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.timestamp()
+
+
+def log_files(active: Path) -> list:
+    """
+    롤링 백업(server.log.N, N이 클수록 오래됨)을 오래된 순으로, 마지막에 현재 파일.
+    멀티 워커 모드의 워커별 파일(server.<pid>.log)도 같은 디렉터리에 있으면 파일별로 이어 붙임
+    (job_id 조인은 워커 안에서만 일어나므로 워커 파일끼리의 순서는 결과에 영향 없음).
+    """
+    actives = [active]
+    if active.suffix:
+        for path in sorted(active.parent.glob(f"{active.stem}.*{active.suffix}")):
+            if path.name[len(active.stem) + 1:-len(active.suffix)].isdigit():
+                actives.append(path)
+    files = []
+    for current in actives:
+        backups = []
+        for path in current.parent.glob(current.name + ".*"):
+            suffix = path.name[len(current.name) + 1:]
+            if suffix.isdigit():
+                backups.append((int(suffix), path))
+        files.extend(path for _, path in sorted(backups, reverse=True))
+        if current.exists():
+            files.append(current)
+    return files
+
+
+def print_report(report: dict, max_paths: int):
+    window = report["window"]
+    logger.info(
+        f"files={len(report['files'])} scanned_mb={report['bytes_scanned'] / 1048576:.1f} lines={report['lines']} "
+        f"requests={report['requests']} window={window['since'] or '-'} ~ {window['until'] or '-'}"
+    )
+    if report["untimed_lines"]:
+        logger.info(
+            f"note: {report['untimed_lines']} text lines have no timestamp; the window was applied per file "
+            f"(set LOG_JSON_ENABLED=1 for per-line windows)"
+        )
+
+    logger.info("")
+    logger.info(f"{'path':<32} {'count':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'4xx%':>6} {'5xx%':>6} {'429':>6}")
+    for row in report["paths"][:max_paths]:
+        logger.info(
+            f"{row['path'][:32]:<32} {row['count']:>8} {row['p50_ms']:>7} {row['p95_ms']:>7} {row['p99_ms']:>7} "
+            f"{row['max_ms']:>7} {row['error_rate_4xx'] * 100:>6.1f} {row['error_rate_5xx'] * 100:>6.1f} "
+            f"{row['throttled_429']:>6}"
+        )
+
+    logger.info("")
+    logger.info(f"{'step':<24} {'count':>8} {'timed':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'fail%':>6}")
+    for row in report["steps"]:
+        logger.info(
+            f"{row['step'][:24]:<24} {row['count']:>8} {row['timed']:>8} {row['p50_ms']:>7} {row['p95_ms']:>7} "
+            f"{row['p99_ms']:>7} {row['fail_rate'] * 100:>6.1f}"
+        )
+
+    logger.info("")
+    rate_limits = " ".join(f"{scope}={count}" for scope, count in report["rate_limit_rejections"].items())
+    admission = " ".join(f"{reason}={count}" for reason, count in report["admission_rejections"].items())
+    logger.info(f"rate limit rejections: {rate_limits or 'none'}")
+    logger.info(f"admission rejections: {admission or 'none'}")
+    logger.info(
+        f"RECEIVE joined: {report['joined_with_receive']} / {report['requests']} responses "
+        f"(RECEIVE is sampled for successful requests), receive without response: {report['receive_without_response']}"
+    )
+
+    logger.info("")
+    logger.info("slowest requests:")
+    for row in report["slowest"]:
+        steps = " ".join(f"{step['step']}={step['duration_ms']}ms" for step in row["steps"])
+        method = f"{row['method']} " if row["method"] else ""
+        logger.info(
+            f"{row['duration_ms']:>8}ms  job_id={row['job_id']} {method}{row['path']} code={row['code']}"
+            + (f"  [{steps}]" if steps else "")
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency percentiles, error rates and slowest requests from server logs")
+    parser.add_argument("--log", default=os.path.join("Logs", "server.log"), help="현재 로그 파일 (백업 .N과 같은 디렉터리의 워커별 server.<pid>.log도 함께 읽음)")
+    parser.add_argument("--since", help="시작 시각 (예: 30m, 2h, 1d, 2026-10-18T09:00)")
+    parser.add_argument("--until", help="끝 시각 (형식은 --since와 같음)")
+    parser.add_argument("--top", type=int, default=10, help="가장 느린 요청 표시 수")
+    parser.add_argument("--max-paths", type=int, default=30, help="경로 표 최대 행 수")
+    parser.add_argument("--json", dest="json_path", help="보고서를 JSON 파일로도 저장")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    now = time.time()
+    try:
+        since = parse_time_arg(args.since, now) if args.since else None
+        until = parse_time_arg(args.until, now) if args.until else None
+    except ValueError as e:
+        logger.error(f"Invalid --since/--until value: {e}")
+        sys.exit(2)
+
+    files = log_files(Path(args.log))
+    if not files:
+        logger.error(f"No log files found at {args.log} (run from the server directory or pass --log)")
+        sys.exit(2)
+
+    started = time.perf_counter()
+    report = LogReport(top=args.top, since=since, until=until)
+    report.scan_files(files)
+    result = report.to_dict()
+    print_report(result, args.max_paths)
+    logger.info("")
+    logger.info(f"analyzed in {time.perf_counter() - started:.2f}s")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info(f"report saved: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()